@@ -0,0 +1,6 @@
+"""
+Rastreador solar/celeste: subsistemas reutilizables del nodo maestro en Python.
+
+Los scripts `vN_info_*.py` importan de aquí las piezas comunes
+(efemérides vectorizadas, tramas, transporte serie...).
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from rastreador.cli import main
+
+sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Tick adaptativo: despertar justo cuando el objetivo del servo cambia un paso.
+
+Con el tick fijo de 1 s el rastreador calcula y compara 86400 veces al día,
+aunque cerca del amanecer el azimut del sol tarda decenas de segundos en
+mover el servo un grado y la Luna con la trama precisa tarda más de diez por
+décima. A la inversa, el sol casi cenital en Bogotá barre el azimut mucho
+más rápido que un paso por segundo, y el tick fijo llega tarde.
+
+`Planificador` estima la velocidad del objetivo continuo (antes de truncar o
+redondear) con una diferencia finita y devuelve el tiempo hasta el próximo
+borde de cuantización de cualquiera de los dos ejes, acotado por:
+
+    abajo:  latencia del enlace (una trama no llega antes que la anterior)
+    arriba: intervalo de la trama clave (el reloj de la LCD)
+
+Con el intervalo clave de 10 s del tick fijo esa cota manda: casi todas las
+tramas son claves y el modo adaptativo enviaría tantas como el fijo. Por eso
+usa su propio intervalo, config.INTERVALO_CLAVE_ADAPTATIVO (60 s), a costa
+de que la hora de la LCD se atrase hasta ese tiempo con el cuerpo quieto.
+
+    python -m rastreador.adaptativo --cuerpo Sol --ubicacion 5 --horas 24
+    python -m rastreador.adaptativo --intervalo-clave 10    # con la cota del tick fijo
+"""
+import argparse
+import datetime
+import math
+
+from rastreador import config
+from rastreador.anticipacion import latencia_enlace
+from rastreador.mapeo import AZIMUT_AMANECER, AZIMUT_ATARDECER, SERVO_MAX_DEG
+
+# Intervalo clave de TransmisorDelta con el tick fijo
+INTERVALO_CLAVE_FIJO_S = 10.0
+# Paso de la diferencia finita
+DERIVADA_S = 1.0
+# Despertar un poco después del borde: con la estimación lineal, justo antes no cambia nada
+MARGEN_S = 0.005
+
+
+def objetivo_continuo(az, el, precisa=False):
+    """ (servo_az, servo_el) sin cuantizar, en unidades de la trama; None en el eje recortado """
+    escala = 10 if precisa else 1
+    if AZIMUT_AMANECER <= az <= AZIMUT_ATARDECER:
+        s_az = (az - AZIMUT_AMANECER) * SERVO_MAX_DEG * escala / (AZIMUT_ATARDECER - AZIMUT_AMANECER)
+    else:
+        s_az = None     # Recortado a un tope
+    s_el = el * escala if el > 0 else None
+    return s_az, s_el
+
+
+def _hasta(valor, velocidad, borde):
+    """ Segundos hasta que `valor` alcance `borde` en el sentido en que se mueve (infinito si no llega) """
+    if not velocidad:
+        return math.inf
+    t = (borde - valor) / velocidad
+    return t if t > 0 else math.inf
+
+
+def tiempo_hasta_borde(valor, velocidad, desplazamiento=0.0):
+    """
+    Segundos hasta que `valor` (que cambia a `velocidad` unidades/s) cruce un
+    borde de cuantización: enteros al truncar, medios (desplazamiento 0.5) al
+    redondear. Infinito si no se mueve.
+    """
+    if not velocidad:
+        return math.inf
+    base = math.floor(valor - desplazamiento) + desplazamiento
+    if velocidad > 0:
+        return (base + 1 - valor) / velocidad
+    return (valor - base) / -velocidad
+
+
+class Planificador:
+    """
+    calcular: segundos POSIX -> (az, el) en grados, escalar.
+    La espera devuelta queda en [periodo_min, periodo_max]; periodo_max es
+    también el intervalo clave que hay que darle al TransmisorDelta (`ajustar`).
+    """
+
+    def __init__(self, calcular, precisa=config.PROTOCOLO_PRECISO, binaria=config.PROTOCOLO_BINARIO,
+                 baudios=config.BAUD_RATE, periodo_max=config.INTERVALO_CLAVE_ADAPTATIVO):
+        self.calcular = calcular
+        self.precisa = precisa
+        self.periodo_min = latencia_enlace(binaria, baudios, precisa=precisa)
+        self.periodo_max = periodo_max
+        self.desplazamiento = 0.5 if precisa else 0.0
+
+    def ajustar(self, transmisor):
+        """ Alarga la trama clave del TransmisorDelta a periodo_max; si no, las claves dominan """
+        transmisor.intervalo_clave = self.periodo_max
+        return transmisor
+
+    def espera(self, segundos, az, el):
+        """ Segundos a dormir desde `segundos`, con (az, el) ya calculados para ese instante """
+        az2, el2 = self.calcular(segundos + DERIVADA_S)
+        s_az, s_el = objetivo_continuo(az, el, self.precisa)
+        escala = 10 if self.precisa else 1
+        v_az = ((az2 - az + 180) % 360 - 180) / DERIVADA_S
+        v_el = (el2 - el) / DERIVADA_S
+        espera = self.periodo_max
+        if s_az is None:
+            # En un tope: el objetivo cambia al entrar en la ventana o al cruzar el norte (270 -> 0)
+            for borde in (0, AZIMUT_AMANECER, AZIMUT_ATARDECER, 360):
+                espera = min(espera, _hasta(az, v_az, borde))
+        else:
+            v_servo = v_az * SERVO_MAX_DEG * escala / (AZIMUT_ATARDECER - AZIMUT_AMANECER)
+            espera = min(espera, tiempo_hasta_borde(s_az, v_servo, self.desplazamiento))
+        if s_el is None:
+            espera = min(espera, _hasta(el, v_el, 0))
+        else:
+            espera = min(espera, tiempo_hasta_borde(s_el, v_el * escala, self.desplazamiento))
+        return max(self.periodo_min, min(self.periodo_max, espera + MARGEN_S))
+
+
+def comparar(calcular_lote, inicio_s, horas=24, precisa=False, binaria=False, paso_fijo_s=1.0,
+             paso_evaluacion_s=0.1, intervalo_clave=config.INTERVALO_CLAVE_ADAPTATIVO):
+    """
+    Tick fijo frente a adaptativo sobre `horas` desde `inicio_s`, con
+    calcular_lote(segundos[]) -> (az[], el[]) (efemeride_sol/efemeride_cuerpo).
+    El fijo usa la trama clave de 10 s y el adaptativo `intervalo_clave`.
+
+    Por modo: cálculos (despertares), tramas enviadas por TransmisorDelta, y
+    atraso medio/máximo del objetivo sostenido respecto al ideal, en pasos de
+    cuantización, evaluado cada `paso_evaluacion_s`.
+    """
+    import numpy as np
+    from rastreador.delta import TransmisorDelta
+    from rastreador.mapeo import (elevacion_decimas, map_azimut, map_azimut_arr, map_azimut_decimas,
+                                  map_azimut_decimas_arr)
+    from rastreador.transporte import SerieNula
+
+    def cuantizar(az, el):
+        if precisa:
+            return map_azimut_decimas(az), elevacion_decimas(el)
+        return map_azimut(az), int(max(0, el))
+
+    fin_s = inicio_s + horas * 3600
+    t_eval = np.arange(inicio_s, fin_s + DERIVADA_S + intervalo_clave, paso_evaluacion_s)
+    az_e, el_e = calcular_lote(t_eval)
+    az_continuo = np.unwrap(np.radians(az_e))
+
+    def escalar(s):
+        # Misma efeméride que el ideal (la interpolada y la de ephem difieren ~0.01°)
+        return float(np.degrees(np.interp(s, t_eval, az_continuo)) % 360), float(np.interp(s, t_eval, el_e))
+    if precisa:
+        ideal = np.stack([map_azimut_decimas_arr(az_e), np.rint(np.maximum(0.0, el_e) * 10).astype(np.int64)])
+    else:
+        ideal = np.stack([map_azimut_arr(az_e), np.maximum(0.0, el_e).astype(np.int64)])
+
+    planificador = Planificador(escalar, precisa, binaria, periodo_max=intervalo_clave)
+    resultado = {}
+    for modo in ("fijo", "adaptativo"):
+        ahora = [inicio_s]
+        transmisor = TransmisorDelta(intervalo_clave=INTERVALO_CLAVE_FIJO_S, binaria=binaria, precisa=precisa,
+                                     reloj=lambda: ahora[0])
+        if modo == "adaptativo":
+            planificador.ajustar(transmisor)
+        serie = SerieNula()
+        instantes, objetivos = [], []
+        t = inicio_s
+        calculos = 0
+        while t < fin_s:
+            ahora[0] = t
+            az, el = escalar(t)
+            calculos += 1
+            objetivo = cuantizar(az, el)
+            transmisor.enviar(serie, objetivo[0], objetivo[1], "000000", 1)
+            instantes.append(t)
+            objetivos.append(objetivo)
+            if modo == "fijo":
+                t += paso_fijo_s
+            else:
+                t += planificador.espera(t, az, el)
+                calculos += 1   # La diferencia finita también cuesta una efeméride
+        # Objetivo sostenido en cada instante de evaluación
+        en_rango = t_eval < fin_s
+        i = np.searchsorted(np.array(instantes), t_eval[en_rango], side="right") - 1
+        sostenido = np.array(objetivos, dtype=np.int64)[i].T
+        atraso = np.abs(sostenido - ideal[:, en_rango]).max(axis=0)
+        r = transmisor.resumen()
+        resultado[modo] = {"calculos": calculos, "tramas": r["tramas_enviadas"],
+                           "atraso_medio": float(atraso.mean()), "atraso_max": int(atraso.max()),
+                           "al_dia_pct": 100.0 * float(np.mean(atraso == 0))}
+    return resultado
+
+
+def main():
+    from rastreador.cli import resolver_cuerpo, resolver_ubicacion
+    from rastreador.simulacion import efemeride_cuerpo
+
+    parser = argparse.ArgumentParser(description="Tick fijo de 1 s frente al tick adaptativo")
+    parser.add_argument("--cuerpo", type=lambda v: "Sol" if v.lower() == "sol" else resolver_cuerpo(v), default="Sol")
+    parser.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    parser.add_argument("--fecha", type=datetime.date.fromisoformat, default=None, help="Día UTC (por defecto hoy)")
+    parser.add_argument("--horas", type=float, default=24)
+    parser.add_argument("--precisa", action="store_true")
+    parser.add_argument("--intervalo-clave", type=float, default=config.INTERVALO_CLAVE_ADAPTATIVO,
+                        help="Segundos máximos entre tramas del modo adaptativo (hora de la LCD)")
+    args = parser.parse_args()
+
+    loc = config.LOCATIONS[args.ubicacion]
+    fecha = args.fecha or datetime.datetime.now(datetime.timezone.utc).date()
+    inicio = datetime.datetime.combine(fecha, datetime.time(), datetime.timezone.utc).timestamp()
+    calcular = efemeride_cuerpo(args.cuerpo, loc["coords"][0], loc["coords"][1], loc.get("elevation", 0))
+    r = comparar(calcular, inicio, args.horas, args.precisa, intervalo_clave=args.intervalo_clave)
+    print(f"{args.cuerpo} en {loc['name']}, {args.horas:g} h desde {fecha} 00:00 UTC"
+          f" ({'décimas' if args.precisa else 'grados'}; trama clave {INTERVALO_CLAVE_FIJO_S:g} s fijo,"
+          f" {args.intervalo_clave:g} s adaptativo)")
+    for modo, d in r.items():
+        print(f"{modo:>11}: {d['calculos']:6d} cálculos | {d['tramas']:5d} tramas | atraso medio "
+              f"{d['atraso_medio']:.3f} pasos, máx {d['atraso_max']} | al día {d['al_dia_pct']:.1f}%")
+    fijo, adaptativo = r["fijo"], r["adaptativo"]
+    print(f"Reducción: cálculos x{fijo['calculos'] / adaptativo['calculos']:.1f},"
+          f" tramas x{fijo['tramas'] / max(1, adaptativo['tramas']):.1f}")
+
+
+if __name__ == "__main__":
+    main()
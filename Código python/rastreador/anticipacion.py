@@ -0,0 +1,351 @@
+"""
+Anticipación: enviar dónde estará el cuerpo cuando el servo llegue.
+
+`servo_pwm_smooth` (FINAL-servo_controller.v) avanza una unidad de 12 bits
+cada SMOOTH_DELAY_US (623 µs en FINAL-top.v): cruzar todo el recorrido tarda
+2.55 s y, mientras tanto, el cuerpo sigue moviéndose. Con la Luna al arrancar,
+o en las simulaciones rápidas (un día de Marte cada 0.1 s), el servo persigue
+un objetivo viejo.
+
+Aquí se modela ese servo (rampa de 1 unidad por paso, escalado de décimas
+az*4095/2700 y el*4095/1800 de FINAL-top.v) más la latencia del enlace, y se busca por punto
+fijo el instante en que el servo alcanzaría el objetivo:
+
+    τ = recorrido(servo al llegar la trama, objetivo(t + latencia + τ + periodo/2))
+
+El medio periodo centra el objetivo que se sostiene entre dos tramas. El
+error de seguimiento es la separación angular (grados de cielo) entre donde
+apunta el panel y el cuerpo, recortado a la ventana alcanzable del mapeo. Se
+mide en régimen: las muestras antes de que el servo alcance por primera vez
+su objetivo (el giro inicial desde el centro del reset, igual con o sin
+anticipación) se cuentan aparte y no entran en el RMS.
+
+    python -m rastreador.anticipacion --cuerpo Marte --inicio 2024-10-01 \\
+        --fin 2025-05-01 --paso 86400 --velocidad 864000
+"""
+import argparse
+import collections
+import copy
+import datetime
+import math
+
+from rastreador import config
+from rastreador import trama as tramas
+from rastreador.mapeo import (AZIMUT_AMANECER, AZIMUT_ATARDECER, SERVO_MAX_DEG, elevacion_decimas, map_azimut,
+                              map_azimut_decimas)
+
+# --- MODELO DEL SERVO (FINAL-top.v / FINAL-servo_controller.v) ---
+PASO_SERVO_S = 623e-6       # SMOOTH_DELAY_US
+UNIDADES = 4095             # target_pos de 12 bits
+RANGO_AZ_FPGA = 2700        # servo_pos_az = az_decimas * 4095 / 2700
+RANGO_EL_FPGA = 1800        # servo_pos_el = el_decimas * 4095 / 1800
+POS_INICIAL = 2047          # current_pos tras el reset
+# Paso del reloj con el que se mide el error denso en las simulaciones
+PASO_EVALUACION_S = 0.010
+
+# El SPP del módulo Bluetooth suma unas decenas de ms a la UART
+LATENCIA_BT_S = 0.04
+ITERACIONES = 3
+
+
+def latencia_enlace(binaria=config.PROTOCOLO_BINARIO, baudios=config.BAUD_RATE, extra_s=LATENCIA_BT_S,
+                    precisa=config.PROTOCOLO_PRECISO):
+    """ Segundos desde write() hasta que la FPGA tiene la trama completa (8N1) """
+    if precisa:
+        largo = tramas.LARGO_PRECISA
+    else:
+        largo = tramas.LARGO_BINARIA if binaria else len(tramas.trama_ascii(0, 0, "000000", 1))
+    return largo * 10 / baudios + extra_s
+
+
+def a_unidades(az_dd, el_dd):
+    """ Décimas de grado de la trama -> target_pos, con la aritmética entera de FINAL-top.v """
+    u_az = UNIDADES if az_dd >= RANGO_AZ_FPGA else az_dd * UNIDADES // RANGO_AZ_FPGA
+    u_el = UNIDADES if el_dd >= RANGO_EL_FPGA else el_dd * UNIDADES // RANGO_EL_FPGA
+    return u_az, u_el
+
+
+def separacion(az1, el1, az2, el2):
+    """ Separación angular en grados entre dos direcciones (az, el) """
+    e1, e2 = math.radians(el1), math.radians(el2)
+    c = (math.sin(e1) * math.sin(e2)
+         + math.cos(e1) * math.cos(e2) * math.cos(math.radians(az1 - az2)))
+    return math.degrees(math.acos(max(-1.0, min(1.0, c))))
+
+
+def alcanzable(az, el, amanecer=AZIMUT_AMANECER, atardecer=AZIMUT_ATARDECER, servo_max=SERVO_MAX_DEG):
+    """ La dirección más cercana al cuerpo que el mapeo puede apuntar """
+    return min(max(az, amanecer), atardecer), max(0.0, el)
+
+
+class ModeloServo:
+    """
+    Los dos servo_pwm_smooth: cada PASO_SERVO_S se mueven una unidad hacia
+    target_pos. Las tramas en vuelo se aplican al llegar (`ordenar`), en
+    grados enteros o, con `precisa`, en décimas.
+    """
+
+    def __init__(self, paso_s=PASO_SERVO_S, inicial=POS_INICIAL, mapeo=None, precisa=False):
+        self.paso_s = paso_s
+        self.mapeo = mapeo or {}
+        self.escala = 1 if precisa else 10
+        self.pos = [inicial, inicial]
+        self.objetivo = [inicial, inicial]
+        self.t = None
+        self.pendientes = collections.deque()   # (t_llegada, (u_az, u_el))
+        self.ordenado = False
+        self.adquirido = False      # Ya alcanzó alguna vez un objetivo ordenado
+
+    def ordenar(self, t_llegada, servo_az, servo_el):
+        self.pendientes.append((t_llegada, a_unidades(servo_az * self.escala, servo_el * self.escala)))
+
+    def _mover_hasta(self, t):
+        if self.t is None:
+            self.t = t
+            return
+        n = int((t - self.t) / self.paso_s + 1e-9)
+        if n <= 0:
+            return
+        self.t += n * self.paso_s
+        for i in (0, 1):
+            self.pos[i] += max(-n, min(n, self.objetivo[i] - self.pos[i]))
+
+    def avanzar_hasta(self, t):
+        while self.pendientes and self.pendientes[0][0] <= t:
+            llegada, objetivo = self.pendientes.popleft()
+            self._mover_hasta(llegada)
+            self.objetivo = list(objetivo)
+            self.ordenado = True
+        self._mover_hasta(t)
+        if self.ordenado and self.pos == self.objetivo:
+            self.adquirido = True
+
+    def prever(self, t):
+        """ Copia del modelo avanzada hasta `t` (no toca el estado) """
+        futuro = copy.copy(self)
+        futuro.pos = list(self.pos)
+        futuro.objetivo = list(self.objetivo)
+        futuro.pendientes = collections.deque(self.pendientes)
+        futuro.avanzar_hasta(t)
+        return futuro
+
+    def tiempo_hasta(self, servo_az, servo_el):
+        """ (s_az, s_el) que tarda cada eje en alcanzar ese objetivo desde la posición actual """
+        u_az, u_el = a_unidades(servo_az * self.escala, servo_el * self.escala)
+        return abs(u_az - self.pos[0]) * self.paso_s, abs(u_el - self.pos[1]) * self.paso_s
+
+    def apunta(self):
+        """ (az, el) de cielo hacia donde apunta el panel ahora """
+        amanecer = self.mapeo.get("amanecer", AZIMUT_AMANECER)
+        atardecer = self.mapeo.get("atardecer", AZIMUT_ATARDECER)
+        servo_max = self.mapeo.get("servo_max", SERVO_MAX_DEG)
+        servo_az = self.pos[0] * RANGO_AZ_FPGA / UNIDADES / 10
+        return (amanecer + servo_az * (atardecer - amanecer) / servo_max,
+                self.pos[1] * RANGO_EL_FPGA / UNIDADES / 10)
+
+
+class ErrorSeguimiento:
+    """ RMS, media y máximo de muestras de error (grados) en memoria constante """
+
+    def __init__(self):
+        self.adquisicion = 0        # Muestras descartadas antes de la primera llegada
+        self.n = 0
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self.maximo = 0.0
+
+    def agregar(self, grados):
+        self.n += 1
+        self.suma += grados
+        self.suma_cuadrados += grados * grados
+        self.maximo = max(self.maximo, grados)
+
+    def agregar_modelo(self, modelo, ideal):
+        """ Error de `modelo` contra la dirección `ideal`, solo en régimen """
+        if modelo.adquirido:
+            self.agregar(separacion(*modelo.apunta(), *ideal))
+        else:
+            self.adquisicion += 1
+
+    def resumen(self):
+        if not self.n:
+            return {"n": 0, "adquisicion": self.adquisicion, "rms_deg": 0.0, "medio_deg": 0.0, "max_deg": 0.0}
+        return {"n": self.n, "adquisicion": self.adquisicion, "rms_deg": math.sqrt(self.suma_cuadrados / self.n),
+                "medio_deg": self.suma / self.n, "max_deg": self.maximo}
+
+
+def _describir_modo(nombre, r):
+    if not r["n"]:
+        # RMS 0.00° parecería seguimiento perfecto: el servo nunca llegó a su objetivo
+        return f"{nombre} sin muestras en régimen"
+    return f"{nombre} RMS {r['rms_deg']:.2f}° medio {r['medio_deg']:.2f}° máx {r['max_deg']:.2f}°"
+
+
+def describir(error):
+    """ Una línea con {"directo": resumen, "anticipado": resumen} """
+    d, a = error["directo"], error["anticipado"]
+    return (f"Error de seguimiento en régimen: {_describir_modo('directo', d)} | "
+            f"{_describir_modo('anticipado', a)} | muestras descartadas durante el giro inicial: "
+            f"directo {d['adquisicion']}, anticipado {a['adquisicion']}")
+
+
+class Anticipador:
+    """
+    Decide qué objetivo enviar en cada tick.
+
+    posicion: segundos POSIX (tiempo simulado) -> (az, el) del cuerpo.
+    periodo_s: segundos de pared entre tramas; velocidad: segundos simulados
+    por segundo de pared (1 en tiempo real).
+    Lleva un segundo modelo "sombra" con los objetivos sin anticipar para
+    informar cuánto error se ahorra.
+    """
+
+    def __init__(self, posicion, periodo_s, velocidad=1.0, latencia_s=None, mapeo=None,
+                 paso_servo_s=PASO_SERVO_S, iteraciones=ITERACIONES, precisa=False, binaria=False):
+        self.posicion = posicion
+        self.periodo_s = periodo_s
+        self.velocidad = velocidad
+        self.latencia_s = latencia_enlace(binaria, precisa=precisa) if latencia_s is None else latencia_s
+        self.mapeo = mapeo or {}
+        self.iteraciones = iteraciones
+        self.precisa = precisa
+        self.servo = ModeloServo(paso_servo_s, mapeo=self.mapeo, precisa=precisa)
+        self.sombra = ModeloServo(paso_servo_s, mapeo=self.mapeo, precisa=precisa)
+        self.error_directo = ErrorSeguimiento()
+        self.error_anticipado = ErrorSeguimiento()
+
+    def _objetivo(self, az, el):
+        if self.precisa:
+            return map_azimut_decimas(az, **self.mapeo), elevacion_decimas(el)
+        return map_azimut(az, **self.mapeo), int(max(0, el))
+
+    def paso(self, w, t_sim, az, el):
+        """
+        w: reloj de pared (s) al enviar; t_sim: instante simulado; az/el: el
+        cuerpo en t_sim. Devuelve (servo_az, servo_el) anticipados.
+        """
+        ideal = alcanzable(az, el, **self.mapeo)
+        for modelo, error in ((self.sombra, self.error_directo), (self.servo, self.error_anticipado)):
+            modelo.avanzar_hasta(w)
+            error.agregar_modelo(modelo, ideal)
+        llegada = w + self.latencia_s
+        self.sombra.ordenar(llegada, *self._objetivo(az, el))
+
+        # Punto fijo por eje (se mueven a la vez): dónde estará el cuerpo cuando cada eje llegue
+        futuro = self.servo.prever(llegada)
+        tau_az = tau_el = 0.0
+        for _ in range(self.iteraciones):
+            servo_az = self._objetivo(*self._posicion(t_sim, tau_az))[0]
+            servo_el = self._objetivo(*self._posicion(t_sim, tau_el))[1]
+            tau_az, tau_el = futuro.tiempo_hasta(servo_az, servo_el)
+        self.servo.ordenar(llegada, servo_az, servo_el)
+        return servo_az, servo_el
+
+    def _posicion(self, t_sim, tau):
+        return self.posicion(t_sim + (self.latencia_s + tau + self.periodo_s / 2) * self.velocidad)
+
+    def resumen(self):
+        return {"directo": self.error_directo.resumen(), "anticipado": self.error_anticipado.resumen()}
+
+
+def trayectoria_tramas(t, az, el):
+    """
+    Función segundos -> (az, el) que interpola linealmente entre las tramas
+    (azimut sin saltos en 0/360). Es la trayectoria que muestra la demo: con
+    una trama por día (Marte) la efeméride continua daría una vuelta diaria
+    entre trama y trama que el panel nunca debe seguir.
+    """
+    import numpy as np
+
+    az_continuo = np.degrees(np.unwrap(np.radians(az)))
+
+    def posicion(segundos):
+        return (np.interp(segundos, t, az_continuo) % 360, np.interp(segundos, t, el))
+    return posicion
+
+
+def _error_denso(posicion, inicio_sim, velocidad, comandos, latencia_s, fin_w, mapeo, paso_servo_s, precisa):
+    """ Error cada PASO_EVALUACION_S de pared (no solo en los ticks) """
+    import numpy as np
+
+    w = np.arange(0.0, fin_w, PASO_EVALUACION_S)
+    az, el = posicion(inicio_sim + w * velocidad)
+    modelo = ModeloServo(paso_servo_s, mapeo=mapeo, precisa=precisa)
+    for wk, servo_az, servo_el in comandos:
+        modelo.ordenar(wk + latencia_s, servo_az, servo_el)
+    error = ErrorSeguimiento()
+    for i in range(len(w)):
+        modelo.avanzar_hasta(w[i])
+        error.agregar_modelo(modelo, alcanzable(float(az[i]), float(el[i]), **mapeo))
+    return error.resumen()
+
+
+def anticipar_simulacion(datos, velocidad, intervalo_s, latencia_s=None, mapeo=None, paso_servo_s=PASO_SERVO_S,
+                         precisa=False, binaria=False):
+    """
+    Para MotorSimulacion: reemplaza servo_az/servo_el de `datos` por objetivos
+    anticipados (la trama i sale a i*intervalo_s de pared) y añade
+    datos["error"] con el error directo y anticipado, medido cada paso del
+    servo contra trayectoria_tramas. Con `precisa` los objetivos van en décimas;
+    `binaria` solo cambia la latencia por defecto (trama de 7 bytes).
+    """
+    import numpy as np
+
+    mapeo = mapeo or {}
+    latencia_s = latencia_enlace(binaria, precisa=precisa) if latencia_s is None else latencia_s
+    t = datos["t"]
+    if not len(t):
+        return dict(datos, error={"directo": ErrorSeguimiento().resumen(),
+                                  "anticipado": ErrorSeguimiento().resumen()})
+    trayectoria = trayectoria_tramas(t, datos["az"], datos["el"])
+
+    def posicion(segundos):
+        az, el = trayectoria(segundos)
+        return float(az), float(el)
+
+    anticipador = Anticipador(posicion, intervalo_s, velocidad, latencia_s, mapeo, paso_servo_s, precisa=precisa,
+                              binaria=binaria)
+    directos = list(zip(datos["servo_az"].tolist(), datos["servo_el"].tolist()))
+    anticipados = [anticipador.paso(i * intervalo_s, float(t[i]), float(datos["az"][i]), float(datos["el"][i]))
+                   for i in range(len(t))]
+
+    fin_w = len(t) * intervalo_s
+    datos = dict(datos)
+    datos["error"] = {
+        nombre: _error_denso(trayectoria, float(t[0]), velocidad,
+                             [(i * intervalo_s, a, e) for i, (a, e) in enumerate(comandos)],
+                             latencia_s, fin_w, mapeo, paso_servo_s, precisa)
+        for nombre, comandos in (("directo", directos), ("anticipado", anticipados))}
+    datos["servo_az"] = np.array([a for a, _ in anticipados], dtype=np.int64)
+    datos["servo_el"] = np.array([e for _, e in anticipados], dtype=np.int64)
+    return datos
+
+
+def main():
+    from rastreador.simulacion import MotorSimulacion, SalidaMemoria, efemeride_cuerpo
+
+    parser = argparse.ArgumentParser(description="Error de seguimiento con y sin anticipación")
+    parser.add_argument("--cuerpo", default="Sol")
+    parser.add_argument("--lat", type=float, default=config.LOCATIONS[1]["coords"][0])
+    parser.add_argument("--lon", type=float, default=config.LOCATIONS[1]["coords"][1])
+    parser.add_argument("--inicio", required=True, help="Fecha ISO en UTC")
+    parser.add_argument("--fin", required=True)
+    parser.add_argument("--paso", type=float, default=600, help="Segundos simulados por trama")
+    parser.add_argument("--velocidad", type=float, default=600 / 0.15, help="Múltiplo del tiempo real")
+    parser.add_argument("--latencia", type=float, default=None, help="Segundos hasta la FPGA")
+    parser.add_argument("--precisa", action="store_true", help="Objetivos en décimas de grado (trama precisa)")
+    parser.add_argument("--binaria", action="store_true", help="Latencia de la trama de 7 bytes")
+    args = parser.parse_args()
+
+    inicio = datetime.datetime.fromisoformat(args.inicio).replace(tzinfo=datetime.timezone.utc)
+    fin = datetime.datetime.fromisoformat(args.fin).replace(tzinfo=datetime.timezone.utc)
+    motor = MotorSimulacion(efemeride_cuerpo(args.cuerpo, args.lat, args.lon), inicio, fin, args.paso,
+                            velocidad=args.velocidad, anticipar=True, latencia_s=args.latencia, precisa=args.precisa,
+                            binaria=args.binaria)
+    datos = motor.ejecutar(SalidaMemoria())
+    print(f"{len(datos['t'])} tramas de {args.cuerpo}, una cada {args.paso / args.velocidad * 1000:.0f} ms")
+    print(describir(datos["error"]))
+
+
+if __name__ == "__main__":
+    main()
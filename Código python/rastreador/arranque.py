@@ -0,0 +1,97 @@
+"""
+Informe de arranque: qué importa cada modo y cuánto tarda la primera trama.
+
+El watchdog reinicia el rastreador cuando se cae el enlace; cada segundo de
+arranque es un segundo con el panel quieto. Aquí se lanza
+`python -m rastreador <modo>` contra un pty (DispositivoFalso) y se mide
+desde el fork hasta el primer byte que llega al "FPGA":
+
+    python -m rastreador arranque                    # modo sol
+    python -m rastreador arranque --repeticiones 10 celeste Luna
+
+Con una corrida extra bajo `-X importtime` se listan los módulos que más
+pesan, para ver qué import se coló en el camino de arranque.
+"""
+import os
+import select
+import subprocess
+import sys
+import time
+
+DIRECTORIO_SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Objetivo: proceso nuevo -> primera trama en el puerto
+OBJETIVO_PRIMERA_TRAMA_S = 1.0
+TIMEOUT_S = 30.0
+
+
+def _lanzar(args_modo, ruta, importtime=False):
+    comando = [sys.executable]
+    if importtime:
+        comando += ["-X", "importtime"]
+    comando += ["-m", "rastreador", "--puerto", ruta] + list(args_modo)
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [DIRECTORIO_SCRIPTS,
+                                                                        os.environ.get("PYTHONPATH")])))
+    return subprocess.Popen(comando, cwd=DIRECTORIO_SCRIPTS, env=entorno, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE if importtime else subprocess.DEVNULL)
+
+
+def primera_trama(args_modo, importtime=False, timeout=TIMEOUT_S):
+    """ (segundos hasta el primer byte, stderr del proceso) para un arranque en frío """
+    from rastreador.flota import DispositivoFalso
+
+    disp = DispositivoFalso()
+    try:
+        t0 = time.perf_counter()
+        proceso = _lanzar(args_modo, disp.ruta, importtime)
+        listo = select.select([disp.maestro], [], [], timeout)[0]
+        transcurrido = time.perf_counter() - t0 if listo else None
+        proceso.terminate()
+        _, stderr = proceso.communicate(timeout=5)
+    finally:
+        disp.cerrar()
+    return transcurrido, (stderr or b"").decode("utf-8", "replace")
+
+
+def analizar_importtime(texto):
+    """ (total_s, [(cumulativo_s, modulo)] de los imports de primer nivel, de mayor a menor) """
+    total = 0
+    primer_nivel = []
+    for linea in texto.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, modulo = linea[len("import time:"):].split("|")
+        total += int(propio)
+        if not modulo.startswith("  "):     # Sin sangría extra: importado por el programa, no por otro módulo
+            primer_nivel.append((int(acumulado) / 1e6, modulo.strip()))
+    primer_nivel.sort(reverse=True)
+    return total / 1e6, primer_nivel
+
+
+def informe(args_modo, repeticiones=5, top=12, mostrar=print):
+    """ Imprime el informe y devuelve {p50_s, min_s, max_s, objetivo_s, cumple, imports_s} """
+    # Corrida de calentamiento: compila los .pyc para no medir la compilación
+    primera_trama(args_modo)
+
+    tiempos = []
+    for _ in range(repeticiones):
+        t, _ = primera_trama(args_modo)
+        if t is None:
+            mostrar(f"Sin trama en {TIMEOUT_S:.0f} s: ¿el modo '{' '.join(args_modo)}' envía algo?")
+            return None
+        tiempos.append(t)
+    tiempos.sort()
+
+    _, stderr = primera_trama(args_modo, importtime=True)
+    total, modulos = analizar_importtime(stderr)
+
+    mostrar(f"Modo: {' '.join(args_modo)}")
+    mostrar(f"Imports registrados: {total * 1000:.1f} ms. Los más pesados:")
+    for acumulado, modulo in modulos[:top]:
+        mostrar(f"  {acumulado * 1000:8.1f} ms  {modulo}")
+    p50 = tiempos[len(tiempos) // 2]
+    cumple = p50 <= OBJETIVO_PRIMERA_TRAMA_S
+    mostrar(f"Arranque en frío -> primera trama ({repeticiones} corridas): p50 {p50 * 1000:.0f} ms, "
+            f"min {tiempos[0] * 1000:.0f} ms, max {tiempos[-1] * 1000:.0f} ms "
+            f"(objetivo {OBJETIVO_PRIMERA_TRAMA_S * 1000:.0f} ms: {'OK' if cumple else 'NO CUMPLE'})")
+    return {"p50_s": p50, "min_s": tiempos[0], "max_s": tiempos[-1],
+            "objetivo_s": OBJETIVO_PRIMERA_TRAMA_S, "cumple": cumple, "imports_s": total}
@@ -0,0 +1,193 @@
+"""
+Runtime asyncio del rastreador.
+
+Sustituye el bucle bloqueante `while True: ... time.sleep(1)` por tres tareas:
+
+- cálculo: en cada tick del Planificador llama a `productor(instante)` y
+  encola la trama resultante;
+- escritura: vacía la cola hacia el puerto serie en un hilo aparte, así un
+  `write` lento no retrasa el siguiente cálculo;
+- control: lee órdenes de stdin sin bloquear (p=pausa, r=seguir, s=estado,
+  q=salir).
+
+El Planificador usa plazos absolutos (t0 + k*periodo), por lo que el tiempo
+de cálculo y escritura no se acumula como deriva, y mide el jitter de cada
+despertar.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import select
+import sys
+import threading
+import time
+
+VENTANA_JITTER = 600     # Muestras para p50/p99 de jitter
+COTA_JITTER_S = 0.020    # Despertares más tarde que esto cuentan como fuera de cota
+
+
+class Planificador:
+    """ Ticks a tasa fija con compensación de deriva y estadísticas de jitter """
+
+    def __init__(self, periodo, cota_jitter=COTA_JITTER_S, reloj=time.monotonic):
+        self.periodo = periodo
+        self.cota_jitter = cota_jitter
+        self._reloj = reloj
+        self.t0 = None
+        self.k = 0
+        self.jitter = collections.deque(maxlen=VENTANA_JITTER)
+        self.ticks = 0
+        self.ticks_perdidos = 0
+        self.fuera_de_cota = 0
+
+    async def esperar(self):
+        """ Duerme hasta el siguiente plazo; devuelve el retraso (s) con el que se despertó """
+        ahora = self._reloj()
+        if self.t0 is None:
+            self.t0 = ahora
+            self.ticks += 1
+            return 0.0
+        self.k += 1
+        plazo = self.t0 + self.k * self.periodo
+        if ahora > plazo + self.periodo:
+            # Vamos más de un periodo atrasados: saltar ticks en vez de encadenarlos
+            saltados = int((ahora - plazo) // self.periodo)
+            self.ticks_perdidos += saltados
+            self.k += saltados
+            plazo = self.t0 + self.k * self.periodo
+        await asyncio.sleep(max(0.0, plazo - ahora))
+        retraso = self._reloj() - plazo
+        self.ticks += 1
+        self.jitter.append(retraso)
+        if abs(retraso) > self.cota_jitter:
+            self.fuera_de_cota += 1
+        return retraso
+
+    def estadisticas(self):
+        muestras = sorted(self.jitter)
+        if not muestras:
+            return {"ticks": self.ticks}
+        pct = lambda p: muestras[min(len(muestras) - 1, int(p * len(muestras)))]
+        return {
+            "ticks": self.ticks,
+            "ticks_perdidos": self.ticks_perdidos,
+            "fuera_de_cota": self.fuera_de_cota,
+            "jitter_p50_ms": 1000 * pct(0.50),
+            "jitter_p99_ms": 1000 * pct(0.99),
+            "jitter_max_ms": 1000 * muestras[-1],
+        }
+
+
+class EscritorSerie:
+    """ Cola de tramas hacia el puerto; el write bloqueante corre en un hilo propio """
+
+    def __init__(self, bt_serial, capacidad=8):
+        self.bt_serial = bt_serial
+        self.cola = asyncio.Queue(maxsize=capacidad)
+        self._hilo = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="serie")
+        self.descartadas = 0
+        self.escritas = 0
+
+    def encolar(self, datos):
+        """ No bloquea: si la cola está llena se descarta la trama más vieja """
+        if self.cola.full():
+            self.cola.get_nowait()
+            self.descartadas += 1
+        self.cola.put_nowait(datos)
+
+    async def ejecutar(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                datos = await self.cola.get()
+                await loop.run_in_executor(self._hilo, self.bt_serial.write, datos)
+                self.escritas += 1
+        finally:
+            self._hilo.shutdown(wait=False)
+
+
+class Rastreo:
+    """ Junta planificador, escritor y control para un `productor(instante) -> bytes | None` """
+
+    def __init__(self, bt_serial, productor, periodo=1.0, mostrar=print):
+        self.productor = productor
+        self.planificador = Planificador(periodo)
+        self.escritor = EscritorSerie(bt_serial)
+        self.mostrar = mostrar
+        self.pausado = False
+        self.fin = None
+        self._parar_control = threading.Event()
+
+    async def tarea_calculo(self):
+        while True:
+            await self.planificador.esperar()
+            if self.pausado:
+                continue
+            datos = self.productor(time.time())
+            if datos:
+                self.escritor.encolar(datos)
+
+    async def tarea_control(self):
+        """ Órdenes de una letra por stdin, leídas sin bloquear el event loop """
+        loop = asyncio.get_running_loop()
+        lineas = asyncio.Queue()
+
+        # Hilo demonio sobre el mismo sys.stdin que usa input() en los menús,
+        # para no perder líneas que ya estén en su búfer. Solo lee cuando hay
+        # datos, así al salir no se queda con la siguiente línea del menú.
+        def leer():
+            while not self._parar_control.is_set():
+                if not select.select([sys.stdin], [], [], 0.2)[0]:
+                    continue
+                linea = sys.stdin.readline()
+                loop.call_soon_threadsafe(lineas.put_nowait, linea)
+                if not linea or linea.strip().lower() == 'q':
+                    return
+        threading.Thread(target=leer, daemon=True).start()
+
+        while True:
+            linea = await lineas.get()
+            if not linea:
+                return
+            orden = linea.strip().lower()
+            if orden == 'p':
+                self.pausado = True
+                self.mostrar("Pausado.")
+            elif orden == 'r':
+                self.pausado = False
+                self.mostrar("Reanudado.")
+            elif orden == 's':
+                self.mostrar(self.estado())
+            elif orden == 'q':
+                self.fin.set()
+                return
+
+    def estado(self):
+        est = self.planificador.estadisticas()
+        est.update(escritas=self.escritor.escritas, descartadas=self.escritor.descartadas,
+                   en_cola=self.escritor.cola.qsize())
+        return est
+
+    async def ejecutar(self, con_control=True):
+        self.fin = asyncio.Event()
+        tareas = [asyncio.create_task(self.tarea_calculo()),
+                  asyncio.create_task(self.escritor.ejecutar())]
+        if con_control:
+            tareas.append(asyncio.create_task(self.tarea_control()))
+        try:
+            await self.fin.wait()
+        finally:
+            self._parar_control.set()
+            for t in tareas:
+                t.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+        return self.estado()
+
+
+def ejecutar_rastreo(bt_serial, productor, periodo=1.0, con_control=True):
+    """ Punto de entrada síncrono para los scripts; devuelve las estadísticas finales """
+    rastreo = Rastreo(bt_serial, productor, periodo)
+    try:
+        return asyncio.run(rastreo.ejecutar(con_control))
+    except KeyboardInterrupt:
+        return rastreo.estado()
@@ -0,0 +1,209 @@
+"""
+Barrido de sitios y fechas para planificar una instalación.
+
+En vez de correr `modo_simulacion` a mano por ciudad y fecha, se reparte
+(sitio, mes) en un pool de procesos; cada tarea calcula todas las
+posiciones del mes de una vez con `posicion_solar` y devuelve una fila por
+día:
+
+    horas_sol       sol sobre el horizonte
+    horas_ventana   sol arriba y dentro de AZIMUT_AMANECER-AZIMUT_ATARDECER
+    horas_tope      sol arriba con el servo clavado en 0 o 270
+    recorrido_az    grados que recorre el servo de azimut en el día (objetivos
+    recorrido_el    de map_azimut, incluido el regreso por la noche)
+    el_max          elevación máxima
+
+El "día" es el día solar medio local (00:00 UTC - lon/15 h), así la puesta
+no queda partida en dos fechas UTC. Las filas se escriben a medida que
+terminan las tareas (sin orden entre sitios y meses), en CSV o, si la ruta
+acaba en .parquet, con pyarrow.
+
+    python -m rastreador.barrido --inicio 2025-01-01 --fin 2026-01-01 --salida sitios.csv
+    python -m rastreador.barrido --sitio Bogotá --sitio 6.25,-75.56,1495 --salida medellin.parquet
+"""
+import argparse
+import concurrent.futures
+import csv
+import datetime
+import os
+import time
+
+from rastreador import config
+from rastreador.mapeo import AZIMUT_AMANECER, AZIMUT_ATARDECER
+
+PASO_S = 60
+COLUMNAS = ["sitio", "fecha", "lat", "lon", "horas_sol", "horas_ventana", "horas_tope",
+            "recorrido_az", "recorrido_el", "el_max"]
+
+
+def resolver_sitio(valor, ubicaciones=config.LOCATIONS):
+    """ ID o nombre de LOCATIONS, o "lat,lon[,elevación]" -> (nombre, lat, lon, elevación) """
+    partes = valor.split(",")
+    if len(partes) in (2, 3):
+        try:
+            numeros = [float(p) for p in partes]
+        except ValueError:
+            pass
+        else:
+            return valor, numeros[0], numeros[1], numeros[2] if len(numeros) > 2 else 0.0
+    from rastreador.cli import resolver_ubicacion
+    loc = ubicaciones[resolver_ubicacion(valor, ubicaciones)]
+    return loc["name"], loc["coords"][0], loc["coords"][1], loc.get("elevation", 0)
+
+
+def metricas_dias(sitio, primer_dia, dias, paso_s=PASO_S):
+    """
+    Filas (dict con COLUMNAS) de `dias` días solares desde `primer_dia`
+    (datetime.date) para sitio = (nombre, lat, lon, elevación).
+    """
+    import numpy as np
+    from rastreador.mapeo import map_azimut_arr
+    from rastreador.solar import posicion_solar
+
+    nombre, lat, lon, elevacion = sitio
+    por_dia = int(86400 // paso_s)
+    inicio = (datetime.datetime.combine(primer_dia, datetime.time(), datetime.timezone.utc).timestamp()
+              - lon / 15.0 * 3600)
+    segundos = inicio + np.arange(dias * por_dia, dtype=np.float64) * paso_s
+    az, el = posicion_solar(segundos, [(lat, lon, elevacion)])
+    az = az[0].reshape(dias, por_dia)
+    el = el[0].reshape(dias, por_dia)
+
+    arriba = el > 0
+    ventana = (az >= AZIMUT_AMANECER) & (az <= AZIMUT_ATARDECER)
+    # El servo sigue el objetivo de los scripts: map_azimut y elevación entera, 0 de noche
+    servo_az = map_azimut_arr(az).astype(np.float64)
+    servo_el = np.maximum(0.0, el).astype(np.int64).astype(np.float64)
+    # Recorrido desde el último objetivo del día anterior (o el primero, para el día 0)
+    previo_az = np.concatenate([servo_az[:1, :1], servo_az[:-1, -1:]])
+    previo_el = np.concatenate([servo_el[:1, :1], servo_el[:-1, -1:]])
+    recorrido_az = np.abs(np.diff(np.concatenate([previo_az, servo_az], axis=1), axis=1)).sum(axis=1)
+    recorrido_el = np.abs(np.diff(np.concatenate([previo_el, servo_el], axis=1), axis=1)).sum(axis=1)
+
+    horas = paso_s / 3600.0
+    horas_sol = arriba.sum(axis=1) * horas
+    horas_ventana = (arriba & ventana).sum(axis=1) * horas
+    return [{"sitio": nombre, "fecha": (primer_dia + datetime.timedelta(days=d)).isoformat(),
+             "lat": lat, "lon": lon,
+             "horas_sol": round(float(horas_sol[d]), 3), "horas_ventana": round(float(horas_ventana[d]), 3),
+             "horas_tope": round(float(horas_sol[d] - horas_ventana[d]), 3),
+             "recorrido_az": float(recorrido_az[d]), "recorrido_el": float(recorrido_el[d]),
+             "el_max": round(float(el[d].max()), 3)}
+            for d in range(dias)]
+
+
+def tareas(sitios, inicio, fin):
+    """ [(sitio, primer_dia, dias)]: un mes calendario (recortado a [inicio, fin)) por sitio """
+    lista = []
+    for sitio in sitios:
+        dia = inicio
+        while dia < fin:
+            siguiente = (dia.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+            hasta = min(siguiente, fin)
+            lista.append((sitio, dia, (hasta - dia).days))
+            dia = hasta
+    return lista
+
+
+class EscritorCSV:
+    def __init__(self, ruta):
+        self.f = open(ruta, "w", newline="", encoding="utf-8")
+        self.w = csv.DictWriter(self.f, fieldnames=COLUMNAS)
+        self.w.writeheader()
+
+    def escribir(self, filas):
+        self.w.writerows(filas)
+        self.f.flush()
+
+    def cerrar(self):
+        self.f.close()
+
+
+class EscritorParquet:
+    """ Un row group por tarea terminada (requiere pyarrow) """
+
+    def __init__(self, ruta):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("La salida .parquet requiere pyarrow (pip install pyarrow); use .csv") from None
+        self.pa = pa
+        self.esquema = pa.schema([("sitio", pa.string()), ("fecha", pa.string())]
+                                 + [(c, pa.float64()) for c in COLUMNAS[2:]])
+        self.w = pq.ParquetWriter(ruta, self.esquema)
+
+    def escribir(self, filas):
+        self.w.write_table(self.pa.Table.from_pylist(filas, schema=self.esquema))
+
+    def cerrar(self):
+        self.w.close()
+
+
+def abrir_escritor(ruta):
+    return EscritorParquet(ruta) if ruta.lower().endswith(".parquet") else EscritorCSV(ruta)
+
+
+def _ejecutar(tarea, paso_s):
+    sitio, primer_dia, dias = tarea
+    return metricas_dias(sitio, primer_dia, dias, paso_s)
+
+
+def barrer(sitios, inicio, fin, escritor=None, paso_s=PASO_S, trabajadores=None):
+    """
+    Reparte (sitio, mes) en `trabajadores` procesos (todos los núcleos por
+    defecto; 1 = en este proceso) y va escribiendo las filas al terminar cada
+    tarea. Devuelve el número de filas.
+    """
+    lista = tareas(sitios, inicio, fin)
+    filas = 0
+    if trabajadores == 1:
+        resultados = (_ejecutar(t, paso_s) for t in lista)
+        pool = None
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=trabajadores)
+        futuros = [pool.submit(_ejecutar, t, paso_s) for t in lista]
+        resultados = (f.result() for f in concurrent.futures.as_completed(futuros))
+    try:
+        for r in resultados:
+            if escritor:
+                escritor.escribir(r)
+            filas += len(r)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Métricas diarias por sitio y fecha en paralelo")
+    parser.add_argument("--sitio", action="append", type=resolver_sitio,
+                        help="ID/nombre de LOCATIONS o lat,lon[,elevación]; repetible (por defecto todas)")
+    parser.add_argument("--inicio", type=datetime.date.fromisoformat, default=None,
+                        help="Primer día (por defecto el 1 de enero de este año)")
+    parser.add_argument("--fin", type=datetime.date.fromisoformat, default=None,
+                        help="Día siguiente al último (por defecto un año después del inicio)")
+    parser.add_argument("--paso", type=float, default=PASO_S, help="Segundos entre muestras")
+    parser.add_argument("--trabajadores", type=int, default=None, help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--salida", default="barrido.csv", help="Ruta .csv o .parquet")
+    args = parser.parse_args()
+
+    sitios = args.sitio or [resolver_sitio(str(k)) for k in config.LOCATIONS]
+    inicio = args.inicio or datetime.date(datetime.date.today().year, 1, 1)
+    fin = args.fin or inicio.replace(year=inicio.year + 1)
+    try:
+        escritor = abrir_escritor(args.salida)
+    except RuntimeError as e:
+        parser.error(str(e))
+    t0 = time.perf_counter()
+    try:
+        filas = barrer(sitios, inicio, fin, escritor, args.paso, args.trabajadores)
+    finally:
+        escritor.cerrar()
+    trabajadores = args.trabajadores or os.cpu_count()
+    print(f"{filas} días-sitio ({len(sitios)} sitios, {inicio} a {fin}) en {time.perf_counter() - t0:.2f} s "
+          f"con {trabajadores} procesos -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmarks de los caminos calientes: efemérides, mapeo y tramas.
+
+Corre sin hardware (las tramas van a SerieNula) y mide:
+
+- latencia por llamada (p50/p95 en µs) de `get_azimuth`/`get_altitude`,
+  `obtener_posicion_cuerpo`, `map_azimut` y `enviar_trama` de cada script
+  (v5...v8 o los que se pidan), por ubicación y por cuerpo;
+- rendimiento por lotes (instantes/s) sobre un día a 1 min y un año a
+  10 min, con pysolar en bucle y con los motores de `rastreador`.
+
+El resultado es JSON para poder comparar entre versiones y entre máquinas:
+
+    python -m rastreador.benchmark --salida base.json
+    python -m rastreador.benchmark --scripts v8 --comparar base.json
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from rastreador.transporte import SerieNula
+
+DIRECTORIO_SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["v5", "v6", "v7", "v8"]
+TIEMPO_MIN_S = 0.2          # Tiempo mínimo medido por caso (latencia)
+INICIO = datetime.datetime(2025, 3, 20, tzinfo=datetime.timezone.utc)
+
+
+def cargar_script(version):
+    """ Importa vN_*.py sin ejecutar su main() """
+    for nombre in sorted(os.listdir(DIRECTORIO_SCRIPTS)):
+        if nombre.startswith(version + "_") and nombre.endswith(".py"):
+            spec = importlib.util.spec_from_file_location(nombre[:-3], os.path.join(DIRECTORIO_SCRIPTS, nombre))
+            modulo = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(modulo)
+            return modulo
+    raise FileNotFoundError(f"No hay script {version}_*.py en {DIRECTORIO_SCRIPTS}")
+
+
+def medir(func, tiempo_min=TIEMPO_MIN_S):
+    """ Latencia por llamada de `func()`: repite hasta sumar `tiempo_min` segundos """
+    func()  # Calentar cachés (imports perezosos, tablas, etc.)
+    muestras = []
+    limite = time.perf_counter() + tiempo_min
+    while time.perf_counter() < limite or len(muestras) < 5:
+        t0 = time.perf_counter_ns()
+        func()
+        muestras.append(time.perf_counter_ns() - t0)
+    muestras.sort()
+    pct = lambda p: muestras[min(len(muestras) - 1, int(p * len(muestras)))] / 1000.0
+    return {"n": len(muestras), "p50_us": pct(0.50), "p95_us": pct(0.95),
+            "min_us": muestras[0] / 1000.0, "media_us": sum(muestras) / len(muestras) / 1000.0}
+
+
+def medir_lote(func, n):
+    """ Rendimiento de una llamada que procesa `n` instantes """
+    t0 = time.perf_counter()
+    func()
+    total = time.perf_counter() - t0
+    return {"n": n, "total_s": total, "por_s": n / total if total else float("inf")}
+
+
+def instantes(dias, paso_s):
+    return [INICIO + datetime.timedelta(seconds=s) for s in range(0, int(dias * 86400), int(paso_s))]
+
+
+def bench_script(version, tiempo_min=TIEMPO_MIN_S):
+    """ Casos de latencia para lo que exista en el script `version` """
+    m = cargar_script(version)
+    res = {}
+    ubicaciones = getattr(m, "LOCATIONS", {})
+    fecha = INICIO + datetime.timedelta(hours=15)
+
+    if hasattr(m, "get_azimuth"):
+        for loc in ubicaciones.values():
+            lat, lon = loc["coords"]
+            res[f"get_azimuth[{loc['name']}]"] = medir(lambda: m.get_azimuth(lat, lon, fecha), tiempo_min)
+            res[f"get_altitude[{loc['name']}]"] = medir(lambda: m.get_altitude(lat, lon, fecha), tiempo_min)
+
+    if hasattr(m, "obtener_posicion_cuerpo"):
+        cuerpos = list(getattr(m, "CELESTIAL_BODIES", {}).values()) or ["Luna"]
+        loc = next(iter(ubicaciones.values()))
+        for cuerpo in cuerpos:
+            res[f"obtener_posicion_cuerpo[{cuerpo}]"] = medir(
+                lambda: m.obtener_posicion_cuerpo(cuerpo, loc["coords"][0], loc["coords"][1],
+                                                  loc.get("elevation", 0), fecha), tiempo_min)
+        for loc in ubicaciones.values():
+            res[f"obtener_posicion_cuerpo[Luna@{loc['name']}]"] = medir(
+                lambda: m.obtener_posicion_cuerpo("Luna", loc["coords"][0], loc["coords"][1],
+                                                  loc.get("elevation", 0), fecha), tiempo_min)
+
+    if hasattr(m, "map_azimut"):
+        res["map_azimut"] = medir(lambda: m.map_azimut(187.3), tiempo_min)
+
+    if hasattr(m, "enviar_trama"):
+        serie = SerieNula()
+        res["enviar_trama"] = medir(lambda: m.enviar_trama(serie, 135, 45, "123045", 1), tiempo_min)
+    return res
+
+
+def bench_rastreador(tiempo_min=TIEMPO_MIN_S):
+    """ Latencia y lotes de los motores del paquete (independientes del script) """
+    from pysolar.solar import get_altitude, get_azimuth
+
+    from rastreador import trama as tramas
+    from rastreador.celeste import POOL
+    from rastreador.solar import a_segundos, posicion_solar, posicion_solar_sitio
+    from rastreador.tabla_anual import TablaAnual, generar
+    from rastreador.trayectoria import TablaTrayectoria
+
+    lat, lon, elev = 4.7110, -74.0721, 2640
+    res = {}
+    fecha = INICIO + datetime.timedelta(hours=15)
+    seg = fecha.timestamp()
+
+    res["posicion_solar_sitio"] = medir(lambda: posicion_solar_sitio(lat, lon, fecha), tiempo_min)
+    tabla = TablaTrayectoria({1: {"coords": (lat, lon), "tz": "UTC", "elevation": elev}})
+    res["TablaTrayectoria.posicion"] = medir(lambda: tabla.posicion(1, fecha), tiempo_min)
+    ruta = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"benchmark_{os.getpid()}.sol")
+    generar(ruta, lat, lon, elev, INICIO.year)
+    anual = TablaAnual(ruta)
+    res["TablaAnual.posicion"] = medir(lambda: anual.posicion(seg), tiempo_min)
+    res["PoolCuerpos.posicion[Luna]"] = medir(lambda: POOL.posicion("Luna", lat, lon, elev, fecha), tiempo_min)
+    serie = SerieNula()
+    res["trama_ascii"] = medir(lambda: tramas.trama_ascii(135, 45, "123045", 1), tiempo_min)
+    res["trama_binaria"] = medir(lambda: tramas.trama_binaria(135, 45, "123045", 1), tiempo_min)
+    res["enviar_trama[binaria]"] = medir(
+        lambda: tramas.enviar_trama(serie, 135, 45, "123045", 1, binaria=True), tiempo_min)
+
+    dia = instantes(1, 60)
+    anio = a_segundos(instantes(365, 600))
+    lotes = {
+        "lote_dia_1min[pysolar]": (lambda: [(get_azimuth(lat, lon, d), get_altitude(lat, lon, d)) for d in dia],
+                                   len(dia)),
+        "lote_dia_1min[posicion_solar]": (lambda: posicion_solar(dia, [(lat, lon, elev)]), len(dia)),
+        "lote_anio_10min[posicion_solar]": (lambda: posicion_solar(anio, [(lat, lon, elev)]), len(anio)),
+        "lote_anio_10min[TablaAnual]": (lambda: anual.posiciones(anio), len(anio)),
+        "lote_dia_1min[ephem Luna]": (lambda: POOL.posiciones("Luna", lat, lon, elev, dia), len(dia)),
+        "lote_anio_10min[ephem Marte interpolado]": (
+            lambda: POOL.posiciones_interpoladas("Marte", lat, lon, elev, anio), len(anio)),
+        "lote_dia_1min[trama_ascii]": (lambda: [tramas.trama_ascii(i % 271, 45, "123045", 1)
+                                                for i in range(len(dia))], len(dia)),
+    }
+    for nombre, (func, n) in lotes.items():
+        res[nombre] = medir_lote(func, n)
+
+    anual.cerrar()
+    os.remove(ruta)
+    return res
+
+
+def comparar(actual, base):
+    """ Líneas 'caso: base -> actual (xN)' para los casos presentes en ambos (xN > 1: más rápido) """
+    lineas = []
+    for grupo, casos in actual["resultados"].items():
+        for caso, r in casos.items():
+            b = base.get("resultados", {}).get(grupo, {}).get(caso)
+            if not b:
+                continue
+            clave = "p50_us" if "p50_us" in r else "total_s"
+            if b[clave] and r[clave]:
+                lineas.append(f"{grupo}/{caso}: {b[clave]:.3g} -> {r[clave]:.3g} {clave} "
+                              f"(x{b[clave] / r[clave]:.2f})")
+    return lineas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de efemérides, mapeo y tramas")
+    parser.add_argument("--scripts", nargs="*", default=SCRIPTS, help="Versiones a medir (p.ej. v5 v8)")
+    parser.add_argument("--sin-paquete", action="store_true", help="No medir los motores de rastreador")
+    parser.add_argument("--tiempo", type=float, default=TIEMPO_MIN_S, help="Segundos por caso de latencia")
+    parser.add_argument("--salida", help="Guardar el JSON en este archivo")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    if DIRECTORIO_SCRIPTS not in sys.path:
+        sys.path.insert(0, DIRECTORIO_SCRIPTS)
+    resultado = {
+        "fecha": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "maquina": platform.machine(),
+        "procesador": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "resultados": {},
+    }
+    for version in args.scripts:
+        print(f"Midiendo {version}...", file=sys.stderr)
+        resultado["resultados"][version] = bench_script(version, args.tiempo)
+    if not args.sin_paquete:
+        print("Midiendo rastreador...", file=sys.stderr)
+        resultado["resultados"]["rastreador"] = bench_rastreador(args.tiempo)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            for linea in comparar(resultado, json.load(f)):
+                print(linea, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Caché de observadores y cuerpos de ephem.
+
+`obtener_posicion_cuerpo` de v7/v8 creaba un `ephem.Observer`, convertía
+lat/lon a texto y (en v8) instanciaba los cinco cuerpos en cada llamada.
+Aquí cada observador se crea una vez por ubicación y cada cuerpo una vez por
+(ubicación, cuerpo); por tick solo se actualiza `obs.date`.
+
+NumPy solo se importa en las versiones por lotes: el rastreo en tiempo real
+de un cuerpo no lo necesita.
+"""
+import math
+
+import ephem
+
+# Nombre (como en CELESTIAL_BODIES) -> clase de ephem
+CUERPOS = {
+    "Sol": ephem.Sun,
+    "Luna": ephem.Moon,
+    "Marte": ephem.Mars,
+    "Júpiter": ephem.Jupiter,
+    "Saturno": ephem.Saturn,
+    "Venus": ephem.Venus,
+}
+
+# Separación entre nodos de ephem en posiciones_interpoladas (s): la Luna se
+# mueve ~0.5°/h y su paralaje cambia con la rotación; los planetas, mucho menos.
+# Con 1 h la Luna llegaba a 0.011° en Bogotá; con 30 min, 0.0055° en todo 2025
+PASO_NODOS_LUNA = 1800.0
+PASO_NODOS = 21600.0
+
+# Fecha de ephem (días desde 1899-12-31 12:00 UT) correspondiente a la época POSIX
+EPOCA_UNIX_EPHEM = 25567.5
+
+
+def a_fecha_ephem(segundos):
+    """ Segundos POSIX -> fecha de ephem (float) """
+    return segundos / 86400.0 + EPOCA_UNIX_EPHEM
+
+
+class PoolCuerpos:
+    """ Observadores por ubicación y cuerpos por (ubicación, cuerpo), reutilizados entre llamadas """
+
+    def __init__(self):
+        self.observadores = {}
+        self.cuerpos = {}
+
+    def observador(self, lat, lon, elev):
+        clave = (lat, lon, elev)
+        obs = self.observadores.get(clave)
+        if obs is None:
+            obs = ephem.Observer()
+            obs.lat, obs.lon, obs.elevation = math.radians(lat), math.radians(lon), elev
+            self.observadores[clave] = obs
+        return obs
+
+    def cuerpo(self, nombre, lat, lon, elev):
+        clave = (nombre, lat, lon, elev)
+        cuerpo = self.cuerpos.get(clave)
+        if cuerpo is None:
+            cuerpo = CUERPOS[nombre]()
+            self.cuerpos[clave] = cuerpo
+        return cuerpo
+
+    def posicion(self, nombre, lat, lon, elev, fecha_utc):
+        """ (azimut, altitud) en grados de `nombre` vista desde (lat, lon, elev) en `fecha_utc` """
+        obs = self.observador(lat, lon, elev)
+        cuerpo = self.cuerpo(nombre, lat, lon, elev)
+        obs.date = fecha_utc
+        cuerpo.compute(obs)
+        return math.degrees(cuerpo.az), math.degrees(cuerpo.alt)
+
+    def posiciones(self, nombre, lat, lon, elev, fechas):
+        """ Versión por lotes: arreglos (az, alt) en grados para todas las `fechas` """
+        import numpy as np
+        from rastreador.solar import a_segundos
+
+        obs = self.observador(lat, lon, elev)
+        cuerpo = self.cuerpo(nombre, lat, lon, elev)
+        dias = a_fecha_ephem(a_segundos(fechas).ravel()).tolist()
+        az = np.empty(len(dias))
+        alt = np.empty(len(dias))
+        for i, d in enumerate(dias):
+            obs.date = d
+            cuerpo.compute(obs)
+            az[i] = cuerpo.az
+            alt[i] = cuerpo.alt
+        return np.degrees(az), np.degrees(alt)
+
+    def posiciones_interpoladas(self, nombre, lat, lon, elev, fechas, paso_nodos=None):
+        """
+        Como `posiciones`, para series largas: ephem solo calcula AR/dec
+        topocéntricas cada `paso_nodos` segundos; se interpolan y se pasan a
+        az/alt con el tiempo sidéreo en NumPy. Con los pasos por defecto y
+        sobre 5° de altitud difiere de ephem en menos de 0.006° (máximo de
+        2025 en las ubicaciones de config, Luna en Bogotá); cerca del
+        horizonte la refracción es la de pysolar, no la de ephem.
+        """
+        import numpy as np
+        from rastreador.solar import a_segundos, refraccion, tiempo_sidereo
+
+        seg = a_segundos(fechas).ravel()
+        if paso_nodos is None:
+            paso_nodos = PASO_NODOS_LUNA if nombre == "Luna" else PASO_NODOS
+        if len(seg) < 2 or (seg.max() - seg.min()) / paso_nodos + 2 >= len(seg):
+            # Pocos instantes: calcular cada uno con ephem sale igual o más barato
+            return self.posiciones(nombre, lat, lon, elev, seg)
+
+        obs = self.observador(lat, lon, elev)
+        cuerpo = self.cuerpo(nombre, lat, lon, elev)
+        nodos = np.arange(seg.min(), seg.max() + 2 * paso_nodos, paso_nodos)
+        ar = np.empty(len(nodos))
+        dec = np.empty(len(nodos))
+        for i, d in enumerate(a_fecha_ephem(nodos).tolist()):
+            obs.date = d
+            cuerpo.compute(obs)
+            ar[i] = cuerpo.ra
+            dec[i] = cuerpo.dec
+        ar = np.interp(seg, nodos, np.unwrap(ar))
+        dec = np.interp(seg, nodos, dec)
+
+        h = np.radians(tiempo_sidereo(seg) + lon) - ar
+        phi = math.radians(lat)
+        alt = np.degrees(np.arcsin(math.sin(phi) * np.sin(dec) + math.cos(phi) * np.cos(dec) * np.cos(h)))
+        az = np.degrees(np.arctan2(-np.cos(dec) * np.sin(h),
+                                   math.cos(phi) * np.sin(dec) - math.sin(phi) * np.cos(dec) * np.cos(h)))
+        return az % 360, alt + refraccion(alt)
+
+
+# Pool compartido por los scripts
+POOL = PoolCuerpos()
+
+
+def obtener_posicion_cuerpo(nombre_cuerpo, lat, lon, elev, fecha_hora_utc):
+    """ Misma firma que en v7/v8, pero usando el pool compartido """
+    return POOL.posicion(nombre_cuerpo, lat, lon, elev, fecha_hora_utc)
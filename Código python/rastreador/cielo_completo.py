@@ -0,0 +1,215 @@
+"""
+Mapeo de cielo completo: azimut 1:1 en los 270° del servo y volteo por el cenit.
+
+`map_azimut` recorta todo lo que cae fuera de 60°-300° a 0 o 270: un planeta
+al norte se queda clavado en un tope durante horas. Usando todo el rango
+0-180 del eje de elevación (la entrada de FINAL-top.v), cada dirección
+(az, el) tiene dos posturas:
+
+    normal:   servo_az = az - cero,        servo_el = el
+    volteada: servo_az = az + 180 - cero,  servo_el = 180 - el
+
+(servo_az módulo 360, válida si cae en 0-270). El hueco del azimut es de
+90°, así que siempre existe al menos una: se cubre todo el cielo.
+`planificar` elige la postura de cada instante con programación dinámica
+(Viterbi de dos estados) minimizando el tiempo total de giro, con ambos ejes
+moviéndose a la vez a la velocidad de servo_pwm_smooth, y deja los volteos
+precalculados.
+
+Una elevación de servo >127° no cabe en la trama ASCII (la FPGA ignora la
+centena) ni en la compacta (7 bits): este modo envía la trama precisa.
+
+    python -m rastreador.cielo_completo --cuerpo Júpiter --ubicacion 2 --horas 12
+"""
+import argparse
+import datetime
+
+import numpy as np
+
+from rastreador import config
+from rastreador.anticipacion import PASO_SERVO_S, UNIDADES
+from rastreador.mapeo import AZIMUT_AMANECER, AZIMUT_ATARDECER, SERVO_MAX_DEG, map_azimut_arr
+
+# Azimut geográfico del servo en 0: 45° deja el hueco de 90° centrado en el norte
+AZIMUT_CERO = 45
+RANGO_AZ = 270
+RANGO_EL = 180
+
+# Grados por segundo de cada eje: recorrido completo en UNIDADES pasos
+VEL_AZ = RANGO_AZ / (UNIDADES * PASO_SERVO_S)
+VEL_EL = RANGO_EL / (UNIDADES * PASO_SERVO_S)
+
+# Error por debajo del cual se considera que el panel apunta al cuerpo
+TOLERANCIA_DEG = 2.0
+
+
+def posturas(az, el, cero=AZIMUT_CERO):
+    """ Arreglos [2, N] (servo_az, servo_el, factible); fila 0 normal, fila 1 volteada """
+    az = np.asarray(az, dtype=np.float64)
+    el = np.maximum(0.0, np.asarray(el, dtype=np.float64))
+    servo_az = np.stack([(az - cero) % 360, (az + 180 - cero) % 360])
+    servo_el = np.stack([el, RANGO_EL - el])
+    return servo_az, servo_el, servo_az <= RANGO_AZ
+
+
+def postura(az, el, volteado, cero=AZIMUT_CERO):
+    """ (servo_az, servo_el) en grados para una postura, o None si cae en el hueco """
+    el = max(0.0, el)
+    if volteado:
+        servo_az, servo_el = (az + 180 - cero) % 360, RANGO_EL - el
+    else:
+        servo_az, servo_el = (az - cero) % 360, el
+    return (servo_az, servo_el) if servo_az <= RANGO_AZ else None
+
+
+def direccion(servo_az, servo_el, volteado, cero=AZIMUT_CERO):
+    """ Inverso de `postura` para arreglos: (az, el) de cielo hacia donde apunta el panel """
+    servo_az = np.asarray(servo_az, dtype=np.float64)
+    servo_el = np.asarray(servo_el, dtype=np.float64)
+    az = np.where(volteado, servo_az - 180 + cero, servo_az + cero) % 360
+    return az, np.where(volteado, RANGO_EL - servo_el, servo_el)
+
+
+def _giro(a_az, a_el, b_az, b_el):
+    """ Segundos de giro entre posturas (los dos ejes a la vez) """
+    return np.maximum(np.abs(b_az - a_az) / VEL_AZ, np.abs(b_el - a_el) / VEL_EL)
+
+
+def planificar(az, el, cero=AZIMUT_CERO, desde=None):
+    """
+    Postura de mínimo giro total para la secuencia (az, el).
+
+    desde: (servo_az, servo_el) actual del servo, para contar el primer giro.
+    Devuelve {servo_az, servo_el, volteado, volteos, giro_s}; `volteos` son
+    los índices en que cambia la postura.
+    """
+    servo_az, servo_el, factible = posturas(az, el, cero)
+    n = servo_az.shape[1]
+    if n == 0:
+        return {"servo_az": np.empty(0), "servo_el": np.empty(0), "volteado": np.empty(0, dtype=bool),
+                "volteos": np.empty(0, dtype=np.int64), "giro_s": 0.0}
+
+    # pasos[a, d, i]: giro de la postura d en i a la postura a en i+1
+    pasos = _giro(servo_az[None, :, :-1], servo_el[None, :, :-1], servo_az[:, None, 1:], servo_el[:, None, 1:])
+    costo = np.zeros(2) if desde is None else _giro(desde[0], desde[1], servo_az[:, 0], servo_el[:, 0])
+    costo = np.where(factible[:, 0], costo, np.inf)
+    previo = np.zeros((n, 2), dtype=np.int64)
+    filas = np.arange(2)
+    for i in range(1, n):
+        total = costo[None, :] + pasos[:, :, i - 1]
+        previo[i] = np.argmin(total, axis=1)
+        costo = np.where(factible[:, i], total[filas, previo[i]], np.inf)
+
+    eleccion = np.empty(n, dtype=np.int64)
+    eleccion[-1] = int(np.argmin(costo))
+    for i in range(n - 1, 0, -1):
+        eleccion[i - 1] = previo[i, eleccion[i]]
+    columnas = np.arange(n)
+    return {"servo_az": servo_az[eleccion, columnas], "servo_el": servo_el[eleccion, columnas],
+            "volteado": eleccion.astype(bool), "volteos": np.flatnonzero(np.diff(eleccion)) + 1,
+            "giro_s": float(costo[eleccion[-1]])}
+
+
+def _separacion(az1, el1, az2, el2):
+    e1, e2 = np.radians(el1), np.radians(el2)
+    c = np.sin(e1) * np.sin(e2) + np.cos(e1) * np.cos(e2) * np.cos(np.radians(az1 - az2))
+    return np.degrees(np.arccos(np.clip(c, -1.0, 1.0)))
+
+
+def comparar(az, el, cero=AZIMUT_CERO):
+    """
+    Recorte de map_azimut frente al plan de cielo completo, sobre las
+    muestras sobre el horizonte: cobertura (% con error < TOLERANCIA_DEG),
+    giro total y giro máximo entre muestras.
+    """
+    az = np.asarray(az, dtype=np.float64)
+    el = np.asarray(el, dtype=np.float64)
+    visible = el > 0
+
+    # Recorte: el servo apunta a amanecer + s * (atardecer - amanecer) / servo_max
+    s_az = map_azimut_arr(az).astype(np.float64)
+    s_el = np.maximum(0.0, el).astype(np.int64).astype(np.float64)
+    apunta_az = AZIMUT_AMANECER + s_az * (AZIMUT_ATARDECER - AZIMUT_AMANECER) / SERVO_MAX_DEG
+    giros_recorte = _giro(s_az[:-1], s_el[:-1], s_az[1:], s_el[1:])
+    error_recorte = _separacion(apunta_az, s_el, az, np.maximum(0.0, el))
+
+    plan = planificar(az, el, cero)
+    # La trama precisa lleva décimas de grado redondeadas
+    apunta_plan = direccion(np.rint(plan["servo_az"] * 10) / 10, np.rint(plan["servo_el"] * 10) / 10,
+                            plan["volteado"], cero)
+    error_plan = _separacion(*apunta_plan, az, np.maximum(0.0, el))
+    giros_plan = _giro(plan["servo_az"][:-1], plan["servo_el"][:-1], plan["servo_az"][1:], plan["servo_el"][1:])
+
+    def cobertura(error):
+        return 100.0 * np.mean(error[visible] < TOLERANCIA_DEG) if visible.any() else 100.0
+
+    return {
+        "recorte": {"cobertura_pct": cobertura(error_recorte), "giro_s": float(giros_recorte.sum()),
+                    "giro_max_s": float(giros_recorte.max(initial=0.0))},
+        "cielo_completo": {"cobertura_pct": cobertura(error_plan), "giro_s": float(giros_plan.sum()),
+                           "giro_max_s": float(giros_plan.max(initial=0.0)), "volteos": len(plan["volteos"])},
+    }
+
+
+class PlanCielo:
+    """
+    Plan precalculado para el rastreo en tiempo real: la postura sale del
+    plan (muestreado cada `paso_s`) y los ángulos exactos se calculan en cada
+    tick con la posición del momento.
+
+    calcular: función por lotes segundos -> (az, el), como efemeride_cuerpo.
+    """
+
+    def __init__(self, calcular, inicio_s, horas=12, paso_s=60, cero=AZIMUT_CERO, desde=None):
+        self.cero = cero
+        self.t = inicio_s + np.arange(0, horas * 3600 + paso_s, paso_s, dtype=np.float64)
+        az, el = calcular(self.t)
+        self.plan = planificar(az, el, cero, desde)
+
+    def vigente(self, segundos):
+        return self.t[0] <= segundos <= self.t[-1]
+
+    def volteos(self):
+        """ [(segundos, volteado_despues)] de cada cambio de postura """
+        return [(float(self.t[i]), bool(self.plan["volteado"][i])) for i in self.plan["volteos"]]
+
+    def objetivo(self, segundos, az, el):
+        """ (servo_az, servo_el) en grados con la postura planificada para `segundos` """
+        i = min(max(int(np.searchsorted(self.t, segundos, side="right")) - 1, 0), len(self.t) - 1)
+        volteado = bool(self.plan["volteado"][i])
+        # Justo en el borde del hueco la postura del plan puede no servir: la otra sí
+        return postura(az, el, volteado, self.cero) or postura(az, el, not volteado, self.cero)
+
+
+def main():
+    from rastreador.cli import resolver_cuerpo, resolver_ubicacion
+    from rastreador.simulacion import efemeride_cuerpo
+
+    parser = argparse.ArgumentParser(description="Plan de volteos por el cenit frente al recorte de map_azimut")
+    parser.add_argument("--cuerpo", type=resolver_cuerpo, default="Júpiter")
+    parser.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    parser.add_argument("--inicio", default=None, help="Fecha ISO en UTC (por defecto ahora)")
+    parser.add_argument("--horas", type=float, default=12)
+    parser.add_argument("--paso", type=float, default=60, help="Segundos entre muestras")
+    parser.add_argument("--cero", type=float, default=AZIMUT_CERO, help="Azimut geográfico del servo en 0")
+    args = parser.parse_args()
+
+    loc = config.LOCATIONS[args.ubicacion]
+    inicio = (datetime.datetime.fromisoformat(args.inicio).replace(tzinfo=datetime.timezone.utc) if args.inicio
+              else datetime.datetime.now(datetime.timezone.utc))
+    calcular = efemeride_cuerpo(args.cuerpo, loc["coords"][0], loc["coords"][1], loc.get("elevation", 0))
+    t = inicio.timestamp() + np.arange(0, args.horas * 3600 + args.paso, args.paso)
+    az, el = calcular(t)
+
+    plan = PlanCielo(calcular, inicio.timestamp(), args.horas, args.paso, args.cero)
+    print(f"{args.cuerpo} en {loc['name']}, {args.horas:g} h desde {inicio:%Y-%m-%d %H:%M} UTC")
+    for segundos, volteado in plan.volteos():
+        hora = datetime.datetime.fromtimestamp(segundos, datetime.timezone.utc)
+        print(f"  {hora:%Y-%m-%d %H:%M} UTC -> {'volteado' if volteado else 'normal'}")
+    for nombre, r in comparar(az, el, args.cero).items():
+        print(f"{nombre:>15}: cobertura {r['cobertura_pct']:5.1f}% | giro total {r['giro_s']:6.2f} s | "
+              f"giro máx {r['giro_max_s']:.2f} s" + (f" | {r['volteos']} volteos" if "volteos" in r else ""))
+
+
+if __name__ == "__main__":
+    main()
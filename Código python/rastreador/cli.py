@@ -0,0 +1,261 @@
+"""
+Punto de entrada: `python -m rastreador [opciones] <modo> ...`
+
+    python -m rastreador                          # menú interactivo (como v8)
+    python -m rastreador sol --ubicacion Bogotá
+    python -m rastreador celeste Luna --ubicacion 2 --ticks 60
+    python -m rastreador simular-dia --ubicacion 3 --fecha 2025-06-21
+    python -m rastreador manual 135 45
+    python -m rastreador --precisa manual 135.4 45.2   # décimas de grado, servos de 12 bits
+    python -m rastreador --sin-puerto marte
+    python -m rastreador celeste Júpiter --cielo-completo   # volteos por el cenit, todo el cielo
+    python -m rastreador --anticipar celeste Luna   # objetivo adelantado a la llegada del servo
+    python -m rastreador --dormir sol               # de noche, panel estacionado hasta el amanecer
+    python -m rastreador --adaptativo celeste Luna  # tick al ritmo de los pasos del servo
+    python -m rastreador arranque --repeticiones 10 celeste Luna   # informe de arranque
+    python -m rastreador --registro sesion.rlog sol   # guarda cada tick y trama (registro.py)
+    python -m rastreador reproducir sesion.rlog --desde 2025-06-21T15:00 --max
+    python -m rastreador --lazo-cerrado sol          # telemetría de la FPGA, envía cuando el servo llegó
+    python -m rastreador --difundir sol              # posición en memoria compartida (difusion.py)
+
+Solo se importa lo que pide el modo elegido (pyserial, numpy, ephem...).
+"""
+import argparse
+import datetime
+import sys
+
+from rastreador import config
+
+
+def resolver_ubicacion(valor, ubicaciones=config.LOCATIONS):
+    """ ID (1-6) o nombre de LOCATIONS (sin distinguir mayúsculas) """
+    try:
+        id_loc = int(valor)
+        if id_loc in ubicaciones:
+            return id_loc
+    except ValueError:
+        for k, v in ubicaciones.items():
+            if v["name"].lower() == valor.lower():
+                return k
+    raise argparse.ArgumentTypeError(f"Ubicación desconocida: {valor}")
+
+
+def resolver_cuerpo(valor, cuerpos=config.CELESTIAL_BODIES):
+    for v in cuerpos.values():
+        if v.lower() == valor.lower():
+            return v
+    raise argparse.ArgumentTypeError(f"Cuerpo desconocido: {valor} (opciones: {', '.join(cuerpos.values())})")
+
+
+def instante(valor):
+    """ Fecha/hora ISO 8601 -> segundos POSIX (UTC si no lleva zona) """
+    try:
+        hora = datetime.datetime.fromisoformat(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha inválida: {valor}") from None
+    if hora.tzinfo is None:
+        hora = hora.replace(tzinfo=datetime.timezone.utc)
+    return hora.timestamp()
+
+
+AYUDA_CIELO = "Azimut 1:1 con volteos por el cenit en vez de recortar a 60°-300° (usa la trama precisa)"
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m rastreador", description="Rastreador solar y celeste")
+    parser.add_argument("--puerto", default=config.PORT)
+    parser.add_argument("--baudios", type=int, default=config.BAUD_RATE)
+    parser.add_argument("--sin-puerto", action="store_true", help="No abrir el puerto: las tramas se descartan")
+    parser.add_argument("--binaria", action="store_true", default=config.PROTOCOLO_BINARIO,
+                        help="Trama binaria de 7 bytes")
+    parser.add_argument("--precisa", action="store_true", default=config.PROTOCOLO_PRECISO,
+                        help="Trama de 8 bytes con décimas de grado (servos de 12 bits)")
+    parser.add_argument("--metricas", type=int, default=config.METRICAS_PUERTO, metavar="PUERTO",
+                        help="Exponer tiempos por etapa en http://127.0.0.1:PUERTO/metrics")
+    parser.add_argument("--anticipar", action="store_true",
+                        help="Enviar dónde estará el cuerpo cuando el servo llegue (modos celestes y simulaciones)")
+    parser.add_argument("--latencia", type=float, default=None, metavar="S",
+                        help="Latencia del enlace para --anticipar (por defecto la UART + Bluetooth estimada)")
+    parser.add_argument("--dormir", action="store_true", default=config.DORMIR_ENTRE_EVENTOS,
+                        help="Bajo el horizonte, estacionar y dormir hasta la próxima salida (sol y celeste)")
+    parser.add_argument("--adaptativo", action="store_true", default=config.TICK_ADAPTATIVO,
+                        help="Despertar cuando el objetivo del servo cambia un paso, no cada segundo (sol y celeste)")
+    parser.add_argument("--registro", default=None, metavar="RUTA",
+                        help="Anexar cada tick y la trama enviada a un registro binario (sol y celeste)")
+    parser.add_argument("--telemetria", action="store_true", default=config.TELEMETRIA,
+                        help="Leer la telemetría de la FPGA: posición real de los servos, errores y latencia")
+    parser.add_argument("--lazo-cerrado", action="store_true", default=config.LAZO_CERRADO,
+                        help="Con telemetría, no enviar un objetivo nuevo hasta que el servo alcance el anterior")
+    parser.add_argument("--difundir", action="store_true", default=config.DIFUSION,
+                        help="Publicar cada tick en memoria compartida para otros procesos (sol y celeste)")
+    modos = parser.add_subparsers(dest="modo")
+
+    modos.add_parser("menu", help="Menú interactivo (por defecto)")
+
+    p = modos.add_parser("sol", help="Rastrear el sol en tiempo real")
+    p.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    p.add_argument("--ticks", type=int, default=None, help="Terminar tras N ticks")
+
+    p = modos.add_parser("sol-async", help="Rastrear el sol sobre el runtime asyncio")
+    p.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    p.add_argument("--sin-control", action="store_true", help="No leer órdenes p/r/s/q de stdin")
+
+    p = modos.add_parser("simular-dia", help="Día solar 6AM-6PM en cámara rápida")
+    p.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    p.add_argument("--fecha", type=datetime.date.fromisoformat, default=None)
+    p.add_argument("--velocidad", type=float, default=600 / 0.15, help="Múltiplo del tiempo real")
+    p.add_argument("--cielo-completo", action="store_true", help=AYUDA_CIELO)
+
+    p = modos.add_parser("celeste", help="Rastrear Luna/planeta en tiempo real")
+    p.add_argument("cuerpo", type=resolver_cuerpo)
+    p.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    p.add_argument("--ticks", type=int, default=None)
+    p.add_argument("--cielo-completo", action="store_true", help=AYUDA_CIELO)
+
+    p = modos.add_parser("simular-celeste", help="Próximas horas de un cuerpo en cámara rápida")
+    p.add_argument("cuerpo", type=resolver_cuerpo)
+    p.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    p.add_argument("--horas", type=float, default=12)
+    p.add_argument("--velocidad", type=float, default=600 / 0.1)
+    p.add_argument("--cielo-completo", action="store_true", help=AYUDA_CIELO)
+
+    p = modos.add_parser("marte", help="Demo del bucle retrógrado de Marte")
+    p.add_argument("--velocidad", type=float, default=86400 / 0.1)
+    p.add_argument("--cielo-completo", action="store_true", help=AYUDA_CIELO)
+
+    p = modos.add_parser("manual", help="Enviar una trama con ángulos de servo")
+    p.add_argument("az", type=float, help="Azimut del servo (0-270; décimas con --precisa)")
+    p.add_argument("el", type=float, help="Elevación (0-90)")
+
+    p = modos.add_parser("reproducir", help="Reenviar al puerto las tramas de un registro (--registro)")
+    p.add_argument("ruta")
+    p.add_argument("--desde", type=instante, default=None, help="ISO 8601, UTC si no lleva zona")
+    p.add_argument("--hasta", type=instante, default=None)
+    p.add_argument("--velocidad", type=float, default=1.0, help="Múltiplo del tiempo real")
+    p.add_argument("--max", action="store_true", help="Lo más rápido posible, sin esperas")
+
+    p = modos.add_parser("arranque", help="Imports y tiempo de arranque hasta la primera trama de un modo")
+    p.add_argument("--repeticiones", type=int, default=5)
+    p.add_argument("--top", type=int, default=12, help="Módulos a listar")
+    p.add_argument("modo_args", nargs=argparse.REMAINDER,
+                   help="Modo a medir y sus argumentos, después de las opciones (por defecto: sol)")
+    return parser
+
+
+def abrir_serie(args):
+    """ (serie, cerrar) según las opciones de conexión """
+    from rastreador.transporte import SerieNula, TransporteSerie
+
+    if args.sin_puerto:
+        return SerieNula(), lambda: None
+    import serial
+    print(f"Conectando a {args.puerto}...")
+    bt_serial = serial.Serial(args.puerto, args.baudios, timeout=1)
+    # Escrituras no bloqueantes: un enlace lento no frena el cálculo
+    transporte = TransporteSerie(bt_serial)
+    print("Conectado.\n")
+
+    def cerrar():
+        transporte.vaciar()
+        if bt_serial.is_open: bt_serial.close()
+    return transporte, cerrar
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    modo = args.modo or "menu"
+    if modo == "arranque":
+        from rastreador.arranque import informe
+        resultado = informe(args.modo_args or ["sol"], args.repeticiones, args.top)
+        return 0 if resultado and resultado["cumple"] else 1
+    from rastreador import modos
+    from rastreador.metricas import crear_metricas
+
+    try:
+        serie, cerrar = abrir_serie(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    telemetria = None
+    if args.telemetria or args.lazo_cerrado:
+        from rastreador.telemetria import Telemetria
+        try:
+            # El hilo lector usa el pyserial de debajo del TransporteSerie
+            telemetria = Telemetria(getattr(serie, "destino", None), args.baudios, args.lazo_cerrado).iniciar()
+        except ValueError as e:
+            cerrar()
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        serie = telemetria.serie(serie)
+    metricas = crear_metricas(args.metricas)
+    registro = None
+    if args.registro and modo in ("sol", "celeste"):
+        from rastreador.registro import Registro
+        registro = Registro(args.registro)
+    difusor = None
+    if args.difundir and modo in ("sol", "celeste"):
+        from rastreador.difusion import Difusor
+        try:
+            difusor = Difusor()
+        except (RuntimeError, ValueError) as e:
+            if registro:
+                registro.cerrar()
+            if telemetria:
+                telemetria.detener()
+            cerrar()
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    try:
+        if modo == "menu":
+            modos.menu(serie, args.binaria, metricas, args.precisa)
+        elif modo == "sol":
+            resumen = modos.rastrear_sol(serie, args.ubicacion, binaria=args.binaria, metricas=metricas,
+                                         ticks=args.ticks, precisa=args.precisa, dormir_eventos=args.dormir,
+                                         adaptativo=args.adaptativo, registro=registro, telemetria=telemetria,
+                                         difusion=difusor)
+            print(f"\nTransmisión: {resumen}")
+        elif modo == "sol-async":
+            estadisticas = modos.rastrear_sol_async(serie, args.ubicacion, binaria=args.binaria,
+                                                    con_control=not args.sin_control, precisa=args.precisa)
+            print(f"\nRuntime: {estadisticas}")
+        elif modo == "simular-dia":
+            modos.simular_dia(serie, args.ubicacion, args.fecha, binaria=args.binaria, velocidad=args.velocidad,
+                              anticipar=args.anticipar, latencia_s=args.latencia, precisa=args.precisa,
+                              cielo_completo=args.cielo_completo)
+        elif modo == "celeste":
+            resumen = modos.rastrear_cuerpo(serie, args.cuerpo, args.ubicacion, binaria=args.binaria,
+                                            metricas=metricas, ticks=args.ticks, anticipar=args.anticipar,
+                                            latencia_s=args.latencia, precisa=args.precisa,
+                                            cielo_completo=args.cielo_completo, dormir_eventos=args.dormir,
+                                            adaptativo=args.adaptativo, registro=registro,
+                                            telemetria=telemetria, difusion=difusor)
+            print(f"\nTransmisión: {resumen}")
+        elif modo == "simular-celeste":
+            modos.simular_cuerpo(serie, args.cuerpo, args.ubicacion, args.horas, binaria=args.binaria,
+                                 velocidad=args.velocidad, anticipar=args.anticipar, latencia_s=args.latencia,
+                                 precisa=args.precisa, cielo_completo=args.cielo_completo)
+        elif modo == "marte":
+            modos.retrogrado_marte(serie, binaria=args.binaria, velocidad=args.velocidad, anticipar=args.anticipar,
+                                   latencia_s=args.latencia, precisa=args.precisa,
+                                   cielo_completo=args.cielo_completo)
+        elif modo == "manual":
+            print(f"Enviado: {modos.enviar_manual(serie, args.az, args.el, args.binaria, args.precisa)}")
+        elif modo == "reproducir":
+            from rastreador.registro import reproducir
+            cuenta = reproducir(args.ruta, serie, args.desde, args.hasta, None if args.max else args.velocidad,
+                                mostrar=print)
+            print(f"\nReproducido: {cuenta}")
+    except KeyboardInterrupt:
+        print("\nSaliendo...")
+    finally:
+        if registro:
+            registro.cerrar()
+        if difusor:
+            difusor.cerrar()    # El segmento queda para el próximo arranque
+        if telemetria:
+            telemetria.detener()
+            print(f"Telemetría: {telemetria.resumen()}")
+        cerrar()
+        if metricas.resumen():
+            print(f"Etapas: {metricas.resumen()}")
+    return 0
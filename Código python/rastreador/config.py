@@ -0,0 +1,51 @@
+"""
+Configuración compartida (antes repetida en cada script vN).
+"""
+# --- CONFIGURACIÓN DE CONEXIÓN ---
+PORT = '/dev/rfcomm0'  # Linux
+# PORT = 'COM5'        # Windows
+BAUD_RATE = 9600
+
+# Trama binaria compacta de 7 bytes (requiere bt_binary_parser en la FPGA)
+PROTOCOLO_BINARIO = False
+# Trama precisa de 8 bytes con décimas de grado (servos de 12 bits en FINAL-top.v)
+PROTOCOLO_PRECISO = False
+
+# Tiempos por etapa en http://127.0.0.1:<puerto>/metrics (None = desactivado)
+METRICAS_PUERTO = None
+
+# Bajo el horizonte: estacionar el panel y dormir hasta la próxima salida (rastreador.eventos)
+DORMIR_ENTRE_EVENTOS = False
+# Despertar cuando el objetivo del servo cambia un paso en vez de cada segundo (rastreador.adaptativo)
+TICK_ADAPTATIVO = False
+# Con tick adaptativo: segundos máximos entre tramas aunque el objetivo no cambie. La LCD muestra la
+# hora de la última trama, así que puede atrasarse hasta esto; con 10 s la trama clave domina el envío
+INTERVALO_CLAVE_ADAPTATIVO = 60.0
+# Leer la telemetría de la FPGA (posición real de los servos, errores, latencia) (rastreador.telemetria)
+TELEMETRIA = False
+# Con telemetría: no enviar un objetivo nuevo hasta que el servo alcance el anterior
+LAZO_CERRADO = False
+# Publicar cada tick en memoria compartida para otros procesos locales (rastreador.difusion)
+DIFUSION = False
+
+# Ubicaciones
+LOCATIONS = {
+    1: {"name": "Bogotá",    "coords": (4.7110, -74.0721),   "tz": "America/Bogota",    "elevation": 2640},
+    2: {"name": "Madrid",    "coords": (40.4168, -3.7038),   "tz": "Europe/Madrid",     "elevation": 650},
+    3: {"name": "Sídney",    "coords": (-33.8688, 151.2093), "tz": "Australia/Sydney",  "elevation": 58},
+    4: {"name": "Tokio",     "coords": (35.6762, 139.6503),  "tz": "Asia/Tokyo",        "elevation": 40},
+    5: {"name": "Alaska",    "coords": (61.2181, -149.9003), "tz": "America/Anchorage", "elevation": 30},
+    6: {"name": "Polo Sur",  "coords": (-90.0000, 0.0000),   "tz": "Antarctica/South_Pole", "elevation": 2800}
+}
+
+# Cuerpos Celestes Disponibles
+CELESTIAL_BODIES = {
+    1: "Luna",
+    2: "Marte",
+    3: "Júpiter",
+    4: "Saturno",
+    5: "Venus"
+}
+
+# ID de zona que la LCD muestra como "MANUAL"
+ID_MANUAL = 7
@@ -0,0 +1,84 @@
+"""
+Transmisión por cambios (delta) con tramas clave periódicas.
+
+Envuelve `enviar_trama`: solo transmite cuando el objetivo del servo (az/el
+ya mapeados a enteros) se mueve al menos un paso de cuantización, o cuando
+toca una trama clave para que el reloj de la LCD siga avanzando. Cerca del
+mediodía solar o de noche la mayoría de los ticks no se envían.
+"""
+import time
+
+from rastreador import trama as tramas
+
+
+class TransmisorDelta:
+    """
+    Capa de envío por cambios con contadores de bytes.
+
+    paso_az / paso_el: cambio mínimo (en las mismas unidades enteras de la
+    trama: grados, o décimas con `precisa`) que obliga a transmitir.
+    intervalo_clave: segundos máximos entre dos tramas enviadas, aunque el
+    objetivo no cambie (reloj de la LCD).
+    """
+
+    def __init__(self, intervalo_clave=10.0, paso_az=1, paso_el=1, binaria=False,
+                 enviar=tramas.enviar_trama, reloj=time.monotonic, precisa=False):
+        self.intervalo_clave = intervalo_clave
+        self.paso_az = paso_az
+        self.paso_el = paso_el
+        self.binaria = binaria
+        self.precisa = precisa      # az/el en décimas de grado, trama de 8 bytes
+        self._enviar = enviar
+        self._reloj = reloj
+
+        self.ultimo = None          # (az, el, id_loc) de la última trama enviada
+        self.t_ultimo = None
+
+        self.tramas_enviadas = 0
+        self.tramas_clave = 0
+        self.tramas_omitidas = 0
+        self.bytes_enviados = 0
+        self.bytes_ahorrados = 0
+
+    def _largo(self, az, el, hora_str, id_loc):
+        if self.precisa:
+            return tramas.LARGO_PRECISA
+        if self.binaria:
+            return tramas.LARGO_BINARIA
+        return len(tramas.trama_ascii(az, el, hora_str, id_loc))
+
+    def enviar(self, bt_serial, az, el, hora_str, id_loc):
+        """ Igual que enviar_trama, pero devuelve None si la trama se omitió """
+        ahora = self._reloj()
+        cambio = (self.ultimo is None
+                  or abs(az - self.ultimo[0]) >= self.paso_az
+                  or abs(el - self.ultimo[1]) >= self.paso_el
+                  or id_loc != self.ultimo[2])
+        clave = not cambio and ahora - self.t_ultimo >= self.intervalo_clave
+
+        if not (cambio or clave):
+            self.tramas_omitidas += 1
+            self.bytes_ahorrados += self._largo(az, el, hora_str, id_loc)
+            return None
+
+        if self.precisa:
+            enviada = self._enviar(bt_serial, az, el, hora_str, id_loc, precisa=True)
+        else:
+            enviada = self._enviar(bt_serial, az, el, hora_str, id_loc, binaria=self.binaria)
+        self.ultimo = (az, el, id_loc)
+        self.t_ultimo = ahora
+        self.tramas_enviadas += 1
+        self.tramas_clave += clave
+        self.bytes_enviados += len(enviada)
+        return enviada
+
+    def resumen(self):
+        total = self.bytes_enviados + self.bytes_ahorrados
+        return {
+            "tramas_enviadas": self.tramas_enviadas,
+            "tramas_clave": self.tramas_clave,
+            "tramas_omitidas": self.tramas_omitidas,
+            "bytes_enviados": self.bytes_enviados,
+            "bytes_ahorrados": self.bytes_ahorrados,
+            "ahorro_pct": 100.0 * self.bytes_ahorrados / total if total else 0.0,
+        }
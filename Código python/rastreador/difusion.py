@@ -0,0 +1,342 @@
+"""
+Difusión de la posición calculada a otros procesos locales por memoria compartida.
+
+El panel, el registrador y el rastreador querían cada uno la posición del
+cuerpo, y cada uno la calculaba con pysolar/ephem. Con `--difundir`, el
+rastreador publica cada tick en un anillo de `multiprocessing.shared_memory`
+y los demás procesos la leen sin calcular ni pasar por sockets:
+
+    cabecera (32 bytes): MAGICO | VERSION | capacidad | cabeza (filas publicadas)
+    ranura (48 bytes):   seq | t | az | el | servo_az | servo_el | id_loc | cuerpo | crc32
+
+Un solo escritor y sin cerrojos (seqlock por ranura): para publicar la fila k
+escribe seq = 2k+1 (impar = a medio escribir), los datos, seq = 2k+2 y por
+último la cabeza. El lector acepta la ranura solo si seq vale 2k+2 antes y
+después de copiarla y el CRC cuadra; si no, el escritor la pisó mientras
+leía y se reintenta o se cuenta como perdida. El CRC cubre lo que Python no
+garantiza: el orden de las escrituras en CPUs de memoria débil (ARM).
+
+El escritor único lo garantiza un cerrojo `flock` sobre `<tmp>/<nombre>.lock`
+mientras el Difusor está abierto: un segundo `--difundir` con el mismo
+segmento se rechaza en vez de pisar las ranuras del primero. El cerrojo se
+libera solo si el proceso muere, así un segmento que queda sin cerrojo es
+de un escritor que ya no existe y se puede reutilizar.
+
+El segmento sobrevive al escritor: ni el Difusor ni el resource_tracker de
+multiprocessing lo borran al salir, para que un rastreador reiniciado siga
+en el mismo anillo. Si aun así se borra y se crea otro (`--borrar`, otra
+capacidad), `Suscriptor.esperar` nota el cambio de inodo y se vuelve a
+adjuntar. Para quitarlo: `python -m rastreador.difusion --borrar`.
+
+`Suscriptor.vista()` devuelve un arreglo estructurado de NumPy sobre el
+mismo búfer, sin copiar (para graficar la estela entera); ahí no se validan
+las ranuras.
+
+    python -m rastreador --difundir sol
+    python -m rastreador.difusion            # consumidor de ejemplo: imprime cada tick
+    python -m rastreador.difusion --borrar   # quita el segmento (con el rastreador parado)
+"""
+import argparse
+import datetime
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from rastreador.registro import codigo_cuerpo, nombre_cuerpo
+
+NOMBRE = "rastreador_posicion"
+CAPACIDAD = 1024                # ~17 min a 1 Hz
+MAGICO = b"RPOS"
+VERSION = 1
+CABECERA = struct.Struct("<4sHxxI")         # La cabeza va aparte, alineada a 8
+# Cabeza y seq en formato nativo: struct los copia con un solo memcpy de 8 bytes;
+# con "<Q" se escriben byte a byte y un lector puede ver la mitad de un número
+CABEZA = struct.Struct("Q")
+OFFSET_CABEZA = 16
+TAMANO_CABECERA = 32
+SEQ = struct.Struct("Q")
+DATOS = struct.Struct("<dddiiBB")
+CRC = struct.Struct("<I")
+TAMANO_RANURA = 48
+OFFSET_CRC = SEQ.size + DATOS.size + 2      # Tras dos bytes de relleno
+REINTENTOS = 4
+# Sondeo de `esperar`: bastante más fino que el tick de 1 s, sin ocupar la CPU
+SONDEO_S = 0.005
+# Cada cuánto `esperar` comprueba si el segmento se borró y se creó otro
+REVISION_S = 1.0
+# Donde Linux expone los segmentos POSIX; en otros sistemas no se revisa el inodo
+DIR_SHM = "/dev/shm"
+
+
+def _dtype():
+    import numpy as np
+    return np.dtype({"names": ["seq", "t", "az", "el", "servo_az", "servo_el", "id_loc", "cuerpo", "crc"],
+                     "formats": ["<u8", "<f8", "<f8", "<f8", "<i4", "<i4", "u1", "u1", "<u4"],
+                     "offsets": [0, 8, 16, 24, 32, 36, 40, 41, OFFSET_CRC],
+                     "itemsize": TAMANO_RANURA})
+
+
+def _adjuntar(nombre, crear=False, tamano=0):
+    """ Abre (o crea) el segmento sin que el resource_tracker lo borre al salir el proceso """
+    from multiprocessing import resource_tracker, shared_memory
+    try:
+        return shared_memory.SharedMemory(nombre, create=crear, size=tamano, track=False)
+    except TypeError:   # Python < 3.13: siempre registra; unregister después borraría el de otro Difusor
+        registrar = resource_tracker.register
+        resource_tracker.register = lambda nombre, tipo: None
+        try:
+            return shared_memory.SharedMemory(nombre, create=crear, size=tamano)
+        finally:
+            resource_tracker.register = registrar
+
+
+def _quitar(shm):
+    """ unlink sin avisar al resource_tracker, que no lo tiene registrado (ver `_adjuntar`) """
+    from multiprocessing import resource_tracker
+    if getattr(shm, "_track", True) is False:
+        shm.unlink()
+        return
+    desregistrar = resource_tracker.unregister
+    resource_tracker.unregister = lambda nombre, tipo: None
+    try:
+        shm.unlink()
+    finally:
+        resource_tracker.unregister = desregistrar
+
+
+def _inodo(nombre):
+    """ Inodo del segmento `nombre` ahora mismo; None si no existe o el sistema no lo expone """
+    try:
+        return os.stat(os.path.join(DIR_SHM, nombre)).st_ino
+    except OSError:
+        return None
+
+
+def _tomar_cerrojo(nombre):
+    """ Abre y bloquea el cerrojo del escritor; RuntimeError si otro proceso lo tiene """
+    import fcntl
+
+    ruta = os.path.join(tempfile.gettempdir(), f"{nombre}.lock")
+    fd = os.open(ruta, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        pid = os.read(fd, 16).decode("ascii", "replace").strip() or "?"
+        os.close(fd)
+        raise RuntimeError(f"Ya hay un rastreador difundiendo en {nombre} (pid {pid})") from None
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode("ascii"))
+    return fd
+
+
+class Difusor:
+    """
+    Escritor único (RuntimeError si el segmento ya tiene uno vivo). Si el
+    segmento quedó de un escritor que terminó (el rastreador se reinició) se
+    reutiliza y la secuencia continúa, así los suscriptores abiertos no
+    tienen que reconectarse.
+    """
+
+    def __init__(self, nombre=NOMBRE, capacidad=CAPACIDAD):
+        tamano = TAMANO_CABECERA + capacidad * TAMANO_RANURA
+        self._cerrojo = _tomar_cerrojo(nombre)
+        try:
+            self.shm = _adjuntar(nombre, crear=True, tamano=tamano)
+            self.propio = True
+            CABECERA.pack_into(self.shm.buf, 0, MAGICO, VERSION, capacidad)
+            CABEZA.pack_into(self.shm.buf, OFFSET_CABEZA, 0)
+        except FileExistsError:
+            self.shm = _adjuntar(nombre)
+            self.propio = False
+            magico, version, cap = CABECERA.unpack_from(self.shm.buf, 0)
+            if (magico, version, cap) != (MAGICO, VERSION, capacidad):
+                self.shm.close()
+                os.close(self._cerrojo)
+                raise ValueError(f"El segmento {nombre} existe con otro formato o capacidad") from None
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.buf = self.shm.buf
+        self.cabeza = CABEZA.unpack_from(self.buf, OFFSET_CABEZA)[0]
+
+    def publicar(self, segundos, id_loc, cuerpo, az, el, servo_az, servo_el):
+        k = self.cabeza
+        base = TAMANO_CABECERA + (k % self.capacidad) * TAMANO_RANURA
+        cuerpo = cuerpo if isinstance(cuerpo, int) else codigo_cuerpo(cuerpo)
+        SEQ.pack_into(self.buf, base, 2 * k + 1)
+        DATOS.pack_into(self.buf, base + SEQ.size, segundos, az, el, int(servo_az), int(servo_el), id_loc, cuerpo)
+        CRC.pack_into(self.buf, base + OFFSET_CRC, zlib.crc32(self.buf[base + SEQ.size:base + OFFSET_CRC]))
+        SEQ.pack_into(self.buf, base, 2 * k + 2)
+        self.cabeza = k + 1
+        CABEZA.pack_into(self.buf, OFFSET_CABEZA, self.cabeza)
+
+    def tick(self, segundos, id_loc, cuerpo, az, el, servo_az, servo_el, trama=None):
+        """ Misma firma que Registro.tick; la trama no se difunde """
+        self.publicar(segundos, id_loc, cuerpo, az, el, servo_az, servo_el)
+
+    def cerrar(self, borrar=False):
+        """ Sin `borrar` el segmento queda para el próximo escritor; con él, se quita """
+        del self.buf
+        self.shm.close()
+        if borrar:
+            _quitar(self.shm)
+        os.close(self._cerrojo)
+
+
+class Suscriptor:
+    """ Lector; cualquier número de procesos puede abrir el mismo segmento """
+
+    def __init__(self, nombre=NOMBRE):
+        self.nombre = nombre
+        self._abrir()
+        self.cursor = self.cabeza()
+        self.perdidos = 0
+        self.readjuntes = 0
+
+    def _abrir(self):
+        self.shm = _adjuntar(self.nombre)
+        magico, version, self.capacidad = CABECERA.unpack_from(self.shm.buf, 0)
+        if magico != MAGICO or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"El segmento {self.nombre} no es una difusión v{VERSION}")
+        self.buf = self.shm.buf
+        self.inodo = _inodo(self.nombre)
+
+    def reemplazado(self):
+        """ True si el nombre ya apunta a otro segmento (se borró y un escritor creó uno nuevo) """
+        if self.inodo is None:
+            return False
+        actual = _inodo(self.nombre)
+        return actual is not None and actual != self.inodo
+
+    def readjuntar(self):
+        """ Cambia al segmento nuevo y lo lee desde su primera fila """
+        self.cerrar()
+        self._abrir()
+        self.cursor = 0
+        self.readjuntes += 1
+
+    def cabeza(self):
+        """ Filas publicadas; se lee hasta que dos lecturas seguidas coincidan """
+        anterior = CABEZA.unpack_from(self.buf, OFFSET_CABEZA)[0]
+        while True:
+            actual = CABEZA.unpack_from(self.buf, OFFSET_CABEZA)[0]
+            if actual == anterior:
+                return actual
+            anterior = actual
+
+    def leer(self, k):
+        """ Fila k (dict) si sigue en el anillo y se leyó entera; None si ya fue pisada """
+        base = TAMANO_CABECERA + (k % self.capacidad) * TAMANO_RANURA
+        esperado = 2 * k + 2
+        if SEQ.unpack_from(self.buf, base)[0] != esperado:
+            return None
+        crudo = bytes(self.buf[base + SEQ.size:base + OFFSET_CRC + CRC.size])
+        if SEQ.unpack_from(self.buf, base)[0] != esperado:
+            return None
+        if zlib.crc32(crudo[:-CRC.size]) != CRC.unpack_from(crudo, len(crudo) - CRC.size)[0]:
+            return None
+        t, az, el, servo_az, servo_el, id_loc, cuerpo = DATOS.unpack_from(crudo)
+        return {"seq": k, "t": t, "id_loc": id_loc, "cuerpo": nombre_cuerpo(cuerpo), "az": az, "el": el,
+                "servo_az": servo_az, "servo_el": servo_el}
+
+    def ultimo(self):
+        """ La fila más reciente, o None si no se publicó nada """
+        for _ in range(REINTENTOS):
+            k = self.cabeza()
+            if k == 0:
+                return None
+            fila = self.leer(k - 1)
+            if fila:
+                return fila
+        return None
+
+    def nuevos(self):
+        """ Filas publicadas desde la llamada anterior; las que el anillo ya pisó suman a `perdidos` """
+        cabeza = self.cabeza()
+        if cabeza - self.cursor > self.capacidad:
+            self.perdidos += cabeza - self.capacidad - self.cursor
+            self.cursor = cabeza - self.capacidad
+        filas = []
+        for k in range(self.cursor, cabeza):
+            fila = self.leer(k)
+            if fila:
+                filas.append(fila)
+            else:
+                self.perdidos += 1
+        self.cursor = cabeza
+        return filas
+
+    def esperar(self, timeout=None):
+        """ Bloquea (sondeando la cabeza) hasta que haya filas nuevas; devuelve `nuevos()` """
+        limite = None if timeout is None else time.monotonic() + timeout
+        revision = time.monotonic() + REVISION_S
+        while self.cabeza() == self.cursor:
+            ahora = time.monotonic()
+            if limite is not None and ahora >= limite:
+                return []
+            if ahora >= revision:
+                revision = ahora + REVISION_S
+                if self.reemplazado():
+                    self.readjuntar()
+                    continue
+            time.sleep(SONDEO_S)
+        return self.nuevos()
+
+    def vista(self):
+        """ Arreglo estructurado de NumPy sobre las ranuras, sin copiar ni validar """
+        import numpy as np
+        return np.ndarray((self.capacidad,), dtype=_dtype(), buffer=self.buf, offset=TAMANO_CABECERA)
+
+    def cerrar(self):
+        del self.buf
+        self.shm.close()
+
+
+def borrar(nombre=NOMBRE):
+    """ Quita el segmento; RuntimeError si un escritor sigue vivo """
+    cerrojo = _tomar_cerrojo(nombre)
+    try:
+        shm = _adjuntar(nombre)
+        shm.close()
+        _quitar(shm)
+    finally:
+        os.close(cerrojo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consumidor de ejemplo de la difusión de posiciones")
+    parser.add_argument("--nombre", default=NOMBRE, help="Segmento de memoria compartida")
+    parser.add_argument("--ultimo", action="store_true", help="Imprimir la última fila y salir")
+    parser.add_argument("--borrar", action="store_true", help="Quitar el segmento y salir (rastreador parado)")
+    args = parser.parse_args()
+    if args.borrar:
+        try:
+            borrar(args.nombre)
+        except FileNotFoundError:
+            parser.error(f"No hay difusión '{args.nombre}'")
+        except RuntimeError as e:
+            parser.error(str(e))
+        return
+    try:
+        suscriptor = Suscriptor(args.nombre)
+    except FileNotFoundError:
+        parser.error(f"No hay difusión '{args.nombre}' (¿el rastreador corre con --difundir?)")
+    try:
+        if args.ultimo:
+            print(suscriptor.ultimo())
+            return
+        while True:
+            for f in suscriptor.esperar():
+                hora = datetime.datetime.fromtimestamp(f["t"], datetime.timezone.utc)
+                print(f"#{f['seq']} {hora:%H:%M:%S} [{f['cuerpo']}] Az:{f['az']:.2f}° El:{f['el']:.2f}° "
+                      f"servo {f['servo_az']}/{f['servo_el']} (perdidas {suscriptor.perdidos})")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        suscriptor.cerrar()
+
+
+if __name__ == "__main__":
+    main()
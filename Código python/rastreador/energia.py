@@ -0,0 +1,168 @@
+"""
+Energía: panel rastreado frente a panel fijo, menos lo que gastan los servos.
+
+Hasta ahora solo se calculaba hacia dónde apuntar. Aquí, con las posiciones
+de `posicion_solar` para todo el periodo (vectorizado, un año a 1 min en
+menos de un segundo):
+
+1. Irradiancia de cielo despejado: directa normal de Meinel con la masa de
+   aire de Kasten-Young y corrección por altitud del sitio, difusa
+   isotrópica proporcional y reflejo del suelo (albedo).
+2. Apuntado real del rastreador: map_azimut (recorte a 60°-300° y grados
+   enteros de la trama) y la cuantización de target_pos en FINAL-top.v
+   (az*4095/2700, el*4095/1800 en décimas). El azimut del servo recorre
+   240° de cielo en 270° de giro.
+3. Pérdidas por ángulo de incidencia: coseno más el modificador ASHRAE
+   1 - b0 (1/cos θ - 1) sobre la directa.
+4. Servos: cada unidad de target_pos recorrida cuesta PASO_SERVO_S a la
+   potencia de movimiento, más la potencia de reposo todo el día.
+
+El panel fijo mira al ecuador inclinado la latitud.
+
+    python -m rastreador.energia --ubicacion 2 --anio 2025
+"""
+import argparse
+import calendar
+import time
+
+import numpy as np
+
+from rastreador import config
+from rastreador.anticipacion import PASO_SERVO_S, RANGO_AZ_FPGA, RANGO_EL_FPGA, UNIDADES
+from rastreador.mapeo import (AZIMUT_AMANECER, AZIMUT_ATARDECER, SERVO_MAX_DEG, map_azimut_arr,
+                              map_azimut_decimas_arr)
+
+# --- CIELO DESPEJADO ---
+CONSTANTE_SOLAR = 1353.0        # W/m² (la que usa el modelo de Meinel)
+FRACCION_DIFUSA = 0.1           # Difusa horizontal / directa normal en cielo claro
+ALBEDO = 0.2
+B0_ASHRAE = 0.05                # Vidrio plano
+
+# --- INSTALACIÓN ---
+PANEL_W = 10.0                  # Potencia pico del panel (1000 W/m² a incidencia normal)
+# Micro servos a 5 V: ~500 mA moviéndose, ~10 mA quietos (por eje)
+POTENCIA_MOVIMIENTO_W = 2.5
+POTENCIA_REPOSO_W = 0.05
+
+
+def irradiancia(el, altitud_m=0):
+    """ (directa normal, difusa horizontal, global horizontal) en W/m² para elevaciones en grados """
+    el = np.asarray(el, dtype=np.float64)
+    arriba = el > 0
+    el_pos = np.where(arriba, el, 90.0)
+    masa_aire = 1.0 / (np.sin(np.radians(el_pos)) + 0.50572 * (el_pos + 6.07995) ** -1.6364)
+    h = altitud_m / 1000.0
+    dni = CONSTANTE_SOLAR * ((1 - 0.14 * h) * 0.7 ** (masa_aire ** 0.678) + 0.14 * h)
+    dni = np.where(arriba, dni, 0.0)
+    dhi = FRACCION_DIFUSA * dni
+    ghi = dni * np.sin(np.radians(np.maximum(el, 0.0))) + dhi
+    return dni, dhi, ghi
+
+
+def coseno_incidencia(az_sol, el_sol, az_panel, el_panel):
+    """ Coseno del ángulo entre el sol y la normal del panel (ambos como dirección az/el) """
+    es, ep = np.radians(el_sol), np.radians(el_panel)
+    return np.sin(es) * np.sin(ep) + np.cos(es) * np.cos(ep) * np.cos(np.radians(az_sol - az_panel))
+
+
+def potencia_plano(dni, dhi, ghi, cos_inc, el_panel, b0=B0_ASHRAE, albedo=ALBEDO):
+    """ W/m² útiles sobre el plano del panel (la normal apunta a el_panel sobre el horizonte) """
+    cos_inc = np.asarray(cos_inc, dtype=np.float64)
+    iam = np.clip(1.0 - b0 * (1.0 / np.maximum(cos_inc, 1e-6) - 1.0), 0.0, 1.0)
+    directa = dni * np.maximum(cos_inc, 0.0) * iam
+    # Inclinación del plano = 90° - elevación de su normal
+    cos_incl = np.sin(np.radians(el_panel))
+    return directa + dhi * (1 + cos_incl) / 2 + ghi * albedo * (1 - cos_incl) / 2
+
+
+def apuntado_rastreador(az, el, precisa=False):
+    """
+    (az_panel, el_panel, u_az, u_el): hacia dónde apunta el panel con los
+    objetivos de la trama y la cuantización de FINAL-top.v; u_* en unidades
+    de target_pos.
+    """
+    if precisa:
+        az_dd = map_azimut_decimas_arr(az)
+        el_dd = np.rint(np.maximum(0.0, el) * 10).astype(np.int64)
+    else:
+        az_dd = map_azimut_arr(az) * 10
+        el_dd = np.maximum(0.0, el).astype(np.int64) * 10
+    u_az = np.where(az_dd >= RANGO_AZ_FPGA, UNIDADES, az_dd * UNIDADES // RANGO_AZ_FPGA)
+    u_el = np.where(el_dd >= RANGO_EL_FPGA, UNIDADES, el_dd * UNIDADES // RANGO_EL_FPGA)
+    servo_az = u_az * (RANGO_AZ_FPGA / 10) / UNIDADES
+    az_panel = AZIMUT_AMANECER + servo_az * (AZIMUT_ATARDECER - AZIMUT_AMANECER) / SERVO_MAX_DEG
+    el_panel = u_el * (RANGO_EL_FPGA / 10) / UNIDADES
+    return az_panel, el_panel, u_az, u_el
+
+
+def energia_servos(u_az, u_el, segundos_totales, potencia_mov=POTENCIA_MOVIMIENTO_W,
+                   potencia_reposo=POTENCIA_REPOSO_W):
+    """ Wh de los dos servos: unidades recorridas * PASO_SERVO_S en movimiento, el resto en reposo """
+    mov_s = (np.abs(np.diff(u_az)).sum() + np.abs(np.diff(u_el)).sum()) * PASO_SERVO_S
+    reposo_s = max(0.0, 2 * segundos_totales - mov_s)
+    return (mov_s * potencia_mov + reposo_s * potencia_reposo) / 3600.0, mov_s
+
+
+def estimar(lat, lon, elevacion=0, inicio_s=None, dias=365, paso_s=60, panel_w=PANEL_W, precisa=False):
+    """
+    Wh del periodo para: rastreo ideal (apuntado exacto), el rastreador real,
+    y el panel fijo; más el consumo de los servos y la ganancia neta.
+    """
+    from rastreador.solar import posicion_solar
+
+    if inicio_s is None:
+        inicio_s = calendar.timegm((time.gmtime().tm_year, 1, 1, 0, 0, 0))
+    segundos = inicio_s + np.arange(0, dias * 86400, paso_s, dtype=np.float64)
+    az, el = posicion_solar(segundos, [(lat, lon, elevacion)])
+    az, el = az[0], el[0]
+    dni, dhi, ghi = irradiancia(el, elevacion)
+    horas = paso_s / 3600.0
+
+    def wh(cos_inc, el_panel):
+        return float(potencia_plano(dni, dhi, ghi, cos_inc, el_panel).sum() * horas * panel_w / 1000.0)
+
+    el_visible = np.maximum(el, 0.0)
+    ideal = wh(np.where(el > 0, 1.0, 0.0), el_visible)
+
+    az_p, el_p, u_az, u_el = apuntado_rastreador(az, el, precisa)
+    rastreado = wh(coseno_incidencia(az, el, az_p, el_p), el_p)
+
+    az_fijo = 180.0 if lat >= 0 else 0.0
+    el_fijo = 90.0 - abs(lat)
+    fijo = wh(coseno_incidencia(az, el, az_fijo, el_fijo), el_fijo)
+
+    servos, mov_s = energia_servos(u_az, u_el, len(segundos) * paso_s)
+    neto = rastreado - servos
+    return {"ideal_wh": ideal, "rastreado_wh": rastreado, "fijo_wh": fijo, "servos_wh": servos,
+            "servos_mov_s": mov_s, "neto_wh": neto,
+            "ganancia_pct": 100.0 * (neto / fijo - 1) if fijo else 0.0}
+
+
+def main():
+    from rastreador.cli import resolver_ubicacion
+
+    parser = argparse.ArgumentParser(description="Energía anual: rastreado frente a fijo, menos los servos")
+    parser.add_argument("--ubicacion", type=resolver_ubicacion, default=None, help="Por defecto, todas")
+    parser.add_argument("--anio", type=int, default=None)
+    parser.add_argument("--paso", type=float, default=60, help="Segundos entre muestras")
+    parser.add_argument("--panel", type=float, default=PANEL_W, help="Potencia pico del panel (W)")
+    parser.add_argument("--precisa", action="store_true", help="Objetivos en décimas (trama precisa)")
+    args = parser.parse_args()
+
+    anio = args.anio or time.gmtime().tm_year
+    inicio = calendar.timegm((anio, 1, 1, 0, 0, 0))
+    dias = 366 if calendar.isleap(anio) else 365
+    ids = [args.ubicacion] if args.ubicacion else list(config.LOCATIONS)
+    print(f"Año {anio}, panel de {args.panel:g} W, paso {args.paso:g} s (Wh/año)")
+    for id_loc in ids:
+        loc = config.LOCATIONS[id_loc]
+        t0 = time.perf_counter()
+        r = estimar(loc["coords"][0], loc["coords"][1], loc.get("elevation", 0), inicio, dias, args.paso,
+                    args.panel, args.precisa)
+        print(f"{loc['name']:>9}: ideal {r['ideal_wh']:7.0f} | rastreado {r['rastreado_wh']:7.0f} | "
+              f"fijo {r['fijo_wh']:7.0f} | servos {r['servos_wh']:5.0f} | neto {r['neto_wh']:7.0f} "
+              f"({r['ganancia_pct']:+.1f}% sobre fijo) [{time.perf_counter() - t0:.2f} s]")
+
+
+if __name__ == "__main__":
+    main()
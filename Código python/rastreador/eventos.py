@@ -0,0 +1,171 @@
+"""
+Salida, tránsito y puesta del cuerpo activo para dormir entre eventos.
+
+De noche `modo_automatico` sigue calculando cada segundo y mandando tramas
+con el=0 (una clave cada 10 s con TransmisorDelta), y `modo_celeste` hace lo
+mismo con el cuerpo bajo el horizonte. Con `Agenda` el rastreador estaciona
+el panel apuntando a donde saldrá el cuerpo y no vuelve a despertar (ni a
+calcular ni a escribir en el puerto) hasta ANTICIPO_DESPERTAR_S antes de la
+salida, según `next_rising`/`next_setting`/`next_transit` de ephem.
+
+Mientras duerme la LCD conserva la última hora recibida.
+
+    python -m rastreador.eventos --cuerpo Sol --ubicacion 1 --fecha 2025-06-21
+"""
+import argparse
+import datetime
+import math
+import time
+
+import ephem
+
+from rastreador import config
+from rastreador.celeste import CUERPOS, EPOCA_UNIX_EPHEM, a_fecha_ephem
+
+# Despertar antes de la salida para que el servo llegue a tiempo y la tabla se cargue
+ANTICIPO_DESPERTAR_S = 120
+# No estacionar si la próxima salida está a menos de esto (entre dos ticks no vale la pena)
+DORMIR_MINIMO_S = 2 * ANTICIPO_DESPERTAR_S
+# Cuerpo que nunca sale (sol de invierno polar): volver a consultar cada tanto
+REVISION_S = 6 * 3600
+# El sleep se parte en trozos para corregir saltos del reloj de pared
+TROZO_SLEEP_S = 600
+
+
+def a_segundos_ephem(fecha):
+    """ Fecha de ephem -> segundos POSIX """
+    return (float(fecha) - EPOCA_UNIX_EPHEM) * 86400.0
+
+
+class Agenda:
+    """ Próximos eventos de un cuerpo visto desde una ubicación (observador propio, no el del POOL) """
+
+    def __init__(self, nombre, lat, lon, elev=0):
+        self.nombre = nombre
+        self.obs = ephem.Observer()
+        self.obs.lat, self.obs.lon, self.obs.elevation = math.radians(lat), math.radians(lon), elev
+        self.cuerpo = CUERPOS[nombre]()
+
+    def _evento(self, metodo):
+        try:
+            return a_segundos_ephem(metodo(self.cuerpo))
+        except (ephem.AlwaysUpError, ephem.NeverUpError):
+            return None
+
+    def eventos(self, segundos):
+        """ {arriba, salida, transito, puesta, az_salida}; los instantes en segundos POSIX o None """
+        self.obs.date = a_fecha_ephem(segundos)
+        self.cuerpo.compute(self.obs)
+        salida = self._evento(self.obs.next_rising)
+        transito = self._evento(self.obs.next_transit)
+        puesta = self._evento(self.obs.next_setting)
+        if salida is None or puesta is None:
+            arriba = self.cuerpo.alt > 0
+        else:
+            # Como lo define ephem (limbo y refracción): entre la salida y la puesta. Con alt > 0
+            # justo tras la salida el centro aún está bajo y `salida` ya sería la de mañana
+            arriba = puesta < salida
+        az_salida = None
+        if salida is not None:
+            self.obs.date = a_fecha_ephem(salida)
+            self.cuerpo.compute(self.obs)
+            az_salida = math.degrees(self.cuerpo.az)
+        return {"arriba": arriba, "salida": salida, "transito": transito, "puesta": puesta, "az_salida": az_salida}
+
+    def despertar(self, segundos):
+        """
+        None si hay que seguir rastreando; si no, (segundos POSIX en que
+        despertar, azimut donde estacionar) con el cuerpo bajo el horizonte.
+        """
+        ev = self.eventos(segundos)
+        if ev["arriba"]:
+            return None
+        if ev["salida"] is None:
+            # NeverUp: revisar más tarde; AlwaysUp no llega aquí porque está arriba
+            return segundos + REVISION_S, None
+        despertar = ev["salida"] - ANTICIPO_DESPERTAR_S
+        if despertar - segundos < DORMIR_MINIMO_S - ANTICIPO_DESPERTAR_S:
+            return None
+        return despertar, ev["az_salida"]
+
+
+def dormir_hasta(segundos, reloj=time.time, dormir=time.sleep):
+    """ Duerme hasta el instante POSIX `segundos`, en trozos (Ctrl+C lo interrumpe) """
+    while True:
+        falta = segundos - reloj()
+        if falta <= 0:
+            return
+        dormir(min(falta, TROZO_SLEEP_S))
+
+
+def comparar_dia(nombre, lat, lon, elev=0, inicio_s=None, horas=24, intervalo_clave=10.0):
+    """
+    Simula `horas` de rastreo a 1 Hz con TransmisorDelta, sin y con Agenda:
+    {continuo: {...}, eventos: {...}} con despertares, tramas y bytes.
+    """
+    import numpy as np
+    from rastreador.delta import TransmisorDelta
+    from rastreador.mapeo import map_azimut
+    from rastreador.simulacion import efemeride_cuerpo
+    from rastreador.transporte import SerieNula
+
+    inicio_s = time.time() if inicio_s is None else inicio_s
+    t = inicio_s + np.arange(0, horas * 3600, 1.0)
+    az, el = efemeride_cuerpo(nombre, lat, lon, elev)(t)
+    agenda = Agenda(nombre, lat, lon, elev)
+    resultado = {}
+    for modo in ("continuo", "eventos"):
+        ahora = [inicio_s]
+        transmisor = TransmisorDelta(intervalo_clave=intervalo_clave, reloj=lambda: ahora[0])
+        serie = SerieNula()
+        despertares = 0
+        i = 0
+        while i < len(t):
+            ahora[0] = t[i]
+            despertares += 1
+            servo_az, servo_el = map_azimut(az[i]), int(max(0, el[i]))
+            plan = agenda.despertar(t[i]) if modo == "eventos" and el[i] <= 0 else None
+            if plan:
+                if plan[1] is not None:
+                    servo_az = map_azimut(plan[1])
+                transmisor.enviar(serie, servo_az, 0, "000000", 1)
+                i = max(i + 1, int(np.searchsorted(t, plan[0])))
+                continue
+            transmisor.enviar(serie, servo_az, servo_el, "000000", 1)
+            i += 1
+        r = transmisor.resumen()
+        resultado[modo] = {"despertares": despertares, "tramas": r["tramas_enviadas"], "bytes": r["bytes_enviados"]}
+    return resultado
+
+
+def main():
+    from rastreador.cli import resolver_cuerpo, resolver_ubicacion
+
+    parser = argparse.ArgumentParser(description="Eventos del cuerpo y ahorro al dormir entre ellos")
+    parser.add_argument("--cuerpo", type=lambda v: "Sol" if v.lower() == "sol" else resolver_cuerpo(v), default="Sol")
+    parser.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    parser.add_argument("--fecha", type=datetime.date.fromisoformat, default=None, help="Día UTC (por defecto hoy)")
+    parser.add_argument("--horas", type=float, default=24)
+    args = parser.parse_args()
+
+    loc = config.LOCATIONS[args.ubicacion]
+    lat, lon = loc["coords"]
+    fecha = args.fecha or datetime.datetime.now(datetime.timezone.utc).date()
+    inicio = datetime.datetime.combine(fecha, datetime.time(), datetime.timezone.utc).timestamp()
+
+    ev = Agenda(args.cuerpo, lat, lon, loc.get("elevation", 0)).eventos(inicio)
+    print(f"{args.cuerpo} en {loc['name']} desde {fecha} 00:00 UTC ({'arriba' if ev['arriba'] else 'abajo'})")
+    for clave in ("salida", "transito", "puesta"):
+        hora = (datetime.datetime.fromtimestamp(ev[clave], datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+                if ev[clave] is not None else "nunca")
+        print(f"  {clave:>8}: {hora}")
+
+    r = comparar_dia(args.cuerpo, lat, lon, loc.get("elevation", 0), inicio, args.horas)
+    c, e = r["continuo"], r["eventos"]
+    for clave in ("despertares", "tramas", "bytes"):
+        ahorro = 100.0 * (1 - e[clave] / c[clave]) if c[clave] else 0.0
+        print(f"  {clave:>12}: {c[clave]:7d} continuo -> {e[clave]:7d} con eventos ({ahorro:.0f}% menos)")
+
+
+if __name__ == "__main__":
+    main()
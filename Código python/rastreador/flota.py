@@ -0,0 +1,219 @@
+"""
+Controlador de flota: muchos rastreadores (un enlace serie cada uno) desde un
+solo proceso.
+
+Por tick se hace un único cálculo de efemérides por lotes para todos los
+rastreadores (un `posicion_solar` para todos los sitios que siguen al sol y un
+cálculo por (cuerpo, sitio) distinto para el resto) y las tramas salen en
+paralelo por puertos no bloqueantes (TransporteSerie) atendidos por el event
+loop, sin un hilo por puerto.
+
+Configuración (JSON):
+
+    {"periodo": 1.0,
+     "rastreadores": [
+        {"nombre": "panel-1", "puerto": "/dev/rfcomm0", "baudios": 9600,
+         "ubicacion": {"coords": [4.7110, -74.0721], "tz": "America/Bogota", "elevation": 2640},
+         "cuerpo": "Sol", "id_zona": 1, "binaria": false,
+         "mapeo": {"amanecer": 60, "atardecer": 300, "servo_max": 270}}]}
+
+"ubicacion" también puede ser la clave o el nombre de una entrada de LOCATIONS
+(1 o "Madrid"); `main` pasa config.LOCATIONS a Flota. Sin "puerto" y con --falsos, cada rastreador se conecta a
+un pty (DispositivoFalso) para probar sin hardware:
+
+    python -m rastreador.flota flota.json --falsos --duracion 10
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import pty
+import time
+import tty
+
+import pytz
+
+from rastreador import trama as tramas
+from rastreador.asincrono import Planificador
+from rastreador.mapeo import map_azimut
+from rastreador.solar import posicion_solar
+from rastreador.transporte import TransporteSerie
+
+
+class DispositivoFalso:
+    """ Extremo 'FPGA' de un pty: lo que el maestro escribe en `ruta` se acumula en `recibido` """
+
+    def __init__(self):
+        self.maestro, self._esclavo = pty.openpty()
+        tty.setraw(self._esclavo)
+        self.ruta = os.ttyname(self._esclavo)
+        os.set_blocking(self.maestro, False)
+        self.recibido = bytearray()
+
+    def conectar(self, loop):
+        loop.add_reader(self.maestro, self.leer)
+
+    def leer(self):
+        try:
+            self.recibido += os.read(self.maestro, 65536)
+        except (BlockingIOError, OSError):
+            pass
+
+    def cerrar(self, loop=None):
+        if loop is not None:
+            loop.remove_reader(self.maestro)
+        os.close(self.maestro)
+        os.close(self._esclavo)
+
+
+class Flota:
+    """ Rastreadores normalizados + cálculo por lotes de sus objetivos """
+
+    def __init__(self, config, ubicaciones=None):
+        self.periodo = config.get("periodo", 1.0)
+        self.rastreadores = [self._normalizar(r, i, ubicaciones)
+                             for i, r in enumerate(config["rastreadores"])]
+
+    @staticmethod
+    def _normalizar(r, i, ubicaciones):
+        nombre = r.get("nombre", f"rastreador-{i + 1}")
+        loc = r["ubicacion"]
+        if not isinstance(loc, dict):
+            if ubicaciones is None:
+                raise ValueError(f"El rastreador {nombre} usa la ubicación {loc!r} pero no se pasaron ubicaciones")
+            from rastreador.cli import resolver_ubicacion
+            try:
+                # En JSON las claves llegan como texto ("1"); también vale el nombre
+                loc = ubicaciones[resolver_ubicacion(loc, ubicaciones)]
+            except argparse.ArgumentTypeError as e:
+                raise ValueError(f"El rastreador {nombre}: {e}") from None
+        mapeo = r.get("mapeo", {})
+        return {
+            "nombre": nombre,
+            "puerto": r.get("puerto"),
+            "baudios": r.get("baudios", 9600),
+            "sitio": (float(loc["coords"][0]), float(loc["coords"][1]), float(loc.get("elevation", 0))),
+            "tz": pytz.timezone(loc.get("tz", "UTC")),
+            "cuerpo": r.get("cuerpo", "Sol"),
+            "id_zona": r.get("id_zona", 1),
+            "binaria": r.get("binaria", False),
+            "mapeo": (mapeo.get("amanecer", 60), mapeo.get("atardecer", 300), mapeo.get("servo_max", 270)),
+        }
+
+    def posiciones(self, instante):
+        """ (az, el) reales de cada rastreador, con un solo cálculo por sitio/cuerpo distinto """
+        resultado = [None] * len(self.rastreadores)
+
+        solares = [i for i, r in enumerate(self.rastreadores) if r["cuerpo"] == "Sol"]
+        if solares:
+            sitios = sorted({self.rastreadores[i]["sitio"] for i in solares})
+            az, el = posicion_solar(instante, sitios)
+            por_sitio = {s: (float(az[k, 0]), float(el[k, 0])) for k, s in enumerate(sitios)}
+            for i in solares:
+                resultado[i] = por_sitio[self.rastreadores[i]["sitio"]]
+
+        otros = {}
+        if len(solares) < len(self.rastreadores):
+            # ephem solo se importa si algún rastreador sigue otro cuerpo
+            from rastreador.celeste import POOL
+        for i, r in enumerate(self.rastreadores):
+            if r["cuerpo"] == "Sol":
+                continue
+            clave = (r["cuerpo"],) + r["sitio"]
+            if clave not in otros:
+                otros[clave] = POOL.posicion(r["cuerpo"], *r["sitio"],
+                                             datetime.datetime.fromtimestamp(instante, datetime.timezone.utc))
+            resultado[i] = otros[clave]
+        return resultado
+
+    def tramas(self, instante):
+        """ Trama (bytes) para cada rastreador en `instante` (segundos POSIX) """
+        horas = {}
+        salida = []
+        for r, (az, el) in zip(self.rastreadores, self.posiciones(instante)):
+            if r["tz"] not in horas:
+                horas[r["tz"]] = datetime.datetime.fromtimestamp(instante, r["tz"]).strftime("%H%M%S")
+            servo_az = map_azimut(az, *r["mapeo"])
+            servo_el = int(max(0, el))
+            if r["binaria"]:
+                salida.append(tramas.trama_binaria(servo_az, servo_el, horas[r["tz"]], r["id_zona"]))
+            else:
+                salida.append(tramas.trama_ascii(servo_az, servo_el, horas[r["tz"]], r["id_zona"]))
+        return salida
+
+
+async def ejecutar_flota(flota, duracion=None, falsos=False):
+    """ Abre los enlaces, envía a la tasa de la flota y devuelve estadísticas """
+    import serial
+
+    # Antes de abrir nada: serial.Serial(None) no falla hasta el primer write
+    sin_puerto = [r["nombre"] for r in flota.rastreadores if r["puerto"] is None]
+    if sin_puerto and not falsos:
+        if len(sin_puerto) == 1:
+            raise ValueError(f"El rastreador {sin_puerto[0]} no tiene puerto (use --falsos)")
+        raise ValueError(f"Los rastreadores {', '.join(sin_puerto)} no tienen puerto (use --falsos)")
+    loop = asyncio.get_running_loop()
+    puertos, enlaces, dispositivos = [], [], []
+    try:
+        for r in flota.rastreadores:
+            ruta = r["puerto"]
+            if ruta is None and falsos:
+                disp = DispositivoFalso()
+                disp.conectar(loop)
+                dispositivos.append(disp)
+                ruta = disp.ruta
+            puerto = serial.Serial(ruta, r["baudios"], timeout=0, write_timeout=0)
+            puertos.append(puerto)
+            # Anillo de 1: si el enlace va lento, la trama que espera se reemplaza por la nueva
+            enlaces.append(TransporteSerie(puerto, capacidad=1, loop=loop))
+
+        planificador = Planificador(flota.periodo)
+        inicio = time.monotonic()
+        while duracion is None or time.monotonic() - inicio < duracion:
+            await planificador.esperar()
+            for enlace, datos in zip(enlaces, flota.tramas(time.time())):
+                enlace.enviar(datos)
+        await asyncio.sleep(0.1)    # Dejar salir lo último
+    finally:
+        for enlace in enlaces:
+            enlace.cerrar()
+        for puerto in puertos:
+            puerto.close()
+        for disp in dispositivos:
+            disp.cerrar(loop)
+
+    est = planificador.estadisticas()
+    est["tramas_escritas"] = sum(e.escritas for e in enlaces)
+    est["tramas_reemplazadas"] = sum(e.coalescidas for e in enlaces)
+    est["bytes_escritos"] = sum(e.bytes_escritos for e in enlaces)
+    if dispositivos:
+        est["bytes_recibidos_falsos"] = sum(len(d.recibido) for d in dispositivos)
+    return est
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Controlador de flota de rastreadores")
+    parser.add_argument("config", help="Archivo JSON de la flota")
+    parser.add_argument("--duracion", type=float, default=None, help="Segundos a ejecutar (por defecto, sin fin)")
+    parser.add_argument("--falsos", action="store_true", help="Rastreadores sin puerto usan un pty falso")
+    args = parser.parse_args()
+
+    from rastreador import config
+
+    with open(args.config, encoding="utf-8") as f:
+        try:
+            flota = Flota(json.load(f), config.LOCATIONS)
+        except ValueError as e:
+            parser.error(str(e))
+    print(f"Flota: {len(flota.rastreadores)} rastreadores, periodo {flota.periodo}s")
+    try:
+        print(asyncio.run(ejecutar_flota(flota, args.duracion, args.falsos)))
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        print("\nFlota detenida.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Mapeo del azimut real (geográfico) al ángulo del servo (físico).
+
+Grados enteros (truncados) para las tramas ASCII y compacta; décimas de grado
+redondeadas para la trama precisa de los servos de 12 bits.
+"""
+# Rango útil por defecto: 60° -> servo 0, 300° -> servo 270
+AZIMUT_AMANECER = 60
+AZIMUT_ATARDECER = 300
+SERVO_MAX_DEG = 270
+
+
+def map_azimut(real_az, amanecer=AZIMUT_AMANECER, atardecer=AZIMUT_ATARDECER, servo_max=SERVO_MAX_DEG):
+    """ Mapea el azimut real al rango de `servo_max` grados del servo """
+    if real_az < amanecer: return 0
+    elif real_az > atardecer: return servo_max
+
+    span_sol = atardecer - amanecer
+    recorrido = real_az - amanecer
+    servo_angle = (recorrido * servo_max) / span_sol
+    return int(servo_angle)
+
+
+def map_azimut_arr(real_az, amanecer=AZIMUT_AMANECER, atardecer=AZIMUT_ATARDECER, servo_max=SERVO_MAX_DEG):
+    """ map_azimut para un arreglo NumPy completo (mismo truncamiento a entero) """
+    import numpy as np
+    real_az = np.asarray(real_az, dtype=np.float64)
+    servo = ((real_az - amanecer) * servo_max / (atardecer - amanecer)).astype(np.int64)
+    servo = np.where(real_az < amanecer, 0, servo)
+    return np.where(real_az > atardecer, servo_max, servo)
+
+
+def map_azimut_decimas(real_az, amanecer=AZIMUT_AMANECER, atardecer=AZIMUT_ATARDECER, servo_max=SERVO_MAX_DEG):
+    """ map_azimut en décimas de grado del servo, redondeado (trama precisa) """
+    if real_az < amanecer: return 0
+    elif real_az > atardecer: return servo_max * 10
+    return int(round((real_az - amanecer) * servo_max * 10 / (atardecer - amanecer)))
+
+
+def elevacion_decimas(el):
+    """ Elevación en décimas de grado, redondeada; bajo el horizonte es 0 """
+    return int(round(max(0.0, el) * 10))
+
+
+def map_azimut_decimas_arr(real_az, amanecer=AZIMUT_AMANECER, atardecer=AZIMUT_ATARDECER, servo_max=SERVO_MAX_DEG):
+    """ map_azimut_decimas para un arreglo NumPy completo """
+    import numpy as np
+    real_az = np.asarray(real_az, dtype=np.float64)
+    servo = np.rint((real_az - amanecer) * servo_max * 10 / (atardecer - amanecer)).astype(np.int64)
+    servo = np.where(real_az < amanecer, 0, servo)
+    return np.where(real_az > atardecer, servo_max * 10, servo)
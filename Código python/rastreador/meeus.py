@@ -0,0 +1,91 @@
+"""
+Núcleo del algoritmo solar, sin NumPy: constantes y series de Meeus.
+
+Lo comparten `rastreador.solar` (arreglos) y `rastreador.solar_escalar`
+(un instante, para el arranque) para que haya un solo juego de
+coeficientes. Cada función recibe `m`, el espacio de funciones
+trigonométricas: `math` para floats o el de NumPy (solar.NP) para arreglos;
+el resto es aritmética que sirve para ambos.
+"""
+import math
+
+# TT - UTC en segundos (37 s de leap seconds + 32.184 s), igual que pysolar
+DELTA_T = 69.184
+
+# Valores por defecto de pysolar para la refracción (K y Pa)
+TEMPERATURA_STD = 288.15
+PRESION_STD = 101325.0
+# Por debajo de esta altitud (grados) pysolar no corrige refracción
+HORIZONTE_REFRACCION = -(0.26667 + 0.5667)
+
+RADIO_TIERRA = 6378140.0 # metros, constante usada por pysolar
+JD_UNIX = 2440587.5      # Día juliano de 1970-01-01T00:00Z
+J2000 = 2451545.0
+ACHATAMIENTO = 0.99664719           # b/a del elipsoide, para el paralaje
+PARALAJE_ECUATORIAL = 8.794         # Segundos de arco a 1 UA
+
+
+def coordenadas_sol(segundos, m=math):
+    """ Ascensión recta, declinación (grados), distancia (UA) y tiempo sidéreo aparente de Greenwich """
+    jd = segundos / 86400.0 + JD_UNIX
+    t = (jd + DELTA_T / 86400.0 - J2000) / 36525.0
+
+    l0 = 280.46646 + t * (36000.76983 + 0.0003032 * t)
+    anomalia = m.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    c = ((1.914602 - t * (0.004817 + 0.000014 * t)) * m.sin(anomalia)
+         + (0.019993 - 0.000101 * t) * m.sin(2 * anomalia)
+         + 0.000289 * m.sin(3 * anomalia))
+    longitud_verdadera = l0 + c
+    v = anomalia + m.radians(c)
+    distancia = 1.000001018 * (1 - e * e) / (1 + e * m.cos(v))
+
+    # Nutación (término principal) y aberración
+    omega = m.radians(125.04452 - 1934.136261 * t)
+    nut_lon = -0.00478 * m.sin(omega)
+    nut_obl = 0.00256 * m.cos(omega)
+    lam = m.radians(longitud_verdadera - 0.00569 + nut_lon)
+
+    eps0 = 23.0 + (26.0 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60.0) / 60.0
+    eps = m.radians(eps0 + nut_obl)
+
+    alfa = m.degrees(m.atan2(m.cos(eps) * m.sin(lam), m.cos(lam))) % 360
+    delta = m.degrees(m.asin(m.sin(eps) * m.sin(lam)))
+
+    tu = (jd - J2000) / 36525.0
+    gmst = 280.46061837 + 360.98564736629 * (jd - J2000) + 0.000387933 * tu * tu
+    gast = (gmst + nut_lon * m.cos(eps)) % 360
+    return alfa, delta, distancia, gast
+
+
+def topocentrica(alfa, delta, distancia, gast, lat, lon, elevacion, m=math):
+    """ (azimut, altitud geométrica) en grados, con el paralaje del observador """
+    # Distancias proyectadas del observador (radios terrestres)
+    phi = m.radians(lat)
+    u = m.atan(ACHATAMIENTO * m.tan(phi))
+    rho_cos = m.cos(u) + elevacion * m.cos(phi) / RADIO_TIERRA
+    rho_sin = ACHATAMIENTO * m.sin(u) + elevacion * m.sin(phi) / RADIO_TIERRA
+
+    # Ángulo horario local geocéntrico
+    h = m.radians((gast + lon - alfa) % 360)
+    dec = m.radians(delta)
+    xi = m.radians(PARALAJE_ECUATORIAL / 3600.0 / distancia)
+
+    # Paralaje en ascensión recta y declinación topocéntrica
+    d_alfa = m.atan2(-rho_cos * m.sin(xi) * m.sin(h),
+                     m.cos(dec) - rho_cos * m.sin(xi) * m.cos(h))
+    dec_topo = m.atan2((m.sin(dec) - rho_sin * m.sin(xi)) * m.cos(d_alfa),
+                       m.cos(dec) - rho_sin * m.sin(xi) * m.cos(h))
+    h_topo = h - d_alfa
+
+    altitud = m.degrees(m.asin(m.sin(phi) * m.sin(dec_topo)
+                               + m.cos(phi) * m.cos(dec_topo) * m.cos(h_topo)))
+    azimut = (180.0 + m.degrees(m.atan2(m.sin(h_topo),
+                                        m.cos(h_topo) * m.sin(phi) - m.tan(dec_topo) * m.cos(phi)))) % 360
+    return azimut, altitud
+
+
+def correccion_refraccion(elev_deg, presion=PRESION_STD, temperatura=TEMPERATURA_STD, m=math):
+    """ Refracción de pysolar (SPA de NREL) sin el corte en HORIZONTE_REFRACCION """
+    return (presion * 2.830 * 1.02
+            / (1010.0 * temperatura * 60.0 * m.tan(m.radians(elev_deg + 10.3 / (elev_deg + 5.11)))))
@@ -0,0 +1,214 @@
+"""
+Tiempos por etapa del bucle de rastreo, con histogramas móviles y un
+endpoint HTTP local.
+
+Cada tick se mide con un cronómetro que registra el tiempo transcurrido desde
+la marca anterior:
+
+    c = metricas.cronometro()
+    az, el = ...;            c.marca("efemerides")
+    servo_az = ...;          c.marca("mapeo")
+    transmisor.enviar(serie, ...)      # serie = metricas.serie(transporte)
+    c.terminar()                       # "tick": duración total
+    metricas.dormir(1)                 # "retraso_sleep": lo que se pasó el sleep
+
+`metricas.serie(destino)` envuelve el puerto para separar la codificación de
+la trama ("codificacion") de la escritura ("escritura_serie"). Un write
+lento apunta a un enlace Bluetooth atascado; un "retraso_sleep" alto, a un
+nodo sin CPU.
+
+Desactivadas (`crear_metricas(None)`) se usa METRICAS_NULAS: cronómetro y
+marcas que no hacen nada, `serie()` devuelve el mismo destino y `dormir` es
+time.sleep.
+
+Con puerto, `ServidorMetricas` atiende en 127.0.0.1:
+    /metrics       texto de Prometheus (summary con p50/p95/p99)
+    /metrics.json  lo mismo en JSON
+"""
+import collections
+import time
+
+VENTANA = 1024          # Muestras por etapa para los percentiles
+CUANTILES = (0.50, 0.95, 0.99)
+PREFIJO = "rastreador_etapa_segundos"
+
+
+class Histograma:
+    """ Últimas VENTANA muestras (percentiles) más totales acumulados """
+
+    def __init__(self, ventana=VENTANA):
+        self.muestras = collections.deque(maxlen=ventana)
+        self.cuenta = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.muestras.append(segundos)
+        self.cuenta += 1
+        self.suma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def resumen(self):
+        muestras = sorted(list(self.muestras))
+        pct = lambda p: muestras[min(len(muestras) - 1, int(p * len(muestras)))] if muestras else 0.0
+        res = {f"p{int(q * 100)}": pct(q) for q in CUANTILES}
+        res.update(cuenta=self.cuenta, suma=self.suma, maximo=self.maximo)
+        return res
+
+
+class Cronometro:
+    """ Marcas sucesivas dentro de un tick """
+    __slots__ = ("metricas", "t0", "t")
+
+    def __init__(self, metricas):
+        self.metricas = metricas
+        self.t0 = self.t = time.perf_counter()
+
+    def marca(self, etapa):
+        ahora = time.perf_counter()
+        self.metricas.observar(etapa, ahora - self.t)
+        self.t = ahora
+
+    def terminar(self, etapa="tick"):
+        self.metricas.observar(etapa, time.perf_counter() - self.t0)
+        self.metricas.actual = None
+
+
+class SerieMedida:
+    """ Puerto envuelto: marca 'codificacion' al entrar a write y 'escritura_serie' al salir """
+
+    def __init__(self, destino, metricas):
+        self.destino = destino
+        self.metricas = metricas
+
+    def write(self, datos):
+        c = self.metricas.actual
+        if c is None:
+            return self.destino.write(datos)
+        c.marca("codificacion")
+        n = self.destino.write(datos)
+        c.marca("escritura_serie")
+        return n
+
+    def __getattr__(self, nombre):
+        return getattr(self.destino, nombre)
+
+
+class Metricas:
+    def __init__(self, ventana=VENTANA):
+        self.ventana = ventana
+        self.etapas = {}
+        self.actual = None
+
+    def observar(self, etapa, segundos):
+        h = self.etapas.get(etapa)
+        if h is None:
+            h = self.etapas[etapa] = Histograma(self.ventana)
+        h.observar(segundos)
+
+    def cronometro(self):
+        self.actual = Cronometro(self)
+        return self.actual
+
+    def serie(self, destino):
+        return SerieMedida(destino, self)
+
+    def dormir(self, segundos):
+        t = time.perf_counter()
+        time.sleep(segundos)
+        self.observar("retraso_sleep", time.perf_counter() - t - segundos)
+
+    def resumen(self):
+        return {etapa: h.resumen() for etapa, h in list(self.etapas.items())}
+
+    def prometheus(self):
+        lineas = [f"# HELP {PREFIJO} Duración de cada etapa del tick de rastreo",
+                  f"# TYPE {PREFIJO} summary"]
+        for etapa, r in self.resumen().items():
+            for q in CUANTILES:
+                lineas.append(f'{PREFIJO}{{etapa="{etapa}",quantile="{q}"}} {r[f"p{int(q * 100)}"]:.9f}')
+            lineas.append(f'{PREFIJO}_sum{{etapa="{etapa}"}} {r["suma"]:.9f}')
+            lineas.append(f'{PREFIJO}_count{{etapa="{etapa}"}} {r["cuenta"]}')
+        return "\n".join(lineas) + "\n"
+
+
+class _CronometroNulo:
+    __slots__ = ()
+
+    def marca(self, etapa):
+        pass
+
+    def terminar(self, etapa="tick"):
+        pass
+
+
+class MetricasNulas:
+    """ Misma interfaz que Metricas, sin costo """
+    actual = None
+    _cronometro = _CronometroNulo()
+
+    def observar(self, etapa, segundos):
+        pass
+
+    def cronometro(self):
+        return self._cronometro
+
+    def serie(self, destino):
+        return destino
+
+    def dormir(self, segundos):
+        time.sleep(segundos)
+
+    def resumen(self):
+        return {}
+
+
+METRICAS_NULAS = MetricasNulas()
+
+
+class ServidorMetricas:
+    """ HTTP en un hilo demonio; solo lectura de `metricas` """
+
+    def __init__(self, metricas, puerto, host="127.0.0.1"):
+        # Solo aquí: http.server tarda más en importarse que todo el bucle de rastreo
+        import http.server
+        import json
+        import threading
+
+        class Manejador(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    cuerpo, tipo = metricas.prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    cuerpo, tipo = json.dumps(metricas.resumen()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                datos = cuerpo.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = http.server.ThreadingHTTPServer((host, puerto), Manejador)
+        self.servidor.daemon_threads = True
+        self.hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.hilo.start()
+
+    def cerrar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+def crear_metricas(puerto=None, host="127.0.0.1"):
+    """ METRICAS_NULAS si puerto es None; si no, Metricas servidas en host:puerto """
+    if puerto is None:
+        return METRICAS_NULAS
+    metricas = Metricas()
+    metricas.servidor = ServidorMetricas(metricas, puerto, host)
+    return metricas
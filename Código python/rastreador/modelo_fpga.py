@@ -0,0 +1,384 @@
+"""
+Modelo en Python de la FPGA (Modulos verilog/FINAL-*.v), sin flashear la Cyclone IV.
+
+Cubre el camino trama -> servo de SolarTracker_Top con la aritmética de
+los módulos y tiempos aproximados al ciclo, pero sin simular cada ciclo de
+50 MHz:
+
+- enlace: cada trama llega al HC-05 `latencia_s` después del write() y los
+  bytes salen por la UART uno tras otro (10 bits a `baudios`);
+- uart_rx: data_ready CICLOS_RX ciclos después del bit de inicio;
+- bt_data_parser_v2 y bt_binary_parser en paralelo, byte a byte, con sus
+  máquinas de estado tal cual (incluido que GET_EL_1 descarta la centena
+  de la elevación), CRC y rangos de la binaria, y el mux `usar_binario`;
+- conversión ASCII -> entero y escalado a target_pos de 12 bits, con el
+  ancho de los wires (16 bits) y la división entera de FINAL-top.v;
+- servo_pwm_smooth: una unidad por CICLOS_PASO ciclos de reloj (contador
+  libre desde el reset), vectorizado entre eventos.
+
+`simular` devuelve los eventos (trama aceptada -> nuevo target_pos) y la
+traza de current_pos/pulso/ángulo en los instantes pedidos. `verificar`
+compara cada trama aceptada con lo que Python quiso enviar.
+
+    python -m rastreador.modelo_fpga --ubicacion 1 --fecha 2025-06-21
+    python -m rastreador.modelo_fpga --barrido-el       # elevaciones 0-180 en ASCII
+"""
+import argparse
+import datetime
+
+import numpy as np
+
+from rastreador import config
+from rastreador import trama as tramas
+from rastreador.anticipacion import LATENCIA_BT_S, RANGO_AZ_FPGA, RANGO_EL_FPGA, a_unidades
+
+# --- RELOJ Y UART (FINAL-top.v / FINAL-UART.v) ---
+CLK_HZ = 50_000_000
+CLKS_POR_BIT = CLK_HZ // config.BAUD_RATE
+MEDIO_BIT = CLKS_POR_BIT // 2
+# Flanco del bit de inicio -> data_ready: 2 registros de sincronización + IDLE,
+# START_BIT cuenta 0..MEDIO_BIT y cada bit de datos y el de stop 0..CLKS_POR_BIT
+CICLOS_RX = 3 + (MEDIO_BIT + 1) + 9 * (CLKS_POR_BIT + 1)
+# data_ready -> salidas del parser (estado UPDATE) -> target_pos combinacional
+CICLOS_PARSER = 2
+
+# --- SERVOS (FINAL-servo_controller.v con los parámetros de FINAL-top.v) ---
+POS_BITS = 12
+POS_MAX = (1 << POS_BITS) - 1
+POS_CENTRO = POS_MAX // 2
+SMOOTH_DELAY_US = 623
+# move_timer cuenta 0..STEP_DELAY_CYCLES y vuelve a 0: un paso cada STEP_DELAY_CYCLES + 1 ciclos
+CICLOS_PASO = (CLK_HZ // 1_000_000) * SMOOTH_DELAY_US + 1
+MIN_PULSE_US = 500
+MAX_PULSE_US = 2500
+SERVO_RANGO_DEG = 270
+PERIODO_PWM_S = 0.020
+
+
+# --- ENLACE Y UART ---
+
+def tiempos_bytes(t_tramas, largos, baudios=config.BAUD_RATE, latencia_s=LATENCIA_BT_S):
+    """
+    data_ready (s) de cada byte. Las tramas llegan al HC-05 en t + latencia
+    y la UART las saca en cola: inicio_j = max(llegada_j, inicio_{j-1} + 10 bits).
+    """
+    t_byte = 10.0 / baudios
+    llegada = np.repeat(np.asarray(t_tramas, dtype=np.float64) + latencia_s, largos)
+    j = np.arange(len(llegada))
+    # Recurrencia de la cola resuelta con un máximo acumulado
+    inicio = j * t_byte + np.maximum.accumulate(llegada - j * t_byte)
+    return inicio + CICLOS_RX / CLK_HZ
+
+
+# --- PARSERS (FINAL-data_parser.v) ---
+
+def parsear_ascii(datos):
+    """
+    bt_data_parser_v2 byte a byte: [(índice del último byte, (az_h, az_t, az_u, el_t, el_u))]
+    con los bytes crudos tal como quedan en los registros de salida.
+    """
+    A, E, H, I = 0x41, 0x45, 0x48, 0x49
+    estado = 0
+    b_ah = b_at = b_au = b_et = b_eu = 0x30
+    aceptadas = []
+    for i, x in enumerate(datos):
+        if estado == 0:
+            if x == A: estado = 1
+        elif estado == 1: b_ah = x; estado = 2
+        elif estado == 2: b_at = x; estado = 3
+        elif estado == 3: b_au = x; estado = 4
+        elif estado == 4: estado = 5 if x == E else 0
+        elif estado == 5: estado = 6                 # GET_EL_1: la centena se ignora
+        elif estado == 6: b_et = x; estado = 7
+        elif estado == 7: b_eu = x; estado = 8
+        elif estado == 8: estado = 9 if x == H else 0
+        elif estado < 15: estado += 1                # GET_H1..GET_S0: hora (solo LCD)
+        elif estado == 15: estado = 16 if x == I else 0
+        else:                                        # GET_ID -> UPDATE -> IDLE
+            aceptadas.append((i, (b_ah, b_at, b_au, b_et, b_eu)))
+            estado = 0
+    return aceptadas
+
+
+def parsear_binario(datos):
+    """
+    bt_binary_parser byte a byte: ([(índice del último byte, az_dd, el_dd)], crc_errors).
+    crc_errors es el contador de 8 bits de la FPGA (da la vuelta en 256).
+    """
+    tabla = tramas.TABLA_CRC8
+    estado = 0
+    precisa = False
+    crc = 0
+    pos = tiempo = 0
+    errores = 0
+    aceptadas = []
+    for i, x in enumerate(datos):
+        if estado == 0:
+            crc = 0
+            pos = 0
+            if x == tramas.SYNC_BINARIA: precisa = False; estado = 2
+            elif x == tramas.SYNC_PRECISA: precisa = True; estado = 1
+        elif estado <= 3:                            # B_POS_X, B_POS_H, B_POS_L
+            pos = (pos & ~(0xFF << (8 * (3 - estado)))) | (x << (8 * (3 - estado)))
+            crc = tabla[crc ^ x]
+            estado += 1
+        elif estado <= 6:                            # B_T2, B_T1, B_T0
+            tiempo = (tiempo & ~(0xFF << (8 * (6 - estado)))) | (x << (8 * (6 - estado)))
+            crc = tabla[crc ^ x]
+            estado += 1
+        else:                                        # B_CRC (+ B_UPDATE en el ciclo siguiente)
+            estado = 0
+            if x != crc:
+                errores += 1
+                continue
+            if precisa:
+                az_dd, el_dd = pos >> 12, pos & 0xFFF
+            else:
+                az_dd, el_dd = ((pos >> 7) & 0x1FF) * 10, (pos & 0x7F) * 10
+            hh, mm, ss = tiempo >> 19, (tiempo >> 13) & 0x3F, (tiempo >> 7) & 0x3F
+            zona = (tiempo >> 3) & 0xF
+            if az_dd <= 2700 and el_dd <= 1800 and hh < 24 and mm < 60 and ss < 60 and zona <= 9:
+                aceptadas.append((i, az_dd & 0xFFF, el_dd))
+            else:
+                errores += 1
+    return aceptadas, errores & 0xFF
+
+
+# --- FINAL-top.v ---
+
+def ascii_a_decimas(digitos):
+    """ azimut_input/elevacion_input (16 bits) * 10 -> az_decimas/el_decimas (16 bits), como en la FPGA """
+    ah, at, au, et, eu = digitos
+    azimut = (((ah - 48) * 100) + ((at - 48) * 10) + (au - 48)) & 0xFFFF
+    elevacion = (((et - 48) * 10) + (eu - 48)) & 0xFFFF
+    return (azimut * 10) & 0xFFFF, (elevacion * 10) & 0xFFFF
+
+
+def escalar(az_decimas, el_decimas):
+    """ servo_pos_az/el de 12 bits """
+    u_az = POS_MAX if az_decimas >= RANGO_AZ_FPGA else (az_decimas * POS_MAX // RANGO_AZ_FPGA) & POS_MAX
+    u_el = POS_MAX if el_decimas >= RANGO_EL_FPGA else (el_decimas * POS_MAX // RANGO_EL_FPGA) & POS_MAX
+    return u_az, u_el
+
+
+def pulso_us(pos):
+    """ Ancho del pulso PWM (µs) para current_pos, con la división entera en ciclos """
+    minimo = MIN_PULSE_US * (CLK_HZ // 1_000_000)
+    span = (MAX_PULSE_US - MIN_PULSE_US) * (CLK_HZ // 1_000_000)
+    return (minimo + span * np.asarray(pos, dtype=np.int64) // POS_MAX) / (CLK_HZ / 1e6)
+
+
+def angulo_servo(pos):
+    """ Grados físicos del servo (pulso 500-2500 µs = 0-270°) """
+    return (pulso_us(pos) - MIN_PULSE_US) * SERVO_RANGO_DEG / (MAX_PULSE_US - MIN_PULSE_US)
+
+
+def eventos_top(datos, t_bytes):
+    """
+    Une las tramas aceptadas de ambos parsers en orden: arreglos
+    (t, byte_final, binaria, az_dd, el_dd, u_az, u_el) y crc_errors.
+    """
+    a = parsear_ascii(datos)
+    b, errores = parsear_binario(datos)
+    # En el mismo byte manda la binaria (`else if (ascii_ok)` en usar_binario); no ocurre con tramas reales
+    crudo = sorted([(i, 1, az_dd, el_dd) for i, az_dd, el_dd in b]
+                   + [(i, 0) + ascii_a_decimas(d) for i, d in a],
+                   key=lambda e: (e[0], -e[1]))
+    n = len(crudo)
+    ev = {"t": np.empty(n), "byte": np.empty(n, dtype=np.int64), "binaria": np.empty(n, dtype=bool),
+          "az_dd": np.empty(n, dtype=np.int64), "el_dd": np.empty(n, dtype=np.int64),
+          "u_az": np.empty(n, dtype=np.int64), "u_el": np.empty(n, dtype=np.int64)}
+    for k, (i, binaria, az_dd, el_dd) in enumerate(crudo):
+        ev["byte"][k], ev["binaria"][k], ev["az_dd"][k], ev["el_dd"][k] = i, binaria, az_dd, el_dd
+        ev["u_az"][k], ev["u_el"][k] = escalar(az_dd, el_dd)
+    ev["t"] = t_bytes[ev["byte"]] + CICLOS_PARSER / CLK_HZ if n else ev["t"]
+    return ev, errores
+
+
+# --- servo_pwm_smooth ---
+
+def _pasos(t, t_reset):
+    """ Pasos de rampa dados desde el reset hasta t (incluido) """
+    return np.floor((np.asarray(t) - t_reset) * CLK_HZ / CICLOS_PASO).astype(np.int64)
+
+
+def rampa(t_eventos, objetivos, t_muestras, t_reset=0.0, inicial=POS_CENTRO):
+    """
+    current_pos en `t_muestras` para un eje. El objetivo tras el reset es 0
+    (los registros del parser ASCII arrancan en "0"); luego cambia en cada
+    evento. Devuelve también la posición al llegar cada evento.
+    """
+    t_ev = np.concatenate([[t_reset], np.asarray(t_eventos, dtype=np.float64)])
+    obj = np.concatenate([[0], np.asarray(objetivos, dtype=np.int64)])
+    pasos_ev = _pasos(t_ev, t_reset)
+    pos_ev = np.empty(len(t_ev), dtype=np.int64)
+    pos_ev[0] = inicial
+    # Posición al inicio de cada evento: bucle por evento (decenas de miles al día), no por ciclo
+    for k in range(1, len(t_ev)):
+        n = pasos_ev[k] - pasos_ev[k - 1]
+        d = obj[k - 1] - pos_ev[k - 1]
+        pos_ev[k] = pos_ev[k - 1] + max(-n, min(n, d))
+    t_muestras = np.asarray(t_muestras, dtype=np.float64)
+    k = np.maximum(np.searchsorted(t_ev, t_muestras, side="right") - 1, 0)
+    n = _pasos(t_muestras, t_reset) - pasos_ev[k]
+    d = obj[k] - pos_ev[k]
+    return pos_ev[k] + np.clip(d, -n, n), pos_ev[1:]
+
+
+def simular(tramas_enviadas, t_muestras=None, baudios=config.BAUD_RATE, latencia_s=LATENCIA_BT_S, t_reset=None):
+    """
+    tramas_enviadas: [(segundos del write(), bytes)]. t_muestras: instantes de
+    la traza (por defecto uno por periodo PWM desde el reset hasta 5 s
+    después de la última trama). Devuelve {eventos, crc_errors, muestras}.
+    """
+    if t_reset is None:
+        t_reset = tramas_enviadas[0][0] if tramas_enviadas else 0.0
+    largos = [len(d) for _, d in tramas_enviadas]
+    datos = b"".join(d for _, d in tramas_enviadas)
+    t_bytes = tiempos_bytes([t for t, _ in tramas_enviadas], largos, baudios, latencia_s)
+    ev, errores = eventos_top(datos, t_bytes)
+    # Trama de origen de cada evento (por el byte final)
+    ev["trama"] = np.searchsorted(np.cumsum(largos), ev["byte"], side="right")
+    if t_muestras is None:
+        fin = (tramas_enviadas[-1][0] if tramas_enviadas else t_reset) + 5.0
+        t_muestras = np.arange(t_reset, fin, PERIODO_PWM_S)
+    pos_az, ev["pos_az"] = rampa(ev["t"], ev["u_az"], t_muestras, t_reset)
+    pos_el, ev["pos_el"] = rampa(ev["t"], ev["u_el"], t_muestras, t_reset)
+    muestras = {"t": t_muestras, "pos_az": pos_az, "pos_el": pos_el,
+                "angulo_az": angulo_servo(pos_az), "angulo_el": angulo_servo(pos_el)}
+    return {"eventos": ev, "crc_errors": errores, "muestras": muestras, "bytes": len(datos)}
+
+
+# --- VERIFICACIÓN ---
+
+def esperado(trama):
+    """ (az_dd, el_dd) que Python quiso transmitir con esta trama, o None si no la reconoce """
+    if trama[:1] == bytes([tramas.SYNC_PRECISA]):
+        d = tramas.decodificar_precisa(trama)
+        return None if d is None else (d[0], d[1])
+    if trama[:1] == bytes([tramas.SYNC_BINARIA]):
+        d = tramas.decodificar_binaria(trama)
+        return None if d is None else (d[0] * 10, d[1] * 10)
+    try:
+        texto = trama.decode("ascii")
+        return int(texto[1:texto.index("E")]) * 10, int(texto[texto.index("E") + 1:texto.index("H")]) * 10
+    except ValueError:
+        return None
+
+
+def verificar(tramas_enviadas, resultado):
+    """
+    Compara el target_pos de cada trama con el que daría a_unidades sobre lo
+    enviado: {aceptadas, perdidas, discrepancias: [(trama, esperado, fpga)]}.
+    """
+    ev = resultado["eventos"]
+    aceptadas = set(ev["trama"].tolist())
+    discrepancias = []
+    for k in range(len(ev["t"])):
+        i = int(ev["trama"][k])
+        quiso = esperado(tramas_enviadas[i][1])
+        if quiso is None:
+            continue
+        obtuvo = (int(ev["u_az"][k]), int(ev["u_el"][k]))
+        if a_unidades(*quiso) != obtuvo:
+            discrepancias.append((i, quiso, obtuvo))
+    return {"aceptadas": len(aceptadas), "perdidas": len(tramas_enviadas) - len(aceptadas),
+            "discrepancias": discrepancias}
+
+
+def latencias(tramas_enviadas, resultado):
+    """
+    Por evento: write() -> target_pos y write() -> servo en el objetivo
+    (inf si otra trama cambia el objetivo antes de llegar).
+    """
+    ev = resultado["eventos"]
+    t_write = np.array([t for t, _ in tramas_enviadas])[ev["trama"]]
+    recorrido = np.maximum(np.abs(ev["u_az"] - ev["pos_az"]), np.abs(ev["u_el"] - ev["pos_el"]))
+    llegada = ev["t"] + recorrido * CICLOS_PASO / CLK_HZ
+    siguiente = np.concatenate([ev["t"][1:], [np.inf]])
+    llegada = np.where(llegada <= siguiente, llegada, np.inf)
+    return ev["t"] - t_write, llegada - t_write
+
+
+class SerieRegistro:
+    """ Sumidero que guarda (instante, bytes) de cada write() """
+    is_open = True
+
+    def __init__(self, reloj):
+        self.reloj = reloj
+        self.tramas = []
+
+    def write(self, datos):
+        self.tramas.append((self.reloj(), bytes(datos)))
+        return len(datos)
+
+
+def tramas_dia(id_loc, fecha, binaria=False, precisa=False, delta=True):
+    """ Tramas de un día de rastreo del sol a 1 Hz (con TransmisorDelta, como `modo_automatico`) """
+    import pytz
+    from rastreador.delta import TransmisorDelta
+    from rastreador.mapeo import map_azimut_arr, map_azimut_decimas_arr
+    from rastreador.simulacion import efemeride_sol
+
+    loc = config.LOCATIONS[id_loc]
+    tz = pytz.timezone(loc["tz"])
+    inicio = tz.localize(datetime.datetime.combine(fecha, datetime.time())).timestamp()
+    t = inicio + np.arange(86400, dtype=np.float64)
+    az, el = efemeride_sol(loc["coords"][0], loc["coords"][1], loc.get("elevation", 0))(t)
+    if precisa:
+        servo_az, servo_el = map_azimut_decimas_arr(az), np.rint(np.maximum(0.0, el) * 10).astype(np.int64)
+    else:
+        servo_az, servo_el = map_azimut_arr(az), np.maximum(0.0, el).astype(np.int64)
+    ahora = [inicio]
+    serie = SerieRegistro(lambda: ahora[0])
+    transmisor = TransmisorDelta(intervalo_clave=10.0 if delta else 0.0, binaria=binaria, precisa=precisa,
+                                 reloj=lambda: ahora[0])
+    horas = [datetime.datetime.fromtimestamp(s, tz).strftime("%H%M%S") for s in t]
+    for i in range(len(t)):
+        ahora[0] = t[i]
+        transmisor.enviar(serie, int(servo_az[i]), int(servo_el[i]), horas[i], id_loc)
+    return serie.tramas
+
+
+def main():
+    import time
+    from rastreador.cli import resolver_ubicacion
+
+    parser = argparse.ArgumentParser(description="Modelo de la FPGA: tramas -> ángulo real de los servos")
+    parser.add_argument("--ubicacion", type=resolver_ubicacion, default=1)
+    parser.add_argument("--fecha", type=datetime.date.fromisoformat, default=None)
+    parser.add_argument("--binaria", action="store_true")
+    parser.add_argument("--precisa", action="store_true")
+    parser.add_argument("--sin-delta", action="store_true", help="Una trama por segundo, sin TransmisorDelta")
+    parser.add_argument("--barrido-el", action="store_true",
+                        help="En vez del día, tramas ASCII con elevación 0-180 para ver qué llega al servo")
+    args = parser.parse_args()
+
+    if args.barrido_el:
+        enviadas = [(float(i), tramas.trama_ascii(135, el, "120000", 1)) for i, el in enumerate(range(181))]
+    else:
+        fecha = args.fecha or datetime.date.today()
+        enviadas = tramas_dia(args.ubicacion, fecha, args.binaria, args.precisa, delta=not args.sin_delta)
+
+    t0 = time.perf_counter()
+    r = simular(enviadas, t_muestras=np.arange(enviadas[0][0], enviadas[-1][0] + 5.0, PERIODO_PWM_S))
+    simulado = time.perf_counter() - t0
+    v = verificar(enviadas, r)
+    a_target, a_servo = latencias(enviadas, r)
+    llega = np.isfinite(a_servo)
+    print(f"{len(enviadas)} tramas, {r['bytes']} bytes, {len(r['muestras']['t'])} muestras PWM "
+          f"simuladas en {simulado:.2f} s")
+    print(f"Aceptadas {v['aceptadas']}, perdidas {v['perdidas']}, errores CRC/rango {r['crc_errors']}")
+    if len(a_target):
+        print(f"write() -> target_pos: mediana {np.median(a_target) * 1000:.1f} ms, máx {a_target.max() * 1000:.1f} ms")
+    if llega.any():
+        print(f"write() -> servo en el objetivo: mediana {np.median(a_servo[llega]) * 1000:.1f} ms, "
+              f"p99 {np.percentile(a_servo[llega], 99) * 1000:.1f} ms ({(~llega).sum()} tramas reemplazadas "
+              f"antes de llegar)")
+    print(f"Tramas cuyo target_pos no es el que Python quiso: {len(v['discrepancias'])}")
+    for i, quiso, obtuvo in v["discrepancias"][:5]:
+        print(f"  trama {i} {enviadas[i][1]!r}: esperado {a_unidades(*quiso)}, FPGA {obtuvo}")
+
+
+if __name__ == "__main__":
+    main()
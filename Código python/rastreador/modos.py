@@ -0,0 +1,443 @@
+"""
+Modos de operación: una sola implementación para el menú y la CLI.
+
+Cada modo recibe `serie` (pyserial, TransporteSerie o cualquier objeto con
+write()) y sus parámetros ya elegidos, así se puede lanzar sin preguntas
+(`python -m rastreador sol --ubicacion 1`). `menu()` es el menú interactivo
+de los scripts vN, hecho con estos mismos modos.
+
+numpy, ephem y pytz se importan dentro de cada modo: un comando corto no
+paga la carga de librerías que no usa (ver `python -m rastreador arranque`).
+"""
+import datetime
+import threading
+import time
+
+from rastreador import config
+from rastreador import trama as tramas
+from rastreador.mapeo import elevacion_decimas, map_azimut, map_azimut_decimas
+from rastreador.metricas import METRICAS_NULAS
+
+
+def _zona(loc):
+    import pytz
+    return pytz.timezone(loc["tz"])
+
+
+def _enviador(binaria, precisa=False):
+    """ enviar_trama con la firma de los scripts (sin el argumento binaria) """
+    def enviar(serie, az, el, hora_str, id_loc):
+        return tramas.enviar_trama(serie, az, el, hora_str, id_loc, binaria=binaria, precisa=precisa)
+    return enviar
+
+
+def _objetivo(az, el, precisa):
+    """ (servo_az, servo_el): grados truncados o, con `precisa`, décimas redondeadas """
+    if precisa:
+        return map_azimut_decimas(az), elevacion_decimas(el)
+    return map_azimut(az), int(max(0, el))
+
+
+def _servo_txt(servo_az, precisa):
+    return f"{servo_az / 10:.1f}" if precisa else f"{servo_az}"
+
+
+def _reproducir(motor, salida, mostrar):
+    """ Ejecuta el motor; si anticipó, informa el error de seguimiento """
+    try:
+        resultado = motor.ejecutar(salida)
+    except KeyboardInterrupt:
+        return salida.cerrar()
+    if motor.error:
+        from rastreador.anticipacion import describir
+        mostrar(describir(motor.error))
+    return resultado
+
+
+def _estacionar(agenda, segundos, precisa, cielo_completo=False):
+    """
+    Con el cuerpo bajo el horizonte: (despertar_s, servo_az, servo_el) para
+    dejar el panel en el azimut de la próxima salida, o None si toca rastrear.
+    """
+    plan = agenda.despertar(segundos)
+    if plan is None:
+        return None
+    despertar, az_salida = plan
+    if az_salida is None:
+        return despertar, None, 0
+    if cielo_completo:
+        from rastreador.cielo_completo import postura
+        grados = postura(az_salida, 0, False) or postura(az_salida, 0, True)
+        return despertar, round(grados[0] * 10), round(grados[1] * 10)
+    return (despertar,) + _objetivo(az_salida, 0, precisa)
+
+
+def _anotar(anotadores, *fila):
+    """ fila = (segundos, id_loc, cuerpo, az, el, servo_az, servo_el, trama) a Registro/Difusor """
+    for anotador in anotadores:
+        anotador.tick(*fila)
+
+
+def _dormir_estacionado(transmisor, serie, estacion, servo_az, tz, id_loc, nombre, mostrar, anotar=None):
+    """
+    Envía la trama de estacionamiento y duerme hasta el despertar (sin cálculo
+    ni tráfico); anotar(servo_az, servo_el, trama) la pasa al registro y la difusión.
+    """
+    from rastreador.eventos import dormir_hasta
+
+    despertar, az_park, el_park = estacion
+    az_park = servo_az if az_park is None else az_park
+    ahora = datetime.datetime.now(tz)
+    enviada = transmisor.enviar(serie, az_park, el_park, ahora.strftime("%H%M%S"), id_loc)
+    if anotar:
+        anotar(az_park, el_park, enviada)
+    hora = datetime.datetime.fromtimestamp(despertar, tz)
+    mostrar(f"{nombre} bajo el horizonte: panel estacionado, durmiendo hasta {hora.strftime('%Y-%m-%d %H:%M')}")
+    dormir_hasta(despertar)
+
+
+# --- MODOS SOL ---
+def rastrear_sol(serie, id_loc, ubicaciones=config.LOCATIONS, binaria=config.PROTOCOLO_BINARIO,
+                 metricas=METRICAS_NULAS, ticks=None, precisa=config.PROTOCOLO_PRECISO,
+                 dormir_eventos=config.DORMIR_ENTRE_EVENTOS, adaptativo=config.TICK_ADAPTATIVO, registro=None,
+                 telemetria=None, difusion=None, mostrar=print):
+    """
+    Tiempo real, un tick por segundo; devuelve el resumen del TransmisorDelta.
+    Con `dormir_eventos`, de noche estaciona el panel y duerme hasta la salida;
+    con `adaptativo`, cada tick duerme hasta el próximo paso del servo; con
+    `registro` (registro.Registro), guarda cada tick y la trama enviada; con
+    `telemetria` (telemetria.Telemetria en lazo cerrado), no envía mientras
+    el servo siga en camino al objetivo anterior; con `difusion`
+    (difusion.Difusor), publica cada tick en memoria compartida.
+    """
+    from rastreador.delta import TransmisorDelta
+    from rastreador.solar_escalar import posicion_solar_escalar
+
+    loc = ubicaciones[id_loc]
+    lat, lon = loc["coords"]
+    tz = _zona(loc)
+
+    # El primer tick no espera a NumPy: fórmula escalar hasta que la tabla esté lista
+    tabla = []
+    def cargar_tabla():
+        from rastreador.trayectoria import TablaTrayectoria
+        tabla.append(TablaTrayectoria({id_loc: loc}))
+    threading.Thread(target=cargar_tabla, daemon=True).start()
+
+    def posicion(segundos):
+        if tabla:
+            return tabla[0].posicion(id_loc, datetime.datetime.fromtimestamp(segundos, tz))
+        return posicion_solar_escalar(lat, lon, segundos, loc.get("elevation", 0))
+
+    # Solo transmitir cuando cambia el objetivo del servo (+ trama clave para el reloj)
+    transmisor = TransmisorDelta(binaria=binaria, precisa=precisa)
+    medida = metricas.serie(serie)
+    anotadores = [a for a in (registro, difusion) if a]
+    agenda = None
+    if dormir_eventos:
+        from rastreador.eventos import Agenda
+        agenda = Agenda("Sol", lat, lon, loc.get("elevation", 0))
+    planificador = None
+    if adaptativo:
+        from rastreador.adaptativo import Planificador
+        planificador = Planificador(posicion, precisa=precisa, binaria=binaria)
+        planificador.ajustar(transmisor)
+    mostrar(f"\nRastreando el sol en {loc['name']}... (Ctrl+C para salir)")
+    n = 0
+    try:
+        while ticks is None or n < ticks:
+            c = metricas.cronometro()
+            ahora = datetime.datetime.now(tz)
+            real_az, el = posicion(ahora.timestamp())
+            c.marca("efemerides")
+            real_el = int(max(0, el))
+            servo_az, servo_el = _objetivo(real_az, el, precisa)
+            c.marca("mapeo")
+            estacion = _estacionar(agenda, ahora.timestamp(), precisa) if agenda and el <= 0 else None
+            if estacion:
+                c.terminar()
+                _dormir_estacionado(transmisor, medida, estacion, servo_az, tz, id_loc, "El sol", mostrar,
+                                    anotadores and (lambda s_az, s_el, trama: _anotar(
+                                        anotadores, ahora.timestamp(), id_loc, "Sol", real_az, el, s_az, s_el,
+                                        trama)))
+                n += 1
+                continue
+            retenida = telemetria is not None and telemetria.retener()
+            enviada = None if retenida else transmisor.enviar(medida, servo_az, servo_el, ahora.strftime("%H%M%S"),
+                                                              id_loc)
+            c.terminar()
+            _anotar(anotadores, ahora.timestamp(), id_loc, "Sol", real_az, el, servo_az, servo_el, enviada)
+            mostrar(f"Sol en {loc['name']}: Az:{int(real_az)}° El:{real_el}°"
+                    + ("" if enviada else " (servo en camino)" if retenida else " (sin cambios)"))
+            n += 1
+            if ticks is None or n < ticks:
+                metricas.dormir(planificador.espera(ahora.timestamp(), real_az, el) if planificador else 1)
+    except KeyboardInterrupt:
+        pass
+    return transmisor.resumen()
+
+
+def rastrear_sol_async(serie, id_loc, ubicaciones=config.LOCATIONS, binaria=config.PROTOCOLO_BINARIO,
+                       con_control=True, precisa=config.PROTOCOLO_PRECISO, mostrar=print):
+    """ Igual que rastrear_sol sobre el runtime asyncio (sin deriva, órdenes p/r/s/q) """
+    from rastreador.asincrono import ejecutar_rastreo
+    from rastreador.trayectoria import TablaTrayectoria
+
+    loc = ubicaciones[id_loc]
+    tz = _zona(loc)
+    tabla = TablaTrayectoria({id_loc: loc})
+    if precisa:
+        codificar = tramas.trama_precisa
+    else:
+        codificar = tramas.trama_binaria if binaria else tramas.trama_ascii
+
+    def productor(instante):
+        ahora = datetime.datetime.fromtimestamp(instante, tz)
+        real_az, el = tabla.posicion(id_loc, ahora)
+        real_el = int(max(0, el))
+        mostrar(f"Sol en {loc['name']}: Az:{int(real_az)}° El:{real_el}°")
+        return codificar(*_objetivo(real_az, el, precisa), ahora.strftime("%H%M%S"), id_loc)
+
+    if con_control:
+        mostrar("Órdenes: p=pausa, r=seguir, s=estado, q=salir")
+    return ejecutar_rastreo(serie, productor, periodo=1.0, con_control=con_control)
+
+
+def simular_dia(serie, id_loc, fecha=None, ubicaciones=config.LOCATIONS, binaria=config.PROTOCOLO_BINARIO,
+                velocidad=600 / 0.15, anticipar=False, latencia_s=None, precisa=config.PROTOCOLO_PRECISO,
+                cielo_completo=False, mostrar=print):
+    """ 6AM-6PM de `fecha` (hoy por defecto) en pasos de 10 min; devuelve las tramas enviadas """
+    from rastreador.simulacion import MotorSimulacion, SalidaSerie, efemeride_sol
+
+    loc = ubicaciones[id_loc]
+    tz = _zona(loc)
+    fecha = fecha or datetime.datetime.now(tz).date()
+    inicio = tz.localize(datetime.datetime.combine(fecha, datetime.time(6, 0, 0)))
+    fin = tz.localize(datetime.datetime.combine(fecha, datetime.time(18, 0, 0)))
+    mostrar(f"\nIniciando simulación para: {loc['name']} (Fecha: {fecha})")
+    motor = MotorSimulacion(efemeride_sol(loc["coords"][0], loc["coords"][1], loc.get("elevation", 0)),
+                            inicio, fin + datetime.timedelta(seconds=1), 600, velocidad=velocidad,
+                            anticipar=anticipar, latencia_s=latencia_s, precisa=precisa,
+                            cielo_completo=cielo_completo, binaria=binaria)
+    salida = SalidaSerie(serie, id_loc, tz=tz, enviar=_enviador(binaria, motor.precisa),
+                         mostrar=lambda hora, az, el, servo_az: mostrar(
+                             f"Simulando: {hora.strftime('%H:%M')} | Az:{int(az)}° El:{int(max(0, el))}°"))
+    return _reproducir(motor, salida, mostrar)
+
+
+# --- MODOS CELESTES ---
+def rastrear_cuerpo(serie, cuerpo, id_loc, ubicaciones=config.LOCATIONS, binaria=config.PROTOCOLO_BINARIO,
+                    metricas=METRICAS_NULAS, ticks=None, anticipar=False, latencia_s=None,
+                    precisa=config.PROTOCOLO_PRECISO, cielo_completo=False,
+                    dormir_eventos=config.DORMIR_ENTRE_EVENTOS, adaptativo=config.TICK_ADAPTATIVO,
+                    registro=None, telemetria=None, difusion=None, mostrar=print):
+    """
+    Luna o planeta en tiempo real con ephem. Con `anticipar` envía dónde
+    estará al llegar el servo; con `cielo_completo`, azimut 1:1 y volteos por
+    el cenit planificados para las próximas 12 h (trama precisa); con
+    `dormir_eventos`, bajo el horizonte duerme hasta la próxima salida; con
+    `adaptativo` (solo con el mapeo normal), cada tick duerme hasta el
+    próximo paso del servo; con `registro`, `telemetria` y `difusion`, como
+    rastrear_sol.
+    """
+    from rastreador.celeste import obtener_posicion_cuerpo
+    from rastreador.delta import TransmisorDelta
+
+    loc = ubicaciones[id_loc]
+    lat, lon = loc["coords"]
+    tz = _zona(loc)
+    precisa = precisa or cielo_completo
+    transmisor = TransmisorDelta(binaria=binaria, precisa=precisa)
+    anticipador = plan = None
+    if cielo_completo:
+        from rastreador.cielo_completo import PlanCielo
+        from rastreador.simulacion import efemeride_cuerpo
+        calcular = efemeride_cuerpo(cuerpo, lat, lon, loc.get("elevation", 0))
+
+        def planificar(desde=None):
+            nuevo = PlanCielo(calcular, datetime.datetime.now(datetime.timezone.utc).timestamp(), desde=desde)
+            for segundos, volteado in nuevo.volteos():
+                hora = datetime.datetime.fromtimestamp(segundos, tz)
+                mostrar(f"Volteo previsto {hora.strftime('%H:%M')} -> {'volteado' if volteado else 'normal'}")
+            return nuevo
+        plan = planificar()
+    elif anticipar:
+        from rastreador.anticipacion import Anticipador
+        anticipador = Anticipador(
+            lambda s: obtener_posicion_cuerpo(cuerpo, lat, lon, loc.get("elevation", 0),
+                                              datetime.datetime.fromtimestamp(s, datetime.timezone.utc)),
+            periodo_s=1.0, latencia_s=latencia_s, precisa=precisa, binaria=binaria)
+    medida = metricas.serie(serie)
+    anotadores = [a for a in (registro, difusion) if a]
+    agenda = None
+    if dormir_eventos:
+        from rastreador.eventos import Agenda
+        agenda = Agenda(cuerpo, lat, lon, loc.get("elevation", 0))
+    planificador = None
+    if adaptativo and not (plan or anticipador):
+        from rastreador.adaptativo import Planificador
+        planificador = Planificador(
+            lambda s: obtener_posicion_cuerpo(cuerpo, lat, lon, loc.get("elevation", 0),
+                                              datetime.datetime.fromtimestamp(s, datetime.timezone.utc)),
+            precisa=precisa, binaria=binaria)
+        planificador.ajustar(transmisor)
+    mostrar(f"\nRastreando {cuerpo} en tiempo real...")
+    n = 0
+    try:
+        while ticks is None or n < ticks:
+            c = metricas.cronometro()
+            ahora = datetime.datetime.now(datetime.timezone.utc)
+            hora_display = ahora.astimezone(tz)
+            az_real, el_real = obtener_posicion_cuerpo(cuerpo, lat, lon, loc.get("elevation", 0), ahora)
+            c.marca("efemerides")
+            if plan:
+                if not plan.vigente(ahora.timestamp()):
+                    plan = planificar(desde=(servo_az / 10, servo_el / 10))
+                grados = plan.objetivo(ahora.timestamp(), az_real, el_real)
+                servo_az, servo_el = round(grados[0] * 10), round(grados[1] * 10)
+            elif anticipador:
+                servo_az, servo_el = anticipador.paso(time.monotonic(), ahora.timestamp(), az_real, el_real)
+            else:
+                # map_azimut mantiene la "ventana de visión" física del rastreador; bajo el horizonte, 0
+                servo_az, servo_el = _objetivo(az_real, el_real, precisa)
+            c.marca("mapeo")
+            estacion = (_estacionar(agenda, ahora.timestamp(), precisa, cielo_completo)
+                        if agenda and el_real <= 0 else None)
+            if estacion:
+                c.terminar()
+                _dormir_estacionado(transmisor, medida, estacion, servo_az, tz, id_loc, cuerpo, mostrar,
+                                    anotadores and (lambda s_az, s_el, trama: _anotar(
+                                        anotadores, ahora.timestamp(), id_loc, cuerpo, az_real, el_real, s_az,
+                                        s_el, trama)))
+                n += 1
+                continue
+            retenida = telemetria is not None and telemetria.retener()
+            enviada = None if retenida else transmisor.enviar(medida, servo_az, servo_el,
+                                                              hora_display.strftime("%H%M%S"), id_loc)
+            c.terminar()
+            _anotar(anotadores, ahora.timestamp(), id_loc, cuerpo, az_real, el_real, servo_az, servo_el, enviada)
+            mostrar(f"[{cuerpo}] {hora_display.strftime('%H:%M')} | Az:{int(az_real)}° "
+                    f"(Servo {_servo_txt(servo_az, precisa)}) | El:{int(el_real)}°"
+                    + (" (servo en camino)" if retenida else ""))
+            n += 1
+            if ticks is None or n < ticks:
+                metricas.dormir(planificador.espera(ahora.timestamp(), az_real, el_real) if planificador else 1)
+    except KeyboardInterrupt:
+        pass
+    if anticipador:
+        from rastreador.anticipacion import describir
+        mostrar(describir(anticipador.resumen()))
+        return dict(transmisor.resumen(), error=anticipador.resumen())
+    return transmisor.resumen()
+
+
+def simular_cuerpo(serie, cuerpo, id_loc, horas=12, ubicaciones=config.LOCATIONS,
+                   binaria=config.PROTOCOLO_BINARIO, velocidad=600 / 0.1, anticipar=False, latencia_s=None,
+                   precisa=config.PROTOCOLO_PRECISO, cielo_completo=False, mostrar=print):
+    """ Próximas `horas` en pasos de 10 min """
+    from rastreador.simulacion import MotorSimulacion, SalidaSerie, efemeride_cuerpo
+
+    loc = ubicaciones[id_loc]
+    ahora = datetime.datetime.now(datetime.timezone.utc)
+    mostrar(f"\nSimulando movimiento de {cuerpo}...")
+    motor = MotorSimulacion(efemeride_cuerpo(cuerpo, loc["coords"][0], loc["coords"][1], loc.get("elevation", 0)),
+                            ahora, ahora + datetime.timedelta(hours=horas), 600, velocidad=velocidad,
+                            anticipar=anticipar, latencia_s=latencia_s, precisa=precisa,
+                            cielo_completo=cielo_completo, binaria=binaria)
+    salida = SalidaSerie(serie, id_loc, tz=_zona(loc), enviar=_enviador(binaria, motor.precisa),
+                         mostrar=lambda hora, az, el, servo_az: mostrar(
+                             f"[{cuerpo}] {hora.strftime('%H:%M')} | Az:{int(az)}° "
+                             f"(Servo {_servo_txt(servo_az, motor.precisa)}) | El:{int(el)}°"))
+    return _reproducir(motor, salida, mostrar)
+
+
+def retrogrado_marte(serie, inicio=datetime.datetime(2024, 10, 1), fin=datetime.datetime(2025, 5, 1),
+                     id_loc=1, ubicaciones=config.LOCATIONS, binaria=config.PROTOCOLO_BINARIO,
+                     velocidad=86400 / 0.1, anticipar=False, latencia_s=None, precisa=config.PROTOCOLO_PRECISO,
+                     cielo_completo=False, mostrar=print):
+    """ Marte cada medianoche UTC entre `inicio` y `fin` (1 día cada 0.1 s): el bucle retrógrado """
+    from rastreador.simulacion import MotorSimulacion, SalidaSerie, efemeride_cuerpo
+
+    loc = ubicaciones[id_loc]
+    motor = MotorSimulacion(efemeride_cuerpo("Marte", loc["coords"][0], loc["coords"][1], loc.get("elevation", 0)),
+                            inicio, fin, 86400, velocidad=velocidad, anticipar=anticipar, latencia_s=latencia_s,
+                            precisa=precisa, cielo_completo=cielo_completo, binaria=binaria)
+    # ID 2 ("Madrid") en la LCD, como en v8
+    salida = SalidaSerie(serie, 2, enviar=_enviador(binaria, motor.precisa), mostrar=lambda fecha, az, el, servo_az: mostrar(
+        f"Fecha: {fecha.strftime('%Y-%m-%d')} | Az:{int(az)}° Servo:{_servo_txt(servo_az, motor.precisa)} | El:{int(el)}°"))
+    return _reproducir(motor, salida, mostrar)
+
+
+# --- MODO MANUAL ---
+def enviar_manual(serie, az, el, binaria=config.PROTOCOLO_BINARIO, precisa=config.PROTOCOLO_PRECISO):
+    """ Una trama con ángulos de servo dados (0-270, 0-90); con `precisa` admite décimas """
+    hora_str = datetime.datetime.now().strftime("%H%M%S")
+    if precisa:
+        return tramas.enviar_trama(serie, round(float(az) * 10), round(float(el) * 10), hora_str, config.ID_MANUAL,
+                                   precisa=True)
+    return tramas.enviar_trama(serie, int(az), int(el), hora_str, config.ID_MANUAL, binaria=binaria)
+
+
+def modo_manual(serie, binaria=config.PROTOCOLO_BINARIO, precisa=config.PROTOCOLO_PRECISO):
+    print("\n--- MODO MANUAL ---")
+    try:
+        while True:
+            in_az = input("Ángulo Servo Azimut (0-270): ")
+            in_el = input("Ángulo Elevación (0-90): ")
+            try:
+                numero = float if precisa else int
+                print(f"Enviado: {enviar_manual(serie, numero(in_az), numero(in_el), binaria, precisa)}")
+            except ValueError: print("Error numérico.")
+    except (KeyboardInterrupt, EOFError): print("\nSaliendo...")
+
+
+# --- MENÚ INTERACTIVO ---
+def pedir_ubicacion(ubicaciones=config.LOCATIONS):
+    for k, v in ubicaciones.items(): print(f"{k}. {v['name']}")
+    try:
+        opc = int(input("Ubicación: "))
+    except (ValueError, EOFError): return None
+    return opc if opc in ubicaciones else None
+
+
+def pedir_cuerpo(cuerpos=config.CELESTIAL_BODIES):
+    for k, v in cuerpos.items(): print(f"{k}. {v}")
+    try:
+        opc = int(input("Cuerpo: "))
+    except (ValueError, EOFError): return None
+    return cuerpos.get(opc)
+
+
+def menu(serie, binaria=config.PROTOCOLO_BINARIO, metricas=METRICAS_NULAS, precisa=config.PROTOCOLO_PRECISO):
+    while True:
+        print("\n=== SOLAR TRACKER PRO ===")
+        print("1. Rastrear Sol (Auto)")
+        print("2. Rastrear Sol (Asíncrono, sin deriva)")
+        print("3. Manual")
+        print("4. Rastrear Celeste (Luna/Planetas)")
+        print("5. Simulación Celeste (próximas 12h)")
+        print("6. Demo: Simulación Día Solar (6am-6pm)")
+        print("7. Demo: El Bucle de Marte (Retrograde Motion)")
+        print("0. Salir")
+        try:
+            op = input(">> ")
+        except EOFError:
+            break
+        if op in ('1', '2', '4', '5', '6'):
+            id_loc = pedir_ubicacion()
+            if id_loc is None: continue
+        if op in ('4', '5'):
+            cuerpo = pedir_cuerpo()
+            if cuerpo is None: continue
+
+        if op == '1':
+            print(f"\nTransmisión: {rastrear_sol(serie, id_loc, binaria=binaria, metricas=metricas, precisa=precisa)}")
+        elif op == '2': print(f"\nRuntime: {rastrear_sol_async(serie, id_loc, binaria=binaria, precisa=precisa)}")
+        elif op == '3': modo_manual(serie, binaria, precisa)
+        elif op == '4':
+            print(f"\nTransmisión: "
+                  f"{rastrear_cuerpo(serie, cuerpo, id_loc, binaria=binaria, metricas=metricas, precisa=precisa)}")
+        elif op == '5': simular_cuerpo(serie, cuerpo, id_loc, binaria=binaria, precisa=precisa)
+        elif op == '6': simular_dia(serie, id_loc, binaria=binaria, precisa=precisa)
+        elif op == '7': retrogrado_marte(serie, binaria=binaria, precisa=precisa)
+        elif op == '0': break
@@ -0,0 +1,288 @@
+"""
+Registro binario de sesiones del rastreador y su reproducción.
+
+Cada tick (instante, ubicación, cuerpo, az/el reales, objetivos del servo y
+los bytes que salieron por el puerto, vacíos si TransmisorDelta omitió la
+trama) se guarda en un archivo de solo-anexar por bloques:
+
+    cabecera (16 bytes) | bloque | bloque | ...
+    bloque = BLOQUE (36 bytes: n, t_inicio, t_fin, largo, crc32) + columnas en zlib
+
+Dentro del bloque cada columna va seguida (instantes en ms, az/el en
+centésimas de grado y objetivos como diferencias con la fila anterior;
+ubicación, cuerpo y largo de trama en bytes; luego las tramas), así zlib ve
+secuencias casi constantes: a 1 Hz queda en pocos bytes por tick.
+
+Al lado va el índice `<ruta>.idx`, también de solo anexar: un registro
+INDICE (t_inicio, t_fin, desplazamiento) por bloque. `Lector.ticks(desde)`
+busca el bloque por bisección en el índice y solo descomprime desde ahí. Si
+el proceso muere a mitad de un bloque, al reabrir se descarta la cola
+incompleta (CRC o largo) y se reconstruye el índice recorriendo las
+cabeceras de bloque, sin descomprimir.
+
+    python -m rastreador --registro sesion.rlog sol
+    python -m rastreador --puerto /dev/pts/3 reproducir sesion.rlog --desde 2025-06-21T15:00 --velocidad 10
+    python -m rastreador.registro sesion.rlog           # resumen
+"""
+import argparse
+import bisect
+import datetime
+import os
+import struct
+import time
+import zlib
+
+from rastreador import config
+
+MAGICO = b"RLOG"
+VERSION = 1
+CABECERA = struct.Struct("<4sHH8x")
+# n, t_inicio_ms, t_fin_ms, largo comprimido, crc32 del comprimido
+BLOQUE = struct.Struct("<IqqQI4x")
+INDICE = struct.Struct("<qqQ")
+# Un bloque cada 10 min a 1 Hz: lo que se pierde si se corta la luz
+TICKS_POR_BLOQUE = 600
+NIVEL_ZLIB = 9
+
+# Código de cuerpo en el registro: 0 = sol, 1-5 como CELESTIAL_BODIES
+CODIGO_SOL = 0
+CODIGO_OTRO = 255
+
+
+def codigo_cuerpo(nombre):
+    if nombre == "Sol":
+        return CODIGO_SOL
+    for k, v in config.CELESTIAL_BODIES.items():
+        if v == nombre:
+            return k
+    return CODIGO_OTRO
+
+
+def nombre_cuerpo(codigo):
+    return "Sol" if codigo == CODIGO_SOL else config.CELESTIAL_BODIES.get(codigo, "?")
+
+
+def _codificar(filas):
+    """ Filas (t, id_loc, cuerpo, az, el, servo_az, servo_el, trama) -> columnas en bytes """
+    import numpy as np
+
+    columnas = list(zip(*filas))
+    t_ms = np.rint(np.array(columnas[0], dtype=np.float64) * 1000).astype(np.int64)
+    az = np.rint(np.array(columnas[3], dtype=np.float64) * 100).astype(np.int64)
+    el = np.rint(np.array(columnas[4], dtype=np.float64) * 100).astype(np.int64)
+    servo_az = np.array(columnas[5], dtype=np.int64)
+    servo_el = np.array(columnas[6], dtype=np.int64)
+    partes = [np.diff(t_ms, prepend=t_ms[0]).astype("<i4")]
+    for col in (az, el, servo_az, servo_el):
+        partes.append(np.diff(col, prepend=0).astype("<i4"))
+    partes.append(np.array(columnas[1], dtype="<u1"))
+    partes.append(np.array(columnas[2], dtype="<u1"))
+    partes.append(np.array([len(b) for b in columnas[7]], dtype="<u1"))
+    return int(t_ms[0]), int(t_ms[-1]), b"".join(p.tobytes() for p in partes) + b"".join(columnas[7])
+
+
+def _decodificar(n, t_inicio_ms, datos):
+    """ Inverso de _codificar: lista de filas """
+    import numpy as np
+
+    def columna(tipo, i):
+        return np.frombuffer(datos, dtype=tipo, count=n, offset=i)
+
+    i = 0
+    enteras = []
+    for _ in range(5):
+        enteras.append(np.cumsum(columna("<i4", i).astype(np.int64)))
+        i += 4 * n
+    t_ms, az, el, servo_az, servo_el = [c.tolist() for c in enteras]
+    id_loc, cuerpo, largos = (columna("<u1", i + j * n).tolist() for j in range(3))
+    fin_tramas = (i + 3 * n + np.cumsum(largos, dtype=np.int64)).tolist()
+    filas = []
+    for k in range(n):
+        trama = datos[fin_tramas[k] - largos[k]:fin_tramas[k]]
+        filas.append(((t_ms[k] + t_inicio_ms) / 1000.0, id_loc[k], cuerpo[k], az[k] / 100.0, el[k] / 100.0,
+                      servo_az[k], servo_el[k], trama))
+    return filas
+
+
+def _bloques(f, tamano):
+    """ (desplazamiento, n, t_inicio_ms, t_fin_ms, largo) de los bloques completos, sin descomprimir """
+    pos = CABECERA.size
+    while pos + BLOQUE.size <= tamano:
+        f.seek(pos)
+        n, t0, t1, largo, crc = BLOQUE.unpack(f.read(BLOQUE.size))
+        if pos + BLOQUE.size + largo > tamano:
+            break
+        if zlib.crc32(f.read(largo)) != crc:
+            break
+        yield pos, n, t0, t1, largo
+        pos += BLOQUE.size + largo
+
+
+def _reparar(ruta):
+    """ Corta la cola incompleta y rehace el índice si no coincide; devuelve el tamaño válido """
+    tamano = os.path.getsize(ruta)
+    with open(ruta, "r+b") as f:
+        magico, version, _ = CABECERA.unpack(f.read(CABECERA.size))
+        if magico != MAGICO or version != VERSION:
+            raise ValueError(f"{ruta} no es un registro v{VERSION}")
+        ruta_idx = ruta + ".idx"
+        indice = _leer_indice(ruta_idx)
+        # Sin fsync el archivo puede quedar más corto que su índice tras un corte de luz
+        if (indice and os.path.getsize(ruta_idx) % INDICE.size == 0
+                and indice[-1][2] + BLOQUE.size <= tamano):
+            # Índice al día: el último bloque indexado termina justo donde termina el archivo
+            f.seek(indice[-1][2])
+            n, _, _, largo, crc = BLOQUE.unpack(f.read(BLOQUE.size))
+            fin = indice[-1][2] + BLOQUE.size + largo
+            if fin == tamano and zlib.crc32(f.read(largo)) == crc:
+                return tamano
+        validos = list(_bloques(f, tamano))
+        fin = validos[-1][0] + BLOQUE.size + validos[-1][4] if validos else CABECERA.size
+        f.truncate(fin)
+    with open(ruta_idx, "wb") as g:
+        for pos, _, t0, t1, _ in validos:
+            g.write(INDICE.pack(t0, t1, pos))
+    return fin
+
+
+def _leer_indice(ruta_idx):
+    if not os.path.exists(ruta_idx):
+        return []
+    with open(ruta_idx, "rb") as g:
+        datos = g.read()
+    return [INDICE.unpack_from(datos, i) for i in range(0, len(datos) - len(datos) % INDICE.size, INDICE.size)]
+
+
+class Registro:
+    """ Escritor de solo-anexar; `tick` guarda una fila y cada TICKS_POR_BLOQUE se escribe un bloque """
+
+    def __init__(self, ruta, ticks_por_bloque=TICKS_POR_BLOQUE):
+        self.ruta = ruta
+        self.ticks_por_bloque = ticks_por_bloque
+        if os.path.exists(ruta) and os.path.getsize(ruta) >= CABECERA.size:
+            _reparar(ruta)
+        else:
+            with open(ruta, "wb") as f:
+                f.write(CABECERA.pack(MAGICO, VERSION, 0))
+            open(ruta + ".idx", "wb").close()
+        self._f = open(ruta, "ab")
+        self._idx = open(ruta + ".idx", "ab")
+        self._filas = []
+        self.ticks = 0
+
+    def tick(self, segundos, id_loc, cuerpo, az, el, servo_az, servo_el, trama=None):
+        """ trama: lo que devolvió enviar_trama/TransmisorDelta.enviar (str, bytes o None) """
+        if trama is None:
+            trama = b""
+        elif isinstance(trama, str):
+            trama = trama.encode("utf-8")
+        cuerpo = cuerpo if isinstance(cuerpo, int) else codigo_cuerpo(cuerpo)
+        self._filas.append((segundos, id_loc, cuerpo, az, el, servo_az, servo_el, trama))
+        self.ticks += 1
+        if len(self._filas) >= self.ticks_por_bloque:
+            self.vaciar()
+
+    def vaciar(self):
+        if not self._filas:
+            return
+        t0, t1, crudo = _codificar(self._filas)
+        comprimido = zlib.compress(crudo, NIVEL_ZLIB)
+        pos = self._f.tell()
+        self._f.write(BLOQUE.pack(len(self._filas), t0, t1, len(comprimido), zlib.crc32(comprimido)))
+        self._f.write(comprimido)
+        self._f.flush()
+        # El índice va después del bloque: si se corta entre ambos, _reparar lo rehace
+        self._idx.write(INDICE.pack(t0, t1, pos))
+        self._idx.flush()
+        self._filas = []
+
+    def cerrar(self):
+        self.vaciar()
+        self._f.close()
+        self._idx.close()
+
+
+class Lector:
+    """ Lectura por bloques con búsqueda por instante en el índice """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        _reparar(ruta)
+        self.indice = _leer_indice(ruta + ".idx")
+        self._fines = [t1 for _, t1, _ in self.indice]
+
+    def _bloque(self, f, pos):
+        f.seek(pos)
+        n, t0, _, largo, _ = BLOQUE.unpack(f.read(BLOQUE.size))
+        return _decodificar(n, t0, zlib.decompress(f.read(largo)))
+
+    def ticks(self, desde=None, hasta=None):
+        """ Filas (t, id_loc, cuerpo, az, el, servo_az, servo_el, trama) con desde <= t < hasta """
+        primero = 0 if desde is None else bisect.bisect_left(self._fines, int(round(desde * 1000)))
+        with open(self.ruta, "rb") as f:
+            for t0, _, pos in self.indice[primero:]:
+                if hasta is not None and t0 / 1000.0 >= hasta:
+                    return
+                for fila in self._bloque(f, pos):
+                    if desde is not None and fila[0] < desde:
+                        continue
+                    if hasta is not None and fila[0] >= hasta:
+                        return
+                    yield fila
+
+    def resumen(self):
+        tamano = os.path.getsize(self.ruta)
+        if not self.indice:
+            return {"bloques": 0, "ticks": 0, "bytes": tamano}
+        with open(self.ruta, "rb") as f:
+            ticks = 0
+            for _, _, pos in self.indice:
+                f.seek(pos)
+                ticks += BLOQUE.unpack(f.read(BLOQUE.size))[0]
+        return {"bloques": len(self.indice), "ticks": ticks, "bytes": tamano,
+                "bytes_por_tick": tamano / ticks if ticks else 0.0,
+                "inicio": self.indice[0][0] / 1000.0, "fin": self.indice[-1][1] / 1000.0}
+
+
+def reproducir(ruta, serie, desde=None, hasta=None, velocidad=1.0, mostrar=None):
+    """
+    Escribe en `serie` las tramas registradas, respetando los tiempos
+    originales divididos por `velocidad` (None = lo más rápido posible).
+    Devuelve {ticks, tramas, bytes}.
+    """
+    cuenta = {"ticks": 0, "tramas": 0, "bytes": 0}
+    t_origen = t0 = None
+    for fila in Lector(ruta).ticks(desde, hasta):
+        t, id_loc, cuerpo, az, el, servo_az, servo_el, trama = fila
+        if velocidad is not None:
+            if t_origen is None:
+                t_origen, t0 = t, time.monotonic()
+            espera = t0 + (t - t_origen) / velocidad - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+        cuenta["ticks"] += 1
+        if trama:
+            serie.write(trama)
+            cuenta["tramas"] += 1
+            cuenta["bytes"] += len(trama)
+        if mostrar:
+            hora = datetime.datetime.fromtimestamp(t, datetime.timezone.utc)
+            mostrar(f"{hora:%Y-%m-%d %H:%M:%S} [{nombre_cuerpo(cuerpo)}] Az:{az:.2f}° El:{el:.2f}° "
+                    f"servo {servo_az}/{servo_el}" + (f" -> {trama!r}" if trama else ""))
+    return cuenta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen de un registro de sesión")
+    parser.add_argument("ruta")
+    args = parser.parse_args()
+    r = Lector(args.ruta).resumen()
+    print(f"{args.ruta}: {r['bloques']} bloques, {r['ticks']} ticks, {r['bytes']} bytes")
+    if r["ticks"]:
+        desde = datetime.datetime.fromtimestamp(r["inicio"], datetime.timezone.utc)
+        hasta = datetime.datetime.fromtimestamp(r["fin"], datetime.timezone.utc)
+        print(f"  {desde:%Y-%m-%d %H:%M:%S} a {hasta:%Y-%m-%d %H:%M:%S} UTC, {r['bytes_por_tick']:.2f} bytes/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Motor único de simulación, desacoplado del reloj de pared.
+
+`modo_simulacion` (6AM-6PM cada 10 min con sleep de 0.15 s), la simulación
+rápida de `modo_celeste` y `modo_retrogrado_marte` (un día cada 0.1 s) tenían
+cada uno su propio bucle. Aquí se configura inicio/fin/paso, se calculan todas
+las posiciones de una vez y se entregan a una salida:
+
+- SalidaMemoria: arreglos NumPy (t, az, el, servo_az, servo_el);
+- SalidaArchivo: CSV;
+- SalidaSerie: tramas al puerto, al ritmo pedido.
+
+Con `anticipar=True` (y una velocidad) los objetivos del servo se adelantan a
+cuando el servo llegue de verdad y `motor.error` guarda el error de
+seguimiento directo y anticipado. Con `cielo_completo=True` el azimut usa
+todo el cielo con volteos por el cenit (sin anticipación).
+
+`velocidad` es el múltiplo del tiempo real (p.ej. 4000 => 10 min simulados
+cada 0.15 s). Con velocidad=None se corre sin pausas (modo headless).
+
+    python -m rastreador.simulacion --cuerpo Marte --lat 4.711 --lon -74.0721 \\
+        --inicio 2024-10-01 --fin 2025-10-01 --paso 86400 --csv marte.csv
+"""
+import argparse
+import csv
+import datetime
+import time
+
+import numpy as np
+
+from rastreador import trama as tramas
+from rastreador.mapeo import map_azimut_arr, map_azimut_decimas_arr
+from rastreador.solar import a_segundos, posicion_solar
+
+# Instantes por lote al calcular (acota la memoria en simulaciones largas)
+LOTE = 1 << 18
+
+
+def efemeride_sol(lat, lon, elevacion=0):
+    """ Función por lotes segundos -> (az, el) para el sol """
+    def calcular(segundos):
+        az, el = posicion_solar(segundos, [(lat, lon, elevacion)])
+        return az[0], el[0]
+    return calcular
+
+
+def efemeride_cuerpo(nombre, lat, lon, elevacion=0):
+    """ Función por lotes segundos -> (az, el) para un cuerpo de ephem (o el sol) """
+    if nombre == "Sol":
+        return efemeride_sol(lat, lon, elevacion)
+    from rastreador.celeste import POOL
+
+    def calcular(segundos):
+        return POOL.posiciones_interpoladas(nombre, lat, lon, elevacion, segundos)
+    return calcular
+
+
+class MotorSimulacion:
+    """ Recorre [inicio, fin) con paso fijo usando una función de efemérides por lotes """
+
+    def __init__(self, calcular, inicio, fin, paso_s, velocidad=None, mapeo=None, anticipar=False,
+                 latencia_s=None, precisa=False, cielo_completo=False, binaria=False):
+        self.calcular = calcular
+        self.inicio = float(a_segundos(inicio)[0])
+        self.fin = float(a_segundos(fin)[0])
+        self.paso_s = float(paso_s)
+        self.velocidad = velocidad
+        self.mapeo = mapeo or {}
+        # Objetivos adelantados al tiempo de llegada del servo (ver rastreador.anticipacion)
+        self.anticipar = anticipar
+        self.latencia_s = latencia_s
+        # Solo para la latencia por defecto de la anticipación; la trama la elige la salida
+        self.binaria = binaria
+        self.error = None
+        # Azimut 1:1 con volteos por el cenit (ver rastreador.cielo_completo); la
+        # elevación volteada pasa de 127° y solo cabe en la trama precisa
+        self.cielo_completo = cielo_completo
+        # servo_az/servo_el en décimas de grado redondeadas (trama precisa)
+        self.precisa = precisa or cielo_completo
+
+    def instantes(self):
+        return np.arange(self.inicio, self.fin, self.paso_s)
+
+    def calcular_todo(self):
+        """ Todas las posiciones, reales y mapeadas al servo, como arreglos """
+        t = self.instantes()
+        az = np.empty_like(t)
+        el = np.empty_like(t)
+        for i in range(0, len(t), LOTE):
+            az[i:i + LOTE], el[i:i + LOTE] = self.calcular(t[i:i + LOTE])
+        if self.cielo_completo:
+            from rastreador.cielo_completo import planificar
+            plan = planificar(az, el)
+            return {"t": t, "az": az, "el": el, "servo_az": np.rint(plan["servo_az"] * 10).astype(np.int64),
+                    "servo_el": np.rint(plan["servo_el"] * 10).astype(np.int64), "volteos": t[plan["volteos"]]}
+        if self.precisa:
+            servo_az = map_azimut_decimas_arr(az, **self.mapeo)
+            servo_el = np.rint(np.maximum(0, el) * 10).astype(np.int64)
+        else:
+            servo_az = map_azimut_arr(az, **self.mapeo)
+            servo_el = np.maximum(0, el).astype(np.int64)
+        return {"t": t, "az": az, "el": el, "servo_az": servo_az, "servo_el": servo_el}
+
+    def ejecutar(self, salida):
+        """ Calcula y entrega a `salida`; devuelve lo que devuelva salida.cerrar() """
+        datos = self.calcular_todo()
+        # El modelo de anticipación supone el mapeo recortado de map_azimut
+        if self.anticipar and self.velocidad is not None and not self.cielo_completo:
+            from rastreador.anticipacion import anticipar_simulacion
+            datos = anticipar_simulacion(datos, self.velocidad, self.paso_s / self.velocidad,
+                                         self.latencia_s, self.mapeo, precisa=self.precisa, binaria=self.binaria)
+            self.error = datos["error"]
+        if self.velocidad is None or not getattr(salida, "en_tiempo_real", False):
+            salida.escribir_lote(datos)
+            return salida.cerrar()
+
+        # Reproducción a `velocidad` x tiempo real con plazos absolutos (sin deriva)
+        intervalo = self.paso_s / self.velocidad
+        t0 = time.monotonic()
+        for i in range(len(datos["t"])):
+            espera = t0 + i * intervalo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            salida.escribir(datos, i)
+        return salida.cerrar()
+
+
+class SalidaMemoria:
+    en_tiempo_real = False
+
+    def escribir_lote(self, datos):
+        self.datos = datos
+
+    def cerrar(self):
+        return self.datos
+
+
+class SalidaArchivo:
+    """ CSV con una fila por instante """
+    en_tiempo_real = False
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def escribir_lote(self, datos):
+        with open(self.ruta, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["utc", "az", "el", "servo_az", "servo_el"])
+            fechas = np.asarray(datos["t"] * 1e6, dtype="int64").astype("datetime64[us]")
+            for fila in zip(np.datetime_as_string(fechas, unit="s"), np.round(datos["az"], 4),
+                            np.round(datos["el"], 4), datos["servo_az"], datos["servo_el"]):
+                w.writerow(fila)
+
+    def cerrar(self):
+        return self.ruta
+
+
+class SalidaSerie:
+    """
+    Tramas a la FPGA. `enviar` tiene la firma de enviar_trama (los scripts
+    pasan la suya); `mostrar(hora, az, el, servo_az)` recibe cada paso.
+    """
+    en_tiempo_real = True
+
+    def __init__(self, bt_serial, id_loc, tz=datetime.timezone.utc, mostrar=None,
+                 enviar=tramas.enviar_trama):
+        self.bt_serial = bt_serial
+        self.id_loc = id_loc
+        self.tz = tz
+        self.mostrar = mostrar
+        self._enviar = enviar
+        self.enviadas = 0
+
+    def escribir(self, datos, i):
+        hora = datetime.datetime.fromtimestamp(datos["t"][i], self.tz)
+        servo_az, servo_el = int(datos["servo_az"][i]), int(datos["servo_el"][i])
+        self._enviar(self.bt_serial, servo_az, servo_el, hora.strftime("%H%M%S"), self.id_loc)
+        self.enviadas += 1
+        if self.mostrar:
+            self.mostrar(hora, float(datos["az"][i]), float(datos["el"][i]), servo_az)
+
+    def escribir_lote(self, datos):
+        for i in range(len(datos["t"])):
+            self.escribir(datos, i)
+
+    def cerrar(self):
+        return self.enviadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación de trayectorias sin esperar al reloj")
+    parser.add_argument("--cuerpo", default="Sol")
+    parser.add_argument("--lat", type=float, required=True)
+    parser.add_argument("--lon", type=float, required=True)
+    parser.add_argument("--elevacion", type=float, default=0)
+    parser.add_argument("--inicio", required=True, help="Fecha ISO en UTC, p.ej. 2025-01-01")
+    parser.add_argument("--fin", required=True)
+    parser.add_argument("--paso", type=float, default=600, help="Segundos simulados por paso")
+    parser.add_argument("--csv", help="Guardar en este CSV (si no, solo resumen)")
+    args = parser.parse_args()
+
+    inicio = datetime.datetime.fromisoformat(args.inicio).replace(tzinfo=datetime.timezone.utc)
+    fin = datetime.datetime.fromisoformat(args.fin).replace(tzinfo=datetime.timezone.utc)
+    motor = MotorSimulacion(efemeride_cuerpo(args.cuerpo, args.lat, args.lon, args.elevacion),
+                            inicio, fin, args.paso)
+    t0 = time.perf_counter()
+    datos = motor.ejecutar(SalidaMemoria())
+    print(f"{len(datos['t'])} pasos de {args.cuerpo} en {time.perf_counter() - t0:.3f} s | "
+          f"El máx {datos['el'].max():.1f}° | servo az {datos['servo_az'].min()}-{datos['servo_az'].max()}")
+    if args.csv:
+        SalidaArchivo(args.csv).escribir_lote(datos)
+        print(f"Guardado en {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
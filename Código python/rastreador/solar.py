@@ -0,0 +1,102 @@
+"""
+Motor vectorizado (NumPy) de posición solar.
+
+Calcula azimut y altitud para un arreglo de instantes y un arreglo de sitios
+(lat, lon, elevación) en una sola pasada, en lugar de llamar a
+`get_azimuth` y `get_altitude` de pysolar por separado en cada tick.
+
+Algoritmo: coordenadas solares de baja precisión de Meeus (cap. 25, el mismo
+que usa la calculadora de NOAA) + paralaje topocéntrico y refracción con las
+mismas fórmulas y valores por defecto que pysolar.
+
+Tolerancia frente a pysolar 0.13 (2000-2050, todas las LOCATIONS, sol sobre
+el horizonte): separación angular menor que TOLERANCIA_DEG. Se mide como
+separación y no como diferencia de azimut porque cerca del cenit (Bogotá) el
+azimut cambia muy rápido con cualquier error mínimo de posición.
+"""
+import datetime
+import types
+
+import numpy as np
+
+from rastreador.meeus import (HORIZONTE_REFRACCION, PRESION_STD, TEMPERATURA_STD, coordenadas_sol,
+                              correccion_refraccion, topocentrica)
+
+# Separación angular máxima frente a pysolar (grados). Un paso del servo son ~1.06°
+TOLERANCIA_DEG = 0.03
+
+# Funciones de `math` en versión NumPy, para las series de rastreador.meeus
+NP = types.SimpleNamespace(sin=np.sin, cos=np.cos, tan=np.tan, asin=np.arcsin, atan=np.arctan, atan2=np.arctan2,
+                           radians=np.radians, degrees=np.degrees)
+
+
+def _timestamp_utc(fecha):
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=datetime.timezone.utc)
+    return fecha.timestamp()
+
+
+def a_segundos(fechas):
+    """
+    Convierte instantes (datetime, datetime64 o segundos POSIX) a segundos POSIX float64.
+    Un datetime sin zona se toma como UTC, igual que hace ephem.
+    """
+    if isinstance(fechas, (datetime.datetime, np.datetime64, int, float)):
+        fechas = [fechas]
+    arr = np.asarray(fechas)
+    if arr.dtype.kind == 'M':
+        return arr.astype('datetime64[us]').astype(np.int64) / 1e6
+    if arr.dtype == object:
+        return np.array([_timestamp_utc(f) for f in arr.ravel()], dtype=np.float64).reshape(arr.shape)
+    return arr.astype(np.float64)
+
+
+def _coordenadas_sol(segundos):
+    """ Ascensión recta, declinación (grados), distancia (UA) y tiempo sidéreo aparente de Greenwich """
+    return coordenadas_sol(segundos, NP)
+
+
+def tiempo_sidereo(fechas):
+    """ Tiempo sidéreo aparente de Greenwich, en grados """
+    return _coordenadas_sol(a_segundos(fechas).ravel())[3]
+
+
+def refraccion(elev_deg, presion=PRESION_STD, temperatura=TEMPERATURA_STD):
+    """ Corrección de refracción de pysolar (SPA de NREL), para arreglos o un float """
+    if isinstance(elev_deg, float):
+        # Camino escalar para consultas por tick (evita el costo fijo de NumPy)
+        if elev_deg < HORIZONTE_REFRACCION:
+            return 0.0
+        return correccion_refraccion(elev_deg, presion, temperatura)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = correccion_refraccion(elev_deg, presion, temperatura, NP)
+    return np.where(elev_deg >= HORIZONTE_REFRACCION, corr, 0.0)
+
+
+def posicion_solar(fechas, sitios, presion=PRESION_STD, temperatura=TEMPERATURA_STD, con_refraccion=True):
+    """
+    Azimut y altitud del sol para N instantes y S sitios en una pasada.
+
+    fechas: N instantes (ver a_segundos).
+    sitios: S filas (lat, lon) o (lat, lon, elevación_m).
+    Devuelve (az, el) en grados, con forma (S, N). Azimut 0-360 desde el norte
+    en sentido horario, igual que pysolar. Con con_refraccion=False la
+    altitud es la geométrica (sin el salto de refracción en el horizonte).
+    """
+    seg = a_segundos(fechas).ravel()
+    sitios = np.atleast_2d(np.asarray(sitios, dtype=np.float64))
+    lat = sitios[:, 0:1]
+    lon = sitios[:, 1:2]
+    elev = sitios[:, 2:3] if sitios.shape[1] > 2 else np.zeros_like(lat)
+
+    alfa, delta, distancia, gast = _coordenadas_sol(seg)
+    # Sitios en columnas (S, 1) contra instantes (N,): resultado (S, N)
+    azimut, elev_deg = topocentrica(alfa, delta, distancia, gast, lat, lon, elev, NP)
+    altitud = elev_deg + refraccion(elev_deg, presion, temperatura) if con_refraccion else elev_deg
+    return azimut, altitud
+
+
+def posicion_solar_sitio(lat, lon, fechas, elevacion=0):
+    """ Atajo para un solo sitio: devuelve (az, el) como arreglos 1-D de N elementos """
+    az, el = posicion_solar(fechas, [(lat, lon, elevacion)])
+    return az[0], el[0]
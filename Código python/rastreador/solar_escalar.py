@@ -0,0 +1,16 @@
+"""
+Posición solar de un instante y un sitio en Python puro (math), sin NumPy.
+
+Mismas series que `rastreador.solar` (rastreador.meeus, con `math` en vez
+de NumPy). Existe para el arranque: el primer tick de `rastrear_sol` sale
+con esto mientras NumPy y la tabla de trayectoria se cargan en segundo plano.
+"""
+from rastreador.meeus import HORIZONTE_REFRACCION, coordenadas_sol, correccion_refraccion, topocentrica
+
+
+def posicion_solar_escalar(lat, lon, segundos, elevacion=0):
+    """ (azimut, altitud) aparentes en grados para segundos POSIX """
+    az, elev = topocentrica(*coordenadas_sol(segundos), lat, lon, elevacion)
+    if elev >= HORIZONTE_REFRACCION:
+        elev += correccion_refraccion(elev)
+    return az, elev
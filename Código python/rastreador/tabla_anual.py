@@ -0,0 +1,167 @@
+"""
+Tabla anual de la trayectoria del sol en un archivo mapeado en memoria.
+
+Para una instalación fija la trayectoria del sol se repite casi igual cada
+año. `generar` calcula un año completo (366 días, 1 min por defecto) con
+`posicion_solar` y lo guarda en binario compacto:
+
+    cabecera (64 bytes) | az uint16[n] (centésimas de grado, 0-35999)
+                        | el int16[n]  (centésimas de grado, refracción incluida)
+
+`TablaAnual` abre el archivo con mmap (sin leerlo ni copiarlo: varios
+procesos comparten las mismas páginas de la caché del sistema) y cada
+consulta es un índice directo por minuto del año más una interpolación
+lineal entre las dos muestras vecinas.
+
+Una tabla generada para un año sirve para los siguientes: la consulta usa el
+instante dentro del año UTC. El error que introduce ese pliegue crece con los
+años de diferencia (~0.1° el año siguiente, ~0.3° a los tres años), por eso
+`abrir_o_generar` regenera la tabla cuando cambia el año (0.4 s, una vez).
+
+    python -m rastreador.tabla_anual --lat 4.711 --lon -74.0721 --elevacion 2640 \\
+        --anio 2025 --salida bogota.sol
+"""
+import argparse
+import calendar
+import datetime
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from rastreador.solar import a_segundos, posicion_solar
+
+MAGICO = b"RSOL"
+VERSION = 1
+# magico, versión, reservado, lat, lon, elevación, año, paso_s, n
+CABECERA = struct.Struct("<4sHHdddiII")
+LARGO_CABECERA = 64
+PASO_S = 60
+DIAS = 366
+DIRECTORIO_TABLAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tablas")
+
+
+def _inicio_anio(anio):
+    return calendar.timegm((anio, 1, 1, 0, 0, 0))
+
+
+def generar(ruta, lat, lon, elevacion=0, anio=None, paso_s=PASO_S):
+    """ Calcula un año de posiciones solares y lo escribe en `ruta`; devuelve n """
+    if anio is None:
+        anio = datetime.datetime.now(datetime.timezone.utc).year
+    segundos = _inicio_anio(anio) + np.arange(0, DIAS * 86400, paso_s, dtype=np.float64)
+    az, el = posicion_solar(segundos, [(lat, lon, elevacion)])
+    az_cd = np.round(az[0] * 100).astype(np.int64) % 36000
+    el_cd = np.round(el[0] * 100).astype(np.int64)
+
+    cabecera = CABECERA.pack(MAGICO, VERSION, 0, lat, lon, elevacion, anio, paso_s, len(segundos))
+    # Escritura atómica: otro proceso puede tener mapeada la tabla anterior
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(cabecera.ljust(LARGO_CABECERA, b"\0"))
+        f.write(az_cd.astype("<u2").tobytes())
+        f.write(el_cd.astype("<i2").tobytes())
+    os.replace(temporal, ruta)
+    return len(segundos)
+
+
+class TablaAnual:
+    """ Consultas O(1) sobre una tabla generada con `generar` """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, version, _, self.lat, self.lon, self.elevacion, self.anio, self.paso_s, self.n = \
+            CABECERA.unpack_from(self._mm)
+        if magico != MAGICO or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{ruta} no es una tabla anual v{VERSION}")
+        self.az = np.frombuffer(self._mm, dtype="<u2", count=self.n, offset=LARGO_CABECERA)
+        self.el = np.frombuffer(self._mm, dtype="<i2", count=self.n, offset=LARGO_CABECERA + 2 * self.n)
+        # Vistas de enteros para el camino escalar (evita el costo fijo de NumPy por consulta)
+        self._az = memoryview(self._mm)[LARGO_CABECERA:LARGO_CABECERA + 2 * self.n].cast("H")
+        self._el = memoryview(self._mm)[LARGO_CABECERA + 2 * self.n:LARGO_CABECERA + 4 * self.n].cast("h")
+        self._anio_actual = None
+
+    def _desfase(self, segundos):
+        """ Segundos desde el 1 de enero UTC del año de `segundos` """
+        if self._anio_actual is None or not self._anio_actual[0] <= segundos < self._anio_actual[1]:
+            anio = datetime.datetime.fromtimestamp(segundos, datetime.timezone.utc).year
+            self._anio_actual = (_inicio_anio(anio), _inicio_anio(anio + 1))
+        return segundos - self._anio_actual[0]
+
+    def posicion(self, instante):
+        """ (az, el) en grados; `instante` es un datetime o segundos POSIX """
+        segundos = instante if isinstance(instante, (int, float)) else float(a_segundos(instante)[0])
+        k = self._desfase(segundos) / self.paso_s
+        i = min(int(k), self.n - 2)
+        f = k - i
+        az0, az1 = self._az[i], self._az[i + 1]
+        d = az1 - az0
+        if d > 18000: d -= 36000
+        elif d < -18000: d += 36000
+        az = ((az0 + f * d) % 36000) / 100.0
+        el = (self._el[i] + f * (self._el[i + 1] - self._el[i])) / 100.0
+        return az, el
+
+    def posiciones(self, fechas):
+        """ Versión por lotes: arreglos (az, el) para muchos instantes """
+        segundos = a_segundos(fechas).ravel()
+        anios = segundos.astype("datetime64[s]").astype("datetime64[Y]")
+        desfase = segundos - anios.astype("datetime64[s]").astype(np.float64)
+        k = desfase / self.paso_s
+        i = np.minimum(k.astype(np.int64), self.n - 2)
+        f = k - i
+        az0 = self.az[i].astype(np.float64)
+        d = (self.az[i + 1] - az0 + 18000) % 36000 - 18000
+        el0 = self.el[i].astype(np.float64)
+        el = el0 + f * (self.el[i + 1] - el0)
+        return ((az0 + f * d) % 36000) / 100.0, el / 100.0
+
+    def cerrar(self):
+        self._az.release()
+        self._el.release()
+        self.az = self.el = None
+        self._mm.close()
+
+
+def ruta_para(lat, lon, elevacion=0, directorio=DIRECTORIO_TABLAS):
+    return os.path.join(directorio, f"sol_{lat:+.4f}_{lon:+.4f}_{elevacion:.0f}.sol")
+
+
+def abrir_o_generar(lat, lon, elevacion=0, directorio=DIRECTORIO_TABLAS):
+    """ Tabla de la ubicación; se genera en `directorio` si no existe o es de otro año """
+    ruta = ruta_para(lat, lon, elevacion, directorio)
+    anio = datetime.datetime.now(datetime.timezone.utc).year
+    if os.path.exists(ruta):
+        tabla = TablaAnual(ruta)
+        if tabla.anio == anio:
+            return tabla
+        tabla.cerrar()
+    os.makedirs(directorio, exist_ok=True)
+    generar(ruta, lat, lon, elevacion, anio)
+    return TablaAnual(ruta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera la tabla anual de la trayectoria solar")
+    parser.add_argument("--lat", type=float, required=True)
+    parser.add_argument("--lon", type=float, required=True)
+    parser.add_argument("--elevacion", type=float, default=0)
+    parser.add_argument("--anio", type=int, default=None)
+    parser.add_argument("--paso", type=int, default=PASO_S, help="Segundos entre muestras")
+    parser.add_argument("--salida", help="Archivo de salida (por defecto, en tablas/)")
+    args = parser.parse_args()
+
+    ruta = args.salida or ruta_para(args.lat, args.lon, args.elevacion)
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    t0 = time.perf_counter()
+    n = generar(ruta, args.lat, args.lon, args.elevacion, args.anio, args.paso)
+    print(f"{n} muestras en {time.perf_counter() - t0:.2f} s -> {ruta} ({os.path.getsize(ruta)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Telemetría FPGA -> Python: posición real de las rampas y errores de los parsers.
+
+El enlace era de ida: `telemetry_tx` (FINAL-telemetry.v) ahora manda por el
+TX del HC-05 un paquete de 11 bytes cada 100 ms y justo después de cada trama
+aceptada:
+
+    byte 0     SYNC = 0x5A
+    bytes 1-3  pos_az[11:0] | pos_el[11:0]     current_pos (0..4095)
+    bytes 4-6  obj_az[11:0] | obj_el[11:0]     target_pos
+    byte 7     tramas aceptadas (módulo 256)
+    byte 8     errores del parser ASCII (con la binaria cuenta falsos inicios en 'A')
+    byte 9     errores del parser binario (CRC o rango)
+    byte 10    CRC-8 de los bytes 1-9 (el de trama.crc8)
+
+`Telemetria` lee el puerto en un hilo aparte mientras el bucle de rastreo
+escribe. `telemetria.serie(destino)` anota el instante en que sale cada
+trama: con un TransporteSerie, cuando el transporte la escribe de verdad
+(las que coalesce no llegan a la FPGA y no se anotan); con otro puerto lo
+envuelve como `metricas.serie` y anota cada write. Cuando el contador de
+tramas avanza, la diferencia (menos lo que tarda el propio paquete en el
+cable) es la latencia real ida y vuelta: Bluetooth, UART, parser y regreso.
+Los writes se emparejan en orden; los que el parser rechaza (sube su
+contador de errores) se sacan antes, para no atribuirle su latencia a la
+trama siguiente.
+
+Con `lazo_cerrado`, `retener()` pide no mandar un objetivo nuevo mientras la
+rampa no haya alcanzado el anterior (solo si el último paquete es reciente;
+sin telemetría se envía como siempre).
+
+    python -m rastreador --telemetria sol
+    python -m rastreador --lazo-cerrado celeste Luna --cielo-completo
+"""
+import collections
+import threading
+import time
+
+from rastreador import config
+from rastreador.trama import SYNC_BINARIA, SYNC_PRECISA, crc8
+from rastreador.transporte import TransporteSerie
+
+SYNC_TELEMETRIA = 0x5A
+LARGO_TELEMETRIA = 11
+PERIODO_TELEMETRIA_S = 0.1
+# Sin paquetes en este tiempo la telemetría se da por perdida y no se retiene nada
+FRESCURA_S = 3 * PERIODO_TELEMETRIA_S
+# Una trama sin confirmar tras esto se cuenta como perdida (se perdió en el enlace)
+LIMITE_CONFIRMACION_S = 2.0
+VENTANA_LATENCIA = 512
+
+
+def paquete_telemetria(pos_az, pos_el, obj_az, obj_el, tramas=0, errores_ascii=0, errores_binario=0):
+    """ Codifica un paquete como lo manda la FPGA (para simuladores) """
+    cuerpo = bytes([pos_az >> 4, ((pos_az & 0xF) << 4) | (pos_el >> 8), pos_el & 0xFF,
+                    obj_az >> 4, ((obj_az & 0xF) << 4) | (obj_el >> 8), obj_el & 0xFF,
+                    tramas & 0xFF, errores_ascii & 0xFF, errores_binario & 0xFF])
+    return bytes([SYNC_TELEMETRIA]) + cuerpo + bytes([crc8(cuerpo)])
+
+
+def decodificar_telemetria(paquete):
+    """ Inverso de paquete_telemetria: dict, o None si el paquete no es válido """
+    if (len(paquete) != LARGO_TELEMETRIA or paquete[0] != SYNC_TELEMETRIA
+            or crc8(paquete[1:10]) != paquete[10]):
+        return None
+    pos = (paquete[1] << 16) | (paquete[2] << 8) | paquete[3]
+    obj = (paquete[4] << 16) | (paquete[5] << 8) | paquete[6]
+    return {"pos_az": pos >> 12, "pos_el": pos & 0xFFF, "obj_az": obj >> 12, "obj_el": obj & 0xFFF,
+            "tramas": paquete[7], "errores_ascii": paquete[8], "errores_binario": paquete[9]}
+
+
+class Decodificador:
+    """ Separa paquetes de un flujo de bytes; con CRC malo avanza un byte y resincroniza en el SYNC """
+
+    def __init__(self):
+        self.bufer = bytearray()
+        self.descartados = 0
+
+    def alimentar(self, datos):
+        self.bufer += datos
+        paquetes = []
+        while True:
+            i = self.bufer.find(SYNC_TELEMETRIA)
+            if i < 0:
+                self.descartados += len(self.bufer)
+                self.bufer.clear()
+                break
+            if i:
+                self.descartados += i
+                del self.bufer[:i]
+            if len(self.bufer) < LARGO_TELEMETRIA:
+                break
+            paquete = decodificar_telemetria(bytes(self.bufer[:LARGO_TELEMETRIA]))
+            if paquete is None:
+                self.descartados += 1
+                del self.bufer[:1]
+                continue
+            paquetes.append(paquete)
+            del self.bufer[:LARGO_TELEMETRIA]
+        return paquetes
+
+
+def _es_binaria(datos):
+    return datos[0] in (SYNC_BINARIA, SYNC_PRECISA)
+
+
+class SerieConfirmada:
+    """ Puerto envuelto: cada write anota su instante para emparejarlo con el contador de tramas """
+
+    def __init__(self, destino, telemetria):
+        self.destino = destino
+        self.telemetria = telemetria
+
+    def write(self, datos):
+        self.telemetria.registrar_envio(binaria=_es_binaria(datos))
+        return self.destino.write(datos)
+
+    def __getattr__(self, nombre):
+        return getattr(self.destino, nombre)
+
+
+class Telemetria:
+    """
+    puerto: objeto con read() (pyserial); None para alimentar a mano con
+    `procesar` (simuladores, pruebas).
+    """
+
+    def __init__(self, puerto=None, baudios=config.BAUD_RATE, lazo_cerrado=False, reloj=time.monotonic):
+        self.puerto = puerto
+        self.lazo_cerrado = lazo_cerrado
+        self._reloj = reloj
+        # El paquete de confirmación sale completo recién LARGO * 10 bits después del frame_ok
+        self.duracion_paquete = LARGO_TELEMETRIA * 10 / baudios
+        self.decodificador = Decodificador()
+        self._cerrojo = threading.Lock()
+        self._hilo = None
+        self._parar = threading.Event()
+        self._primero = threading.Event()
+        self.error = None
+
+        self.ultimo = None          # Último paquete decodificado
+        self.t_ultimo = None
+        self.envios = collections.deque()       # (instante, binaria) de writes sin confirmar
+        self.latencias = collections.deque(maxlen=VENTANA_LATENCIA)
+        self.paquetes = 0
+        self.confirmadas = 0
+        self.sin_confirmar = 0
+        self.retenidas = 0
+
+    # --- Lectura ---
+    def iniciar(self, espera=FRESCURA_S):
+        """ Arranca el hilo lector y espera hasta `espera` s el primer paquete (referencia del contador) """
+        if self.puerto is None or not hasattr(self.puerto, "read"):
+            raise ValueError("La telemetría necesita un puerto que se pueda leer (no --sin-puerto)")
+        self._hilo = threading.Thread(target=self._leer, name="telemetria", daemon=True)
+        self._hilo.start()
+        self._primero.wait(espera)
+        return self
+
+    def _leer(self):
+        while not self._parar.is_set():
+            try:
+                datos = self.puerto.read(getattr(self.puerto, "in_waiting", 0) or 1)
+            except Exception as e:      # Puerto cerrado o desconectado: se deja de leer
+                self.error = e
+                return
+            if datos:
+                self.procesar(datos, self._reloj())
+
+    def detener(self, timeout=1.0):
+        self._parar.set()
+        if self._hilo:
+            self._hilo.join(timeout)
+
+    def procesar(self, datos, t=None):
+        """ Bytes recibidos en el instante t (por defecto ahora); devuelve los paquetes completos """
+        t = self._reloj() if t is None else t
+        paquetes = self.decodificador.alimentar(datos)
+        with self._cerrojo:
+            for p in paquetes:
+                self._paquete(p, t)
+        return paquetes
+
+    def _descartar(self, cuantas, binaria):
+        """ Saca las `cuantas` tramas sin confirmar más viejas del formato que rechazó el parser """
+        for envio in [e for e in self.envios if e[1] == binaria][:cuantas]:
+            self.envios.remove(envio)
+            self.sin_confirmar += 1
+
+    def _paquete(self, p, t):
+        if self.ultimo is None:
+            # Sin contador previo no se sabe qué confirmó este paquete
+            self.sin_confirmar += len(self.envios)
+            self.envios.clear()
+            nuevas = 0
+        else:
+            nuevas = (p["tramas"] - self.ultimo["tramas"]) % 256
+            self._descartar((p["errores_binario"] - self.ultimo["errores_binario"]) % 256, True)
+            self._descartar((p["errores_ascii"] - self.ultimo["errores_ascii"]) % 256, False)
+        while self.envios and t - self.envios[0][0] > LIMITE_CONFIRMACION_S:
+            self.envios.popleft()
+            self.sin_confirmar += 1
+        for _ in range(nuevas):
+            if not self.envios:
+                break
+            self.latencias.append(t - self.envios.popleft()[0] - self.duracion_paquete)
+            self.confirmadas += 1
+        self.ultimo, self.t_ultimo = p, t
+        self.paquetes += 1
+        self._primero.set()
+
+    # --- Escritura ---
+    def serie(self, destino):
+        """ Puerto que anota cada trama al salir; un TransporteSerie se devuelve tal cual, con el aviso puesto """
+        if isinstance(destino, TransporteSerie):
+            destino.al_escribir = lambda t, trama: self.registrar_envio(t, _es_binaria(trama))
+            return destino
+        return SerieConfirmada(destino, self)
+
+    def registrar_envio(self, t=None, binaria=False):
+        with self._cerrojo:
+            self.envios.append((self._reloj() if t is None else t, binaria))
+
+    # --- Estado ---
+    def vigente(self):
+        """ Último paquete, o None si no hay o tiene más de FRESCURA_S """
+        with self._cerrojo:
+            if self.ultimo is None or self._reloj() - self.t_ultimo > FRESCURA_S:
+                return None
+            return self.ultimo
+
+    def en_camino(self):
+        """ True si la rampa no alcanzó todavía el objetivo (False sin telemetría vigente) """
+        p = self.vigente()
+        return bool(p) and (p["pos_az"] != p["obj_az"] or p["pos_el"] != p["obj_el"])
+
+    def retener(self):
+        """ Con lazo cerrado: no enviar un objetivo nuevo hasta que el servo alcance el anterior """
+        if self.lazo_cerrado and self.en_camino():
+            self.retenidas += 1
+            return True
+        return False
+
+    def resumen(self):
+        with self._cerrojo:
+            lat = sorted(self.latencias)
+            ultimo = dict(self.ultimo) if self.ultimo else {}
+        pct = lambda p: 1000 * lat[min(len(lat) - 1, int(p * len(lat)))] if lat else None
+        return dict(ultimo, paquetes=self.paquetes, bytes_descartados=self.decodificador.descartados,
+                    confirmadas=self.confirmadas, sin_confirmar=self.sin_confirmar, retenidas=self.retenidas,
+                    latencia_p50_ms=pct(0.50), latencia_p99_ms=pct(0.99),
+                    latencia_max_ms=1000 * lat[-1] if lat else None)
@@ -0,0 +1,120 @@
+"""
+Tramas hacia la FPGA.
+
+ASCII (la de siempre, 17 bytes):  A{az:03d}E{el:03d}H{hhmmss}I{id}
+
+Binaria compacta (7 bytes), la decodifica `bt_binary_parser` en FINAL-data_parser.v:
+
+    byte 0     SYNC = 0xA5 (nunca aparece en la trama ASCII, que es < 0x80)
+    bytes 1-2  az[8:0] | el[6:0]                         (big-endian)
+    bytes 3-5  hora[4:0] | min[5:0] | seg[5:0] | zona[3:0] | 000   (zona 0-9: un dígito en la LCD)
+    byte 6     CRC-8 (polinomio 0x07, valor inicial 0x00) de los bytes 1-5
+
+Binaria precisa (8 bytes), ángulos en décimas de grado para los servos de 12 bits:
+
+    byte 0     SYNC = 0xA6
+    bytes 1-3  az_dd[11:0] | el_dd[11:0]                 (big-endian)
+    bytes 4-6  hora/zona como en la compacta
+    byte 7     CRC-8 de los bytes 1-6
+
+A 9600 baudios (960 bytes/s) la ASCII permite ~56 tramas/s y la binaria ~137.
+"""
+SYNC_BINARIA = 0xA5
+LARGO_BINARIA = 7
+SYNC_PRECISA = 0xA6
+LARGO_PRECISA = 8
+
+AZ_MAX_BIN = (1 << 9) - 1
+EL_MAX_BIN = (1 << 7) - 1
+DECIMAS_MAX = (1 << 12) - 1
+# La FPGA rechaza zonas de 10-15 (el campo es de 4 bits, la LCD muestra un dígito)
+ZONA_MAX = 9
+
+
+def _tabla_crc8(polinomio=0x07):
+    tabla = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ polinomio) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        tabla.append(crc)
+    return tabla
+
+
+TABLA_CRC8 = _tabla_crc8()
+
+
+def crc8(datos):
+    """ CRC-8 (poly 0x07, init 0x00, sin reflejar), el mismo que calcula la FPGA """
+    crc = 0
+    for b in datos:
+        crc = TABLA_CRC8[crc ^ b]
+    return crc
+
+
+def trama_ascii(az, el, hora_str, id_loc):
+    return f"A{az:03d}E{el:03d}H{hora_str}I{id_loc}".encode('utf-8')
+
+
+def _tiempo(hora_str, id_loc):
+    hh, mm, ss = int(hora_str[0:2]), int(hora_str[2:4]), int(hora_str[4:6])
+    zona = max(0, min(ZONA_MAX, int(id_loc)))
+    tiempo = (hh << 19) | (mm << 13) | (ss << 7) | (zona << 3)
+    return bytes([tiempo >> 16, (tiempo >> 8) & 0xFF, tiempo & 0xFF])
+
+
+def _hora_zona(b):
+    tiempo = (b[0] << 16) | (b[1] << 8) | b[2]
+    return f"{tiempo >> 19:02d}{(tiempo >> 13) & 0x3F:02d}{(tiempo >> 7) & 0x3F:02d}", (tiempo >> 3) & 0xF
+
+
+def trama_binaria(az, el, hora_str, id_loc):
+    """ Codifica la trama compacta; az y el se saturan al ancho de su campo y la zona a 0-ZONA_MAX """
+    az = max(0, min(AZ_MAX_BIN, int(az)))
+    el = max(0, min(EL_MAX_BIN, int(el)))
+    pos = (az << 7) | el
+    cuerpo = bytes([pos >> 8, pos & 0xFF]) + _tiempo(hora_str, id_loc)
+    return bytes([SYNC_BINARIA]) + cuerpo + bytes([crc8(cuerpo)])
+
+
+def trama_precisa(az_dd, el_dd, hora_str, id_loc):
+    """ Trama de 8 bytes con az/el en décimas de grado (enteros, saturados a 12 bits) """
+    az_dd = max(0, min(DECIMAS_MAX, int(az_dd)))
+    el_dd = max(0, min(DECIMAS_MAX, int(el_dd)))
+    pos = (az_dd << 12) | el_dd
+    cuerpo = bytes([pos >> 16, (pos >> 8) & 0xFF, pos & 0xFF]) + _tiempo(hora_str, id_loc)
+    return bytes([SYNC_PRECISA]) + cuerpo + bytes([crc8(cuerpo)])
+
+
+def decodificar_precisa(trama):
+    """ Inverso de trama_precisa: (az_dd, el_dd, hora_str, id_loc) o None si la trama no es válida """
+    if len(trama) != LARGO_PRECISA or trama[0] != SYNC_PRECISA or crc8(trama[1:7]) != trama[7]:
+        return None
+    pos = (trama[1] << 16) | (trama[2] << 8) | trama[3]
+    return (pos >> 12, pos & 0xFFF) + _hora_zona(trama[4:7])
+
+
+def decodificar_binaria(trama):
+    """ Inverso de trama_binaria: (az, el, hora_str, id_loc) o None si la trama no es válida """
+    if len(trama) != LARGO_BINARIA or trama[0] != SYNC_BINARIA or crc8(trama[1:6]) != trama[6]:
+        return None
+    pos = (trama[1] << 8) | trama[2]
+    return (pos >> 7, pos & 0x7F) + _hora_zona(trama[3:6])
+
+
+def enviar_trama(bt_serial, az_servo, el, hora_str, id_loc, binaria=False, precisa=False):
+    """
+    Envía una trama ASCII (por defecto), binaria o precisa; devuelve lo
+    enviado (str o bytes). Con `precisa`, az_servo y el van en décimas de grado.
+    """
+    if precisa:
+        trama = trama_precisa(az_servo, el, hora_str, id_loc)
+        bt_serial.write(trama)
+        return trama
+    if binaria:
+        trama = trama_binaria(az_servo, el, hora_str, id_loc)
+        bt_serial.write(trama)
+        return trama
+    trama = trama_ascii(az_servo, el, hora_str, id_loc)
+    bt_serial.write(trama)
+    return trama.decode('utf-8')
@@ -0,0 +1,189 @@
+"""
+Transporte serie con búfer, escrituras no bloqueantes y métricas.
+
+`enviar_trama` llamaba a `bt_serial.write` de forma síncrona: con el enlace
+Bluetooth saturado el bucle de rastreo se quedaba parado dentro del write.
+TransporteSerie mete las tramas en un anillo acotado y las escribe con
+`os.write` sobre el descriptor no bloqueante del puerto; lo que no cabe se
+queda en el anillo y sale en la siguiente llamada a `bombear()` (o cuando el
+event loop avisa que el descriptor acepta datos, si se le pasa `loop`).
+
+Con `coalescer=True` (por defecto) una trama nueva reemplaza a las que aún
+esperan en el anillo: son posiciones absolutas y solo importa la última.
+
+Tiene `write()`, así que puede pasarse en lugar del `bt_serial` a
+`enviar_trama`, TransmisorDelta, etc. `al_escribir(t, trama)` se llama
+cuando el puerto acepta el primer byte de una trama (no al encolarla), así
+las reemplazadas o descartadas nunca se anotan (telemetria.Telemetria).
+"""
+import collections
+import os
+import select
+import time
+
+VENTANA_LATENCIA = 512
+# Sin descriptor no hay select(): pausa entre reintentos de `vaciar`
+SONDEO_VACIAR_S = 0.005
+
+
+class TransporteSerie:
+    """
+    destino: descriptor (int), objeto con fileno() (pyserial) u objeto con
+    write() no bloqueante (simuladores).
+    """
+
+    def __init__(self, destino, capacidad=16, coalescer=True, loop=None, reloj=time.monotonic, al_escribir=None):
+        self.fd = destino if isinstance(destino, int) else _fileno(destino)
+        self.destino = destino
+        if self.fd is not None:
+            os.set_blocking(self.fd, False)
+        self.capacidad = capacidad
+        self.coalescer = coalescer
+        self.loop = loop
+        self._reloj = reloj
+        self.al_escribir = al_escribir
+
+        self.anillo = collections.deque()   # (t_encolado, bytes)
+        self.en_vuelo = b""                 # Resto de la trama que ya empezó a salir
+        self.t_en_vuelo = None
+        self.empezada = False               # Ya salió algún byte de la trama en vuelo
+        self._vigilando = False
+
+        self.t_inicio = reloj()
+        self.encoladas = 0
+        self.escritas = 0
+        self.descartadas = 0        # Anillo lleno: se pierde la más vieja
+        self.coalescidas = 0        # Reemplazadas por una trama más nueva
+        self.bytes_escritos = 0
+        self.profundidad_max = 0
+        self.escrituras_parciales = 0
+        self.bloqueos = 0           # El puerto no aceptó ni un byte (búfer lleno)
+        self.latencias = collections.deque(maxlen=VENTANA_LATENCIA)
+
+    # --- Interfaz tipo archivo ---
+    def write(self, datos):
+        self.enviar(datos)
+        return len(datos)
+
+    def enviar(self, datos):
+        """ Encola sin bloquear y escribe lo que el puerto acepte ahora mismo """
+        if self.coalescer and self.anillo:
+            self.coalescidas += len(self.anillo)
+            self.anillo.clear()
+        elif len(self.anillo) >= self.capacidad:
+            self.anillo.popleft()
+            self.descartadas += 1
+        self.anillo.append((self._reloj(), bytes(datos)))
+        self.encoladas += 1
+        self.profundidad_max = max(self.profundidad_max, len(self.anillo))
+        self.bombear()
+
+    def bombear(self):
+        """ Escribe hasta que el puerto deje de aceptar datos; devuelve los bytes escritos """
+        escritos = 0
+        while True:
+            if not self.en_vuelo:
+                if not self.anillo:
+                    break
+                self.t_en_vuelo, self.en_vuelo = self.anillo.popleft()
+                self.empezada = False
+            n = self._escribir(self.en_vuelo)
+            if n and not self.empezada:
+                self.empezada = True
+                if self.al_escribir:
+                    self.al_escribir(self._reloj(), self.en_vuelo)
+            escritos += n
+            self.en_vuelo = self.en_vuelo[n:]
+            if self.en_vuelo:
+                if n:
+                    self.escrituras_parciales += 1
+                else:
+                    self.bloqueos += 1
+                break
+            self.escritas += 1
+            self.latencias.append(self._reloj() - self.t_en_vuelo)
+        self.bytes_escritos += escritos
+        self._vigilar()
+        return escritos
+
+    def _escribir(self, datos):
+        try:
+            if self.fd is not None:
+                return os.write(self.fd, datos)
+            n = self.destino.write(datos)
+            return len(datos) if n is None else n
+        except BlockingIOError:
+            return 0
+
+    def _vigilar(self):
+        """ Con event loop: pedir aviso cuando el descriptor acepte más datos """
+        if self.loop is None or self.fd is None:
+            return
+        pendiente = self.pendiente()
+        if pendiente and not self._vigilando:
+            self.loop.add_writer(self.fd, self.bombear)
+            self._vigilando = True
+        elif not pendiente and self._vigilando:
+            self.loop.remove_writer(self.fd)
+            self._vigilando = False
+
+    def pendiente(self):
+        return bool(self.en_vuelo) or bool(self.anillo)
+
+    def vaciar(self, timeout=1.0):
+        """ Bloquea hasta `timeout` s para sacar lo pendiente (al cerrar) """
+        limite = self._reloj() + timeout
+        while self.pendiente() and self._reloj() < limite:
+            if self.fd is not None:
+                select.select([], [self.fd], [], max(0.0, limite - self._reloj()))
+            self.bombear()
+            if self.fd is None and self.pendiente():
+                # write() que sigue rechazando datos: sin la pausa ocuparía un núcleo hasta el límite
+                time.sleep(min(SONDEO_VACIAR_S, max(0.0, limite - self._reloj())))
+        return not self.pendiente()
+
+    def cerrar(self):
+        if self._vigilando:
+            self.loop.remove_writer(self.fd)
+            self._vigilando = False
+
+    def metricas(self):
+        lat = sorted(self.latencias)
+        pct = lambda p: 1000 * lat[min(len(lat) - 1, int(p * len(lat)))] if lat else 0.0
+        transcurrido = max(1e-9, self._reloj() - self.t_inicio)
+        return {
+            "en_cola": len(self.anillo) + bool(self.en_vuelo),
+            "profundidad_max": self.profundidad_max,
+            "encoladas": self.encoladas,
+            "escritas": self.escritas,
+            "descartadas": self.descartadas,
+            "coalescidas": self.coalescidas,
+            "escrituras_parciales": self.escrituras_parciales,
+            "bloqueos": self.bloqueos,
+            "latencia_p50_ms": pct(0.50),
+            "latencia_p99_ms": pct(0.99),
+            "bytes_escritos": self.bytes_escritos,
+            "rendimiento_Bps": self.bytes_escritos / transcurrido,
+        }
+
+
+class SerieNula:
+    """ Sumidero con la interfaz de pyserial que usan los scripts (pruebas sin hardware) """
+    is_open = True
+
+    def __init__(self):
+        self.bytes_escritos = 0
+
+    def write(self, datos):
+        self.bytes_escritos += len(datos)
+        return len(datos)
+
+    def close(self):
+        pass
+
+
+def _fileno(destino):
+    try:
+        return destino.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
@@ -0,0 +1,141 @@
+"""
+Tabla diaria de trayectoria solar con interpolación de Hermite.
+
+Al crearla (y al pasar la medianoche local de cada ubicación) se precalcula
+la posición del sol cada `paso_s` segundos con el motor vectorizado de
+`rastreador.solar`. Las consultas en tiempo real se sirven interpolando entre
+dos nodos, así que el costo por tick es una búsqueda en tabla y no depende de
+la frecuencia del bucle.
+
+Se interpola el vector unitario de dirección (x=este, y=norte, z=cenit) y no
+el azimut: cerca del cenit (Bogotá) y en los polos el azimut salta muy rápido,
+pero el vector es suave todo el día. La tabla guarda la posición geométrica
+y la refracción se aplica después de interpolar, porque su corte a -0.83°
+no es derivable.
+"""
+import datetime
+import math
+
+import numpy as np
+import pytz
+
+from rastreador.solar import posicion_solar, refraccion
+
+# Error máximo permitido frente al cálculo directo (grados de separación angular)
+ERROR_MAX_DEG = 0.01
+
+PASO_INICIAL_S = 600
+PASO_MINIMO_S = 60
+DERIVADA_DT_S = 1.0
+
+
+def _vector(az, el):
+    """ Azimut/altitud (grados) a vector unitario (este, norte, cenit) """
+    az_r = np.radians(az)
+    el_r = np.radians(el)
+    return np.stack([np.cos(el_r) * np.sin(az_r), np.cos(el_r) * np.cos(az_r), np.sin(el_r)], axis=-1)
+
+
+def _separacion(v1, v2):
+    cos_sep = np.clip(np.sum(v1 * v2, axis=-1), -1.0, 1.0)
+    return np.degrees(np.arccos(cos_sep))
+
+
+class _TablaDia:
+    """ Nodos (tiempo, vector, derivada) de un día local de una ubicación """
+
+    def __init__(self, sitio, inicio, fin, paso_s):
+        self.paso = float(paso_s)
+        self.inicio = inicio
+        self.fin = fin
+        n = int(math.ceil((fin - inicio) / self.paso)) + 1
+        self.tiempos = inicio + self.paso * np.arange(n)
+
+        # Posición y derivada (diferencia central) en una sola pasada vectorizada
+        todos = np.concatenate([self.tiempos, self.tiempos - DERIVADA_DT_S, self.tiempos + DERIVADA_DT_S])
+        az, el = posicion_solar(todos, [sitio], con_refraccion=False)
+        v = _vector(az[0], el[0])
+        self.vec = v[:n]
+        self.der = (v[2 * n:] - v[n:2 * n]) / (2 * DERIVADA_DT_S) * self.paso
+
+        # Listas de Python: el acceso escalar por tick es más barato que con NumPy
+        self._vec = self.vec.tolist()
+        self._der = self.der.tolist()
+
+    def interpolar(self, t):
+        """ Vector de dirección interpolado (Hermite cúbico) en el instante t """
+        i = min(int((t - self.inicio) // self.paso), len(self._vec) - 2)
+        s = (t - self.inicio) / self.paso - i
+        s2, s3 = s * s, s * s * s
+        h00 = 2 * s3 - 3 * s2 + 1
+        h10 = s3 - 2 * s2 + s
+        h01 = -2 * s3 + 3 * s2
+        h11 = s3 - s2
+        p0, p1, m0, m1 = self._vec[i], self._vec[i + 1], self._der[i], self._der[i + 1]
+        return [h00 * p0[k] + h10 * m0[k] + h01 * p1[k] + h11 * m1[k] for k in range(3)]
+
+    def error_max(self, sitio):
+        """ Peor separación angular en los puntos medios entre nodos (donde Hermite se aleja más) """
+        medios = self.tiempos[:-1] + self.paso / 2
+        az, el = posicion_solar(medios, [sitio], con_refraccion=False)
+        sobre_horizonte = el[0] > -1.0
+        if not sobre_horizonte.any():
+            return 0.0
+        exacto = _vector(az[0], el[0])
+        interp = np.array([self.interpolar(t) for t in medios])
+        interp /= np.linalg.norm(interp, axis=1, keepdims=True)
+        return float(_separacion(exacto, interp)[sobre_horizonte].max())
+
+
+class TablaTrayectoria:
+    """
+    Caché de trayectoria solar para las entradas de LOCATIONS.
+
+    ubicaciones: diccionario con el formato de LOCATIONS ("coords", "tz" y
+    opcionalmente "elevation").
+    """
+
+    def __init__(self, ubicaciones, paso_s=PASO_INICIAL_S, error_max_deg=ERROR_MAX_DEG):
+        self.ubicaciones = ubicaciones
+        self.paso_s = paso_s
+        self.error_max_deg = error_max_deg
+        self.tablas = {}
+        self.errores = {}
+        for id_loc in ubicaciones:
+            self._construir(id_loc, datetime.datetime.now(datetime.timezone.utc))
+
+    def _sitio(self, id_loc):
+        loc = self.ubicaciones[id_loc]
+        return (loc["coords"][0], loc["coords"][1], loc.get("elevation", 0))
+
+    def _construir(self, id_loc, instante):
+        """ Precalcula el día local que contiene `instante`, afinando el paso hasta cumplir el error """
+        tz = pytz.timezone(self.ubicaciones[id_loc]["tz"])
+        fecha = instante.astimezone(tz).date()
+        medianoche = tz.localize(datetime.datetime.combine(fecha, datetime.time(0, 0)))
+        siguiente = tz.localize(datetime.datetime.combine(fecha + datetime.timedelta(days=1), datetime.time(0, 0)))
+
+        sitio = self._sitio(id_loc)
+        paso = self.paso_s
+        while True:
+            tabla = _TablaDia(sitio, medianoche.timestamp(), siguiente.timestamp(), paso)
+            error = tabla.error_max(sitio)
+            if error <= self.error_max_deg or paso <= PASO_MINIMO_S:
+                break
+            paso = max(PASO_MINIMO_S, paso / 2)
+        self.tablas[id_loc] = tabla
+        self.errores[id_loc] = error
+        return tabla
+
+    def posicion(self, id_loc, instante):
+        """ (azimut, altitud) en grados para `instante` (datetime con zona) """
+        t = instante.timestamp()
+        tabla = self.tablas[id_loc]
+        if not (tabla.inicio <= t < tabla.fin):
+            # Pasó la medianoche local (o se pidió otro día): recalcular
+            tabla = self._construir(id_loc, instante)
+        x, y, z = tabla.interpolar(t)
+        norma = math.sqrt(x * x + y * y + z * z)
+        az = math.degrees(math.atan2(x, y)) % 360
+        el = math.degrees(math.asin(max(-1.0, min(1.0, z / norma))))
+        return az, el + refraccion(el)
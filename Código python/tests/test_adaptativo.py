@@ -0,0 +1,25 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from rastreador.adaptativo import Planificador, comparar
+from rastreador.delta import TransmisorDelta
+from rastreador.simulacion import efemeride_sol
+
+INICIO = datetime.datetime(2025, 6, 21, 12, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_ajustar_alarga_la_trama_clave():
+    planificador = Planificador(lambda s: (120.0, 45.0), periodo_max=60.0)
+    assert planificador.ajustar(TransmisorDelta()).intervalo_clave == 60.0
+    assert planificador.espera(INICIO, 120.0, 45.0) == 60.0      # Quieto: duerme hasta la clave
+
+
+def test_adaptativo_envia_menos_tramas_sin_atrasarse():
+    r = comparar(efemeride_sol(4.711, -74.0721, 2640), INICIO, horas=3)
+    fijo, adaptativo = r["fijo"], r["adaptativo"]
+    assert adaptativo["calculos"] * 10 < fijo["calculos"]
+    assert adaptativo["tramas"] * 3 < fijo["tramas"]
+    assert adaptativo["atraso_max"] <= 1
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+
+from rastreador.anticipacion import Anticipador, anticipar_simulacion, latencia_enlace
+
+
+def _quieto(segundos):
+    return 120.0, 45.0
+
+
+def test_latencia_por_defecto_segun_la_trama():
+    assert Anticipador(_quieto, 1.0, binaria=True).latencia_s == pytest.approx(latencia_enlace(True))
+    assert Anticipador(_quieto, 1.0).latencia_s == pytest.approx(latencia_enlace(False))
+    assert latencia_enlace(True) < latencia_enlace(False)
+
+
+def test_simulacion_pasa_binaria_al_anticipador(monkeypatch):
+    from rastreador import anticipacion
+
+    vistas = []
+    original = anticipacion.Anticipador.__init__
+
+    def espiar(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        vistas.append(self.latencia_s)
+    monkeypatch.setattr(anticipacion.Anticipador, "__init__", espiar)
+    t = np.arange(0.0, 3000.0, 600.0)
+    datos = {"t": t, "az": np.full_like(t, 120.0), "el": np.full_like(t, 45.0),
+             "servo_az": np.full(len(t), 120), "servo_el": np.full(len(t), 45)}
+    anticipar_simulacion(datos, 4000.0, 0.15, binaria=True)
+    assert vistas == [pytest.approx(latencia_enlace(True))]
+
+
+def test_describir_sin_muestras_en_regimen():
+    from rastreador.anticipacion import ErrorSeguimiento, describir
+
+    vacio = ErrorSeguimiento()
+    vacio.adquisicion = 12
+    lleno = ErrorSeguimiento()
+    lleno.adquisicion = 3
+    lleno.agregar(0.5)
+    linea = describir({"directo": vacio.resumen(), "anticipado": lleno.resumen()})
+    assert "directo sin muestras en régimen" in linea and "0.00°" not in linea
+    assert "anticipado RMS 0.50°" in linea
+    assert "descartadas durante el giro inicial: directo 12, anticipado 3" in linea
@@ -0,0 +1,28 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("ephem")
+np = pytest.importorskip("numpy")
+
+from rastreador.celeste import PoolCuerpos
+
+BOGOTA = (4.711, -74.0721, 2640)
+INICIO = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def _separacion(az1, el1, az2, el2):
+    a1, e1, a2, e2 = map(np.radians, (az1, el1, az2, el2))
+    c = np.sin(e1) * np.sin(e2) + np.cos(e1) * np.cos(e2) * np.cos(a1 - a2)
+    return np.degrees(np.arccos(np.clip(c, -1, 1)))
+
+
+@pytest.mark.parametrize("cuerpo", ["Luna", "Venus", "Marte"])
+def test_interpoladas_dentro_de_la_cota(cuerpo):
+    pool = PoolCuerpos()
+    segundos = INICIO + np.arange(0, 30 * 86400, 300, dtype=np.float64)
+    az, el = pool.posiciones_interpoladas(cuerpo, *BOGOTA, segundos)
+    az0, el0 = pool.posiciones(cuerpo, *BOGOTA, segundos)
+    sobre = el0 > 5
+    assert sobre.sum() > 1000
+    assert _separacion(az[sobre], el[sobre], az0[sobre], el0[sobre]).max() < 0.006
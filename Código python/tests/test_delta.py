@@ -0,0 +1,51 @@
+from rastreador import trama as tramas
+from rastreador.delta import TransmisorDelta
+
+
+class Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class Puerto:
+    def __init__(self):
+        self.escrito = []
+
+    def write(self, datos):
+        self.escrito.append(datos)
+
+
+def test_solo_envia_cambios_y_tramas_clave():
+    reloj = Reloj()
+    puerto = Puerto()
+    tx = TransmisorDelta(intervalo_clave=10.0, reloj=reloj)
+    enviadas = []
+    for s, az in enumerate([100, 100, 100, 101, 101] + [101] * 10):
+        reloj.t = float(s)
+        enviadas.append(tx.enviar(puerto, az, 45, f"1200{s:02d}", 1) is not None)
+    # Primera, cambio en t=3 y clave 10 s después (t=13)
+    assert [s for s, e in enumerate(enviadas) if e] == [0, 3, 13]
+    r = tx.resumen()
+    assert (r["tramas_enviadas"], r["tramas_clave"], r["tramas_omitidas"]) == (3, 1, 12)
+    assert r["bytes_enviados"] == sum(len(t) for t in puerto.escrito)
+    assert r["bytes_ahorrados"] == 12 * len(tramas.trama_ascii(101, 45, "120000", 1))
+
+
+def test_cambio_de_ubicacion_fuerza_envio():
+    reloj = Reloj()
+    tx = TransmisorDelta(reloj=reloj)
+    assert tx.enviar(Puerto(), 100, 45, "120000", 1)
+    assert tx.enviar(Puerto(), 100, 45, "120000", 2)
+
+
+def test_paso_en_decimas_con_trama_precisa():
+    reloj = Reloj()
+    puerto = Puerto()
+    tx = TransmisorDelta(paso_az=5, paso_el=5, precisa=True, reloj=reloj)
+    assert tx.enviar(puerto, 1000, 450, "120000", 1)
+    assert tx.enviar(puerto, 1004, 452, "120000", 1) is None
+    assert tx.enviar(puerto, 1005, 450, "120000", 1)
+    assert [len(t) for t in puerto.escrito] == [tramas.LARGO_PRECISA] * 2
@@ -0,0 +1,140 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from rastreador.difusion import Difusor, Suscriptor
+
+
+@pytest.fixture
+def nombre():
+    nombre = f"rastreador_prueba_{os.getpid()}"
+    yield nombre
+    from multiprocessing import shared_memory
+    try:
+        shared_memory.SharedMemory(nombre).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def test_publicar_y_leer(nombre):
+    d = Difusor(nombre, capacidad=8)
+    s = Suscriptor(nombre)
+    assert s.ultimo() is None
+    for k in range(3):
+        d.publicar(1000.0 + k, 2, "Luna", 120.5 + k, 30.25, 95 + k, 30)
+    filas = s.nuevos()
+    assert [f["seq"] for f in filas] == [0, 1, 2]
+    assert filas[1] == {"seq": 1, "t": 1001.0, "id_loc": 2, "cuerpo": "Luna", "az": 121.5, "el": 30.25,
+                        "servo_az": 96, "servo_el": 30}
+    assert s.ultimo()["seq"] == 2
+    s.cerrar()
+    d.cerrar(borrar=True)
+
+
+def test_anillo_pisado_cuenta_perdidos(nombre):
+    d = Difusor(nombre, capacidad=4)
+    s = Suscriptor(nombre)
+    for k in range(10):
+        d.publicar(float(k), 1, "Sol", 0.0, 0.0, 0, 0)
+    assert [f["seq"] for f in s.nuevos()] == [6, 7, 8, 9]
+    assert s.perdidos == 6
+    s.cerrar()
+    d.cerrar(borrar=True)
+
+
+def test_lector_concurrente_sin_filas_rotas(nombre):
+    d = Difusor(nombre, capacidad=16)
+    s = Suscriptor(nombre)
+    leidas = []
+    fin = threading.Event()
+
+    def leer():
+        while not fin.is_set():
+            leidas.extend(s.nuevos())
+
+    hilo = threading.Thread(target=leer)
+    hilo.start()
+    for k in range(20000):
+        d.publicar(float(k), 1, "Sol", float(k), -float(k), k, k)
+    fin.set()
+    hilo.join()
+    leidas.extend(s.nuevos())
+    assert leidas
+    for f in leidas:
+        assert f["t"] == f["az"] == -f["el"] == f["servo_az"] == f["servo_el"] == f["seq"]
+    assert len(leidas) + s.perdidos == 20000
+    s.cerrar()
+    d.cerrar(borrar=True)
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _escritor(nombre, *azimuts, borrar=False):
+    """ Otro proceso abre el Difusor, publica `azimuts` y sale normalmente """
+    codigo = (f"from rastreador.difusion import Difusor\n"
+              f"d = Difusor({nombre!r}, capacidad=8)\n"
+              f"for az in {list(azimuts)!r}:\n"
+              f"    d.publicar(1.0, 1, 'Sol', az, 20.0, int(az), 20)\n"
+              f"d.cerrar(borrar={borrar!r})\n")
+    return subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, cwd=RAIZ)
+
+
+def test_segundo_escritor_rechazado(nombre):
+    d = Difusor(nombre, capacidad=8)
+    d.publicar(1.0, 1, "Sol", 10.0, 20.0, 10, 20)
+    otro = _escritor(nombre)
+    assert otro.returncode != 0
+    assert "Ya hay un rastreador difundiendo" in otro.stderr
+    with pytest.raises(RuntimeError):
+        Difusor(nombre, capacidad=8)
+
+    s = Suscriptor(nombre)
+    assert s.ultimo()["az"] == 10.0
+    s.cerrar()
+    d.cerrar(borrar=True)
+
+
+def test_segmento_abandonado_se_reutiliza(nombre):
+    d = Difusor(nombre, capacidad=8)
+    d.publicar(1.0, 1, "Sol", 10.0, 20.0, 10, 20)
+    d.cerrar()                  # Sin borrar: como si el proceso hubiera muerto
+    d = Difusor(nombre, capacidad=8)
+    assert not d.propio and d.cabeza == 1
+    d.publicar(2.0, 1, "Sol", 11.0, 20.0, 11, 20)
+    s = Suscriptor(nombre)
+    assert s.ultimo()["seq"] == 1
+    s.cerrar()
+    d.cerrar(borrar=True)
+
+
+def test_escritor_reiniciado_sigue_en_el_mismo_segmento(nombre):
+    primero = _escritor(nombre, 10.0, 11.0)
+    assert primero.returncode == 0 and "leaked" not in primero.stderr
+    # Salió normalmente y el segmento sigue ahí (ni el Difusor ni el resource_tracker lo borraron)
+    s = Suscriptor(nombre)
+    assert s.ultimo()["az"] == 11.0
+
+    segundo = _escritor(nombre, 12.0, 13.0)
+    assert segundo.returncode == 0 and not segundo.stderr
+    assert [(f["seq"], f["az"]) for f in s.esperar(timeout=2)] == [(2, 12.0), (3, 13.0)]
+    assert s.readjuntes == 0
+    s.cerrar()
+
+
+def test_suscriptor_se_readjunta_si_el_segmento_se_reemplaza(nombre, monkeypatch):
+    from rastreador import difusion
+
+    if not os.path.isdir(difusion.DIR_SHM):
+        pytest.skip("el sistema no expone los segmentos en /dev/shm")
+    monkeypatch.setattr(difusion, "REVISION_S", 0.05)
+    assert _escritor(nombre, 10.0, borrar=False).returncode == 0
+    s = Suscriptor(nombre)
+    assert _escritor(nombre, borrar=True).returncode == 0
+    assert _escritor(nombre, 30.0, 31.0).returncode == 0
+    assert [(f["seq"], f["az"]) for f in s.esperar(timeout=2)] == [(0, 30.0), (1, 31.0)]
+    assert s.readjuntes == 1
+    s.cerrar()
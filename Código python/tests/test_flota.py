@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytz")
+pytest.importorskip("serial")
+
+from rastreador.flota import Flota, ejecutar_flota
+
+CONFIG = {"periodo": 0.1, "rastreadores": [
+    {"nombre": "panel-1", "ubicacion": {"coords": [4.711, -74.0721], "tz": "America/Bogota"}},
+    {"nombre": "panel-2", "ubicacion": {"coords": [40.4168, -3.7038], "tz": "Europe/Madrid"}, "binaria": True}]}
+
+
+def test_sin_puerto_ni_falsos_falla_antes_de_abrir():
+    with pytest.raises(ValueError, match="panel-1, panel-2 no tienen puerto"):
+        asyncio.run(ejecutar_flota(Flota(CONFIG), duracion=0.2))
+
+
+def test_falsos_reciben_tramas():
+    est = asyncio.run(ejecutar_flota(Flota(CONFIG), duracion=0.25, falsos=True))
+    assert est["tramas_escritas"] >= 2
+    assert est["bytes_recibidos_falsos"] == est["bytes_escritos"]
+
+
+def test_ubicacion_por_clave_o_nombre():
+    from rastreador.config import LOCATIONS
+
+    flota = Flota({"rastreadores": [{"ubicacion": 1}, {"ubicacion": "2"}, {"ubicacion": "madrid"}]}, LOCATIONS)
+    assert [r["sitio"][:2] for r in flota.rastreadores] == [(4.711, -74.0721), (40.4168, -3.7038),
+                                                            (40.4168, -3.7038)]
+    assert flota.rastreadores[0]["sitio"][2] == 2640
+    assert len(flota.tramas(1750500000.0)) == 3
+    with pytest.raises(ValueError, match="rastreador-1: Ubicación desconocida: 42"):
+        Flota({"rastreadores": [{"ubicacion": 42}]}, LOCATIONS)
+
+
+def test_main_con_ubicacion_por_clave(tmp_path, monkeypatch, capsys):
+    import json
+    import sys
+
+    from rastreador import flota
+
+    cfg = tmp_path / "cfg.json"
+    cfg.write_text(json.dumps({"periodo": 0.1, "rastreadores": [{"nombre": "p", "ubicacion": 1}]}))
+    monkeypatch.setattr(sys, "argv", ["flota", str(cfg), "--falsos", "--duracion", "0.2"])
+    flota.main()
+    assert "tramas_escritas" in capsys.readouterr().out
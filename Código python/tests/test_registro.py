@@ -0,0 +1,56 @@
+import os
+
+from rastreador.registro import CABECERA, Lector, Registro, _leer_indice
+
+T0 = 1750500000.0
+
+
+def _grabar(ruta, ticks, por_bloque=10):
+    r = Registro(ruta, ticks_por_bloque=por_bloque)
+    for i in range(ticks):
+        trama = f"A{90 + i % 3:03d}E045H120000Z1\n" if i % 2 == 0 else None
+        r.tick(T0 + i, 1, "Sol", 100.0 + i / 100, 45.25, 90 + i % 3, 45, trama)
+    r.cerrar()
+
+
+def test_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / "sesion.rlog")
+    _grabar(ruta, 35)
+    filas = list(Lector(ruta).ticks())
+    assert len(filas) == 35
+    t, id_loc, cuerpo, az, el, servo_az, servo_el, trama = filas[4]
+    assert (t, id_loc, cuerpo, az, el, servo_az, servo_el) == (T0 + 4, 1, 0, 100.04, 45.25, 91, 45)
+    assert trama == b"A091E045H120000Z1\n"
+    assert filas[5][7] == b""
+
+
+def test_busqueda_por_instante(tmp_path):
+    ruta = str(tmp_path / "sesion.rlog")
+    _grabar(ruta, 40)
+    filas = list(Lector(ruta).ticks(desde=T0 + 12, hasta=T0 + 25))
+    assert [f[0] for f in filas] == [T0 + i for i in range(12, 25)]
+
+
+def test_cola_incompleta_se_descarta(tmp_path):
+    ruta = str(tmp_path / "sesion.rlog")
+    _grabar(ruta, 40)
+    # Corte a mitad del último bloque, con el índice ya escrito
+    with open(ruta, "r+b") as f:
+        f.truncate(os.path.getsize(ruta) - 5)
+    assert len(list(Lector(ruta).ticks())) == 30
+    assert len(_leer_indice(ruta + ".idx")) == 3
+
+
+def test_archivo_mas_corto_que_el_indice(tmp_path):
+    ruta = str(tmp_path / "sesion.rlog")
+    _grabar(ruta, 40)
+    with open(ruta, "r+b") as f:
+        f.truncate(100)
+    lector = Lector(ruta)
+    assert list(lector.ticks()) == []
+    assert lector.indice == []
+    assert os.path.getsize(ruta) == CABECERA.size
+
+    # Se puede seguir anexando sobre el registro reparado
+    _grabar(ruta, 10)
+    assert len(list(Lector(ruta).ticks())) == 10
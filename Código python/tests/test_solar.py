@@ -0,0 +1,49 @@
+import datetime
+import math
+
+import numpy as np
+import pytest
+
+from rastreador import config
+from rastreador.solar import TOLERANCIA_DEG, posicion_solar
+from rastreador.solar_escalar import posicion_solar_escalar
+
+SITIOS = [(v["coords"][0], v["coords"][1], v.get("elevation", 0)) for v in config.LOCATIONS.values()]
+# 2000-2050 en pasos que no caen siempre a la misma hora del día
+SEGUNDOS = np.linspace(946684800.0, 2524608000.0, 97)
+
+
+def _separacion(az1, el1, az2, el2):
+    e1, e2 = math.radians(el1), math.radians(el2)
+    c = math.sin(e1) * math.sin(e2) + math.cos(e1) * math.cos(e2) * math.cos(math.radians(az1 - az2))
+    return math.degrees(math.acos(max(-1.0, min(1.0, c))))
+
+
+@pytest.mark.filterwarnings("ignore:Leap seconds:UserWarning")
+def test_tolerancia_frente_a_pysolar():
+    solar = pytest.importorskip("pysolar.solar")
+    az, el = posicion_solar(SEGUNDOS, SITIOS)
+    comparadas = 0
+    for k, (lat, lon, elev) in enumerate(SITIOS):
+        for i, s in enumerate(SEGUNDOS):
+            if el[k, i] <= 0:
+                continue
+            fecha = datetime.datetime.fromtimestamp(s, datetime.timezone.utc)
+            ref_el = solar.get_altitude(lat, lon, fecha, elevation=elev)
+            ref_az = solar.get_azimuth(lat, lon, fecha, elevation=elev)
+            assert _separacion(az[k, i], el[k, i], ref_az, ref_el) < TOLERANCIA_DEG
+            comparadas += 1
+    assert comparadas > 100
+
+
+def test_escalar_igual_al_vectorizado():
+    az, el = posicion_solar(SEGUNDOS, SITIOS)
+    for k, (lat, lon, elev) in enumerate(SITIOS):
+        for i, s in enumerate(SEGUNDOS):
+            assert posicion_solar_escalar(lat, lon, float(s), elev) == pytest.approx((az[k, i], el[k, i]), abs=1e-9)
+
+
+def test_forma_sitios_por_instantes():
+    az, el = posicion_solar(SEGUNDOS[:5], SITIOS[:2])
+    assert az.shape == el.shape == (2, 5)
+    assert ((0 <= az) & (az < 360)).all()
@@ -0,0 +1,107 @@
+import pytest
+
+from rastreador.telemetria import Decodificador, Telemetria, decodificar_telemetria, paquete_telemetria
+from rastreador.transporte import TransporteSerie
+from rastreador.trama import trama_ascii, trama_binaria
+
+
+class Reloj:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+class PuertoLento:
+    """ write() no bloqueante que solo acepta datos cuando `libre` """
+
+    def __init__(self):
+        self.libre = False
+        self.escrito = []
+
+    def write(self, datos):
+        if not self.libre:
+            raise BlockingIOError
+        self.escrito.append(bytes(datos))
+        return len(datos)
+
+
+def test_paquete_ida_y_vuelta():
+    paquete = paquete_telemetria(4095, 1, 2047, 3000, tramas=300, errores_ascii=2, errores_binario=7)
+    assert len(paquete) == 11 and paquete[0] == 0x5A
+    assert decodificar_telemetria(paquete) == {"pos_az": 4095, "pos_el": 1, "obj_az": 2047, "obj_el": 3000,
+                                              "tramas": 300 % 256, "errores_ascii": 2, "errores_binario": 7}
+    roto = bytearray(paquete)
+    roto[3] ^= 0x10
+    assert decodificar_telemetria(bytes(roto)) is None
+
+
+def test_decodificador_resincroniza():
+    a = paquete_telemetria(10, 20, 30, 40, tramas=1)
+    b = paquete_telemetria(11, 21, 31, 41, tramas=2)
+    roto = bytearray(a)
+    roto[-1] ^= 0xFF
+    d = Decodificador()
+    # Basura, un paquete con CRC malo y uno bueno partido en dos lecturas
+    assert d.alimentar(b"\x00\x5a\x01" + bytes(roto) + b[:4]) == []
+    assert [p["tramas"] for p in d.alimentar(b[4:])] == [2]
+    assert d.descartados > 0
+
+
+def test_latencia_empareja_en_orden():
+    reloj = Reloj()
+    tel = Telemetria(baudios=9600, reloj=reloj)
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=5), reloj.t)
+    tel.registrar_envio(100.0)
+    tel.registrar_envio(100.5)
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=6), 100.1 + tel.duracion_paquete)
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=7), 100.7 + tel.duracion_paquete)
+    assert tel.confirmadas == 2
+    assert list(tel.latencias) == pytest.approx([0.1, 0.2])
+
+
+def test_rechazada_por_el_parser_no_se_empareja():
+    reloj = Reloj()
+    tel = Telemetria(reloj=reloj)
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=5), reloj.t)
+    tel.registrar_envio(100.0, binaria=True)     # El parser binario la rechaza
+    tel.registrar_envio(100.5, binaria=True)
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=6, errores_binario=1), 100.6 + tel.duracion_paquete)
+    assert tel.sin_confirmar == 1
+    assert list(tel.latencias) == pytest.approx([0.1])
+
+
+def test_coalescidas_no_se_anotan():
+    reloj = Reloj()
+    tel = Telemetria(reloj=reloj)
+    puerto = PuertoLento()
+    serie = tel.serie(TransporteSerie(puerto, reloj=reloj))
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=5), reloj.t)
+
+    # El enlace está ocupado: la primera queda en vuelo y de las otras dos sobrevive la última
+    for az in (10, 11, 12):
+        serie.write(trama_ascii(az, 45, "120000", 1))
+        reloj.t += 0.2
+    assert not tel.envios
+    puerto.libre = True
+    reloj.t = 101.0
+    serie.bombear()
+    assert puerto.escrito == [trama_ascii(10, 45, "120000", 1), trama_ascii(12, 45, "120000", 1)]
+    assert serie.coalescidas == 1
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=6), 101.05 + tel.duracion_paquete)
+    tel.procesar(paquete_telemetria(0, 0, 0, 0, tramas=7), 101.08 + tel.duracion_paquete)
+    assert tel.confirmadas == 2 and tel.sin_confirmar == 0
+    assert list(tel.latencias) == pytest.approx([0.05, 0.08])
+
+
+def test_formato_de_la_trama_anotada():
+    reloj = Reloj()
+    tel = Telemetria(reloj=reloj)
+    puerto = PuertoLento()
+    puerto.libre = True
+    serie = tel.serie(TransporteSerie(puerto, reloj=reloj))
+    serie.write(trama_binaria(100, 45, "120000", 1))
+    serie.write(trama_ascii(100, 45, "120000", 1))
+    assert [b for _, b in tel.envios] == [True, False]
+
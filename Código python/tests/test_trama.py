@@ -0,0 +1,50 @@
+from rastreador import trama as tramas
+
+
+def test_crc8_valor_de_control():
+    # CRC-8/SMBUS (poly 0x07, init 0): valor de control estándar de "123456789"
+    assert tramas.crc8(b"123456789") == 0xF4
+    assert tramas.crc8(b"") == 0
+
+
+def test_ascii():
+    assert tramas.trama_ascii(5, 45, "123456", 3) == b"A005E045H123456I3"
+
+
+def test_binaria_ida_y_vuelta():
+    trama = tramas.trama_binaria(270, 90, "235959", 6)
+    assert len(trama) == tramas.LARGO_BINARIA and trama[0] == tramas.SYNC_BINARIA
+    assert tramas.decodificar_binaria(trama) == (270, 90, "235959", 6)
+
+
+def test_precisa_ida_y_vuelta():
+    trama = tramas.trama_precisa(2699, 1800, "000001", 1)
+    assert len(trama) == tramas.LARGO_PRECISA and trama[0] == tramas.SYNC_PRECISA
+    assert tramas.decodificar_precisa(trama) == (2699, 1800, "000001", 1)
+
+
+def test_saturacion_de_campos():
+    assert tramas.decodificar_binaria(tramas.trama_binaria(600, -4, "120000", 12))[:2] == (tramas.AZ_MAX_BIN, 0)
+    assert tramas.decodificar_binaria(tramas.trama_binaria(0, 0, "120000", 12))[3] == tramas.ZONA_MAX
+    assert tramas.decodificar_precisa(tramas.trama_precisa(5000, 10, "120000", 1))[0] == tramas.DECIMAS_MAX
+
+
+def test_crc_rechaza_cualquier_bit_cambiado():
+    trama = tramas.trama_precisa(1234, 567, "101010", 2)
+    for i in range(1, len(trama)):
+        for bit in range(8):
+            rota = bytearray(trama)
+            rota[i] ^= 1 << bit
+            assert tramas.decodificar_precisa(bytes(rota)) is None
+
+
+def test_enviar_trama_escribe_y_devuelve():
+    escrito = []
+
+    class Puerto:
+        def write(self, datos):
+            escrito.append(datos)
+
+    assert tramas.enviar_trama(Puerto(), 100, 20, "120000", 1) == "A100E020H120000I1"
+    binaria = tramas.enviar_trama(Puerto(), 100, 20, "120000", 1, binaria=True)
+    assert escrito == [b"A100E020H120000I1", binaria]
@@ -0,0 +1,25 @@
+import time
+
+from rastreador.transporte import TransporteSerie
+
+
+class PuertoBloqueado:
+    """ write() no bloqueante que nunca acepta datos """
+
+    def __init__(self):
+        self.intentos = 0
+
+    def write(self, datos):
+        self.intentos += 1
+        raise BlockingIOError
+
+
+def test_vaciar_sin_descriptor_no_gira_en_vacio():
+    puerto = PuertoBloqueado()
+    serie = TransporteSerie(puerto)
+    serie.write(b"A120,45,120000,1\n")
+    inicio_cpu = time.process_time()
+    assert not serie.vaciar(timeout=0.2)
+    # Con la pausa son unas decenas de intentos; girando en vacío, cientos de miles
+    assert puerto.intentos < 100
+    assert time.process_time() - inicio_cpu < 0.1
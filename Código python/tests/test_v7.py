@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("pytz")
+pytest.importorskip("serial")
+
+import v7_info_celestial as v7
+from rastreador.metricas import METRICAS_NULAS
+
+
+class PuertoFalso:
+    def __init__(self):
+        self.escrito = []
+
+    def write(self, datos):
+        self.escrito.append(bytes(datos))
+        return len(datos)
+
+
+class TablaFija:
+    def posicion(self, id_loc, ahora):
+        return 120.0, 45.0
+
+
+class MetricasContadas:
+    """ Como METRICAS_NULAS pero corta el bucle tras `ticks` con Ctrl+C """
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+
+    def serie(self, destino):
+        return destino
+
+    def cronometro(self):
+        return METRICAS_NULAS.cronometro()
+
+    def dormir(self, segundos):
+        self.ticks -= 1
+        if self.ticks <= 0:
+            raise KeyboardInterrupt
+
+
+def _responder(monkeypatch, *respuestas):
+    respuestas = list(respuestas)
+
+    def entrada(_):
+        r = respuestas.pop(0)
+        if isinstance(r, BaseException):
+            raise r
+        return r
+    monkeypatch.setattr("builtins.input", entrada)
+
+
+def test_modo_automatico_envia(monkeypatch, capsys):
+    _responder(monkeypatch, "1")
+    puerto = PuertoFalso()
+    v7.modo_automatico(puerto, TablaFija(), MetricasContadas(3))
+    assert puerto.escrito and puerto.escrito[0].startswith(b"A")
+    assert "tramas_enviadas" in capsys.readouterr().out
+
+
+def test_modo_automatico_ctrl_c_en_el_menu(monkeypatch, capsys):
+    _responder(monkeypatch, KeyboardInterrupt())
+    v7.modo_automatico(PuertoFalso(), TablaFija())
+    assert "Transmisión" in capsys.readouterr().out
+
+
+def test_modo_automatico_async_usa_el_transporte(monkeypatch):
+    _responder(monkeypatch, "1")
+    llamadas = []
+
+    def ejecutar(transporte, productor, periodo=1.0):
+        llamadas.append((transporte, productor(1750500000.0)))
+        return {}
+    monkeypatch.setattr(v7, "ejecutar_rastreo", ejecutar)
+    puerto = PuertoFalso()
+    v7.modo_automatico_async(puerto, TablaFija())
+    assert llamadas[0][0] is puerto
+    assert llamadas[0][1].startswith(b"A")
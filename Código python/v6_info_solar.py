@@ -3,7 +3,8 @@ import time
 import datetime
 import sys
 import pytz 
-from pysolar.solar import get_altitude, get_azimuth
+from rastreador.tabla_anual import abrir_o_generar
+from rastreador.simulacion import MotorSimulacion, SalidaSerie, efemeride_sol
 
 # --- CONFIGURACIÓN DE CONEXIÓN ---
 PORT = '/dev/rfcomm0'  # Linux
@@ -52,11 +53,14 @@ def modo_automatico(bt_serial):
         loc = LOCATIONS[opc]
         tz = pytz.timezone(loc["tz"])
         
+        # Trayectoria del año precalculada (tablas/); solo se genera la primera vez
+        tabla = abrir_o_generar(loc["coords"][0], loc["coords"][1])
+
         print(f"\nRastreando en {loc['name']}... (Ctrl+C para salir)")
         while True:
             ahora = datetime.datetime.now(tz)
-            real_az = get_azimuth(loc["coords"][0], loc["coords"][1], ahora)
-            real_el = int(max(0, get_altitude(loc["coords"][0], loc["coords"][1], ahora)))
+            real_az, el = tabla.posicion(ahora.timestamp())
+            real_el = int(max(0, el))
             
             servo_az = map_azimut(real_az)
             hora_str = ahora.strftime("%H%M%S")
@@ -113,28 +117,15 @@ def modo_simulacion(bt_serial):
         print(f"\nIniciando simulación para: {loc['name']} (Fecha: {fecha_hoy})")
         print("Presiona Ctrl+C para detener.")
 
-        while tiempo_simulado <= tiempo_limite:
-            # 1. Calcular posición solar para la hora simulada
-            real_az = get_azimuth(loc["coords"][0], loc["coords"][1], tiempo_simulado)
-            real_el = int(max(0, get_altitude(loc["coords"][0], loc["coords"][1], tiempo_simulado)))
-            
-            # 2. Mapear al servo
-            servo_az = map_azimut(real_az)
-            
-            # 3. Formatear hora simulada para la LCD
-            hora_str = tiempo_simulado.strftime("%H%M%S")
-            
-            # 4. Enviar a FPGA
-            enviar_trama(bt_serial, servo_az, real_el, hora_str, opc)
-            
-            # 5. Mostrar en consola
-            print(f"Simulando: {tiempo_simulado.strftime('%H:%M')} | Az:{int(real_az)}° El:{real_el}°")
-            
-            # 6. Avanzar el tiempo (Saltos de 10 minutos)
-            tiempo_simulado += datetime.timedelta(minutes=10)
-            
-            # 7. Velocidad de la animación (0.15s reales = 10 min simulados)
-            time.sleep(0.15)
+        # 1. Motor de simulación: 10 min simulados cada 0.15 s reales
+        mostrar = lambda hora, az, el, servo_az: print(
+            f"Simulando: {hora.strftime('%H:%M')} | Az:{int(az)}° El:{int(max(0, el))}°")
+        motor = MotorSimulacion(
+            efemeride_sol(loc["coords"][0], loc["coords"][1]),
+            tiempo_simulado, tiempo_limite + datetime.timedelta(seconds=1), 600,
+            velocidad=600 / 0.15,
+            mapeo={"amanecer": AZIMUT_AMANECER, "atardecer": AZIMUT_ATARDECER, "servo_max": SERVO_MAX_DEG})
+        motor.ejecutar(SalidaSerie(bt_serial, opc, tz=tz, mostrar=mostrar, enviar=enviar_trama))
 
         print("\nSimulación finalizada. El sol se ha puesto.")
         time.sleep(2)
@@ -3,13 +3,21 @@ import time
 import datetime
 import sys
 import pytz 
-import math
-import ephem  # <--- NUEVA LIBRERÍA
-from pysolar.solar import get_altitude, get_azimuth
+from rastreador.trayectoria import TablaTrayectoria
+# Posición celeste con observadores y cuerpos reutilizados entre ticks
+from rastreador.celeste import obtener_posicion_cuerpo
+from rastreador.delta import TransmisorDelta
+from rastreador.asincrono import ejecutar_rastreo
+from rastreador.trama import trama_ascii
+from rastreador.transporte import TransporteSerie
+from rastreador.simulacion import MotorSimulacion, SalidaSerie, efemeride_cuerpo
+from rastreador.metricas import METRICAS_NULAS, crear_metricas
 
 # --- CONFIGURACIÓN DE CONEXIÓN ---
 PORT = '/dev/rfcomm0' 
 BAUD_RATE = 9600
+# Tiempos por etapa en http://127.0.0.1:<puerto>/metrics (None = desactivado)
+METRICAS_PUERTO = None
 
 # --- CONFIGURACIÓN DE ZOOM (Rango del Servo) ---
 AZIMUT_AMANECER = 60   
@@ -49,47 +57,56 @@ def enviar_trama(bt_serial, az_servo, el, hora_str, id_loc):
     bt_serial.write(trama.encode('utf-8'))
     return trama
 
-# --- FUNCIÓN PARA CALCULAR POSICIÓN CELESTE ---
-def obtener_posicion_cuerpo(nombre_cuerpo, lat, lon, elev, fecha_hora_utc):
-    obs = ephem.Observer()
-    obs.lat = str(lat) # ephem espera strings para grados
-    obs.lon = str(lon)
-    obs.elevation = elev
-    obs.date = fecha_hora_utc
-    
-    cuerpo = None
-    if nombre_cuerpo == "Luna": cuerpo = ephem.Moon()
-    elif nombre_cuerpo == "Marte": cuerpo = ephem.Mars()
-    elif nombre_cuerpo == "Júpiter": cuerpo = ephem.Jupiter()
-    elif nombre_cuerpo == "Saturno": cuerpo = ephem.Saturn()
-    elif nombre_cuerpo == "Venus": cuerpo = ephem.Venus()
-    
-    cuerpo.compute(obs)
-    
-    # ephem devuelve radianes, convertir a grados
-    az = math.degrees(cuerpo.az)
-    alt = math.degrees(cuerpo.alt)
-    
-    return az, alt
-
 # --- MODOS ANTERIORES (Resumidos para brevedad) ---
-def modo_automatico(bt_serial):
+def modo_automatico(transporte, tabla_sol, metricas=METRICAS_NULAS):
     print("\n--- MODO SOL: TIEMPO REAL ---")
     for k, v in LOCATIONS.items(): print(f"{k}. {v['name']}")
+    # Solo transmitir cuando cambia el objetivo del servo (+ trama clave para el reloj)
+    # Se crea antes del try: Ctrl+C en "Opción:" también pasa por el resumen
+    transmisor = TransmisorDelta()
     try:
         opc = int(input("Opción: "))
         if opc not in LOCATIONS: return
         loc = LOCATIONS[opc]
         tz = pytz.timezone(loc["tz"])
+        serie = metricas.serie(transporte)
         while True:
+            c = metricas.cronometro()
             ahora = datetime.datetime.now(tz)
-            real_az = get_azimuth(loc["coords"][0], loc["coords"][1], ahora)
-            real_el = int(max(0, get_altitude(loc["coords"][0], loc["coords"][1], ahora)))
+            # Consulta a la tabla precalculada (se rehace sola a medianoche local)
+            real_az, el = tabla_sol.posicion(opc, ahora)
+            c.marca("efemerides")
+            real_el = int(max(0, el))
             servo_az = map_azimut(real_az)
-            trama = enviar_trama(bt_serial, servo_az, real_el, ahora.strftime("%H%M%S"), opc)
-            print(f"Sol en {loc['name']}: Az:{int(real_az)}° El:{real_el}°")
-            time.sleep(1) 
-    except KeyboardInterrupt: pass
+            c.marca("mapeo")
+            trama = transmisor.enviar(serie, servo_az, real_el, ahora.strftime("%H%M%S"), opc)
+            c.terminar()
+            print(f"Sol en {loc['name']}: Az:{int(real_az)}° El:{real_el}°" + ("" if trama else " (sin cambios)"))
+            metricas.dormir(1)
+    except KeyboardInterrupt:
+        print(f"\nTransmisión: {transmisor.resumen()}")
+
+def modo_automatico_async(transporte, tabla_sol):
+    print("\n--- MODO SOL: TIEMPO REAL (ASÍNCRONO) ---")
+    for k, v in LOCATIONS.items(): print(f"{k}. {v['name']}")
+    try:
+        opc = int(input("Opción: "))
+        if opc not in LOCATIONS: return
+    except ValueError: return
+    loc = LOCATIONS[opc]
+    tz = pytz.timezone(loc["tz"])
+
+    def productor(instante):
+        ahora = datetime.datetime.fromtimestamp(instante, tz)
+        real_az, el = tabla_sol.posicion(opc, ahora)
+        real_el = int(max(0, el))
+        servo_az = map_azimut(real_az)
+        print(f"Sol en {loc['name']}: Az:{int(real_az)}° El:{real_el}°")
+        return trama_ascii(servo_az, real_el, ahora.strftime("%H%M%S"), opc)
+
+    print("Órdenes: p=pausa, r=seguir, s=estado, q=salir")
+    estadisticas = ejecutar_rastreo(transporte, productor, periodo=1.0)
+    print(f"\nRuntime: {estadisticas}")
 
 def modo_manual(bt_serial):
     # (Igual al anterior)
@@ -111,7 +128,7 @@ def modo_simulacion_sol(bt_serial):
     pass
 
 # --- NUEVO: MODO CELESTE ---
-def modo_celeste(bt_serial):
+def modo_celeste(bt_serial, metricas=METRICAS_NULAS):
     print("\n--- RASTREADOR DE CUERPOS CELESTES ---")
     print("Este modo usa la librería astronómica Ephem.")
     
@@ -144,29 +161,34 @@ def modo_celeste(bt_serial):
     ahora_utc = datetime.datetime.now(datetime.timezone.utc)
     
     if op_mode == '2':
-        # En simulación, usamos una variable que avanza rápido
-        tiempo_simulado = ahora_utc
+        # Próximas 12 h en pasos de 10 min, un paso cada 0.1 s
         print(f"\nSimulando movimiento de {body_name}...")
-    else:
-        print(f"\nRastreando {body_name} en tiempo real...")
-
+        mostrar = lambda hora, az, el, servo_az: print(
+            f"[{body_name}] {hora.strftime('%H:%M')} | Az:{int(az)}° (Servo {servo_az}) | El:{int(el)}°")
+        motor = MotorSimulacion(
+            efemeride_cuerpo(body_name, loc["coords"][0], loc["coords"][1], loc["elevation"]),
+            ahora_utc, ahora_utc + datetime.timedelta(hours=12), 600, velocidad=600 / 0.1)
+        try:
+            motor.ejecutar(SalidaSerie(bt_serial, op_loc, tz=tz, mostrar=mostrar, enviar=enviar_trama))
+        except KeyboardInterrupt:
+            pass
+        print("Volviendo al menú...")
+        return
+
+    print(f"\nRastreando {body_name} en tiempo real...")
+    transmisor = TransmisorDelta()
+    serie = metricas.serie(bt_serial)
     try:
         while True:
-            # Definir el tiempo a calcular
-            if op_mode == '1': # Real
-                calculo_time = datetime.datetime.now(datetime.timezone.utc)
-                hora_display = datetime.datetime.now(tz)
-                delay = 1
-            else: # Simulación
-                calculo_time = tiempo_simulado
-                hora_display = tiempo_simulado.astimezone(tz)
-                delay = 0.1
-                tiempo_simulado += datetime.timedelta(minutes=10) # Avanzar 10 min por ciclo
+            c = metricas.cronometro()
+            calculo_time = datetime.datetime.now(datetime.timezone.utc)
+            hora_display = datetime.datetime.now(tz)
 
             # CÁLCULO ASTRONÓMICO
             az_real, el_real = obtener_posicion_cuerpo(
                 body_name, loc["coords"][0], loc["coords"][1], loc["elevation"], calculo_time
             )
+            c.marca("efemerides")
 
             # Mapeo a Servo
             # NOTA: Los planetas pueden estar en 360 grados, map_azimut maneja el amanecer/atardecer solar
@@ -174,25 +196,34 @@ def modo_celeste(bt_serial):
             # Usaremos map_azimut para mantener la lógica de "ventana de visión" de tu ventana física.
             servo_az = map_azimut(az_real)
             servo_el = int(max(0, el_real)) # Si está bajo el horizonte, poner 0
+            c.marca("mapeo")
 
             # Enviar
             hora_str = hora_display.strftime("%H%M%S")
             # Usamos ID 7 para que salga "MANUAL" o podríamos reusar el ID de ciudad
             # Reusamos ID de ciudad para ver el nombre de la zona
-            enviar_trama(bt_serial, servo_az, servo_el, hora_str, op_loc)
+            transmisor.enviar(serie, servo_az, servo_el, hora_str, op_loc)
+            c.terminar()
 
             print(f"[{body_name}] {hora_display.strftime('%H:%M')} | Az:{int(az_real)}° (Servo {servo_az}) | El:{int(el_real)}°")
             
-            time.sleep(delay)
+            metricas.dormir(1)
 
     except KeyboardInterrupt:
-        print("\nVolviendo al menú...")
+        print(f"\nTransmisión: {transmisor.resumen()}")
+        print("Volviendo al menú...")
 
 def main():
     try:
         print(f"Conectando a {PORT}...")
         bt_serial = serial.Serial(PORT, BAUD_RATE, timeout=1)
+        # Escrituras no bloqueantes: un enlace lento no frena el cálculo
+        transporte = TransporteSerie(bt_serial)
         print("Conectado.\n")
+
+        # Trayectoria solar del día para todas las ubicaciones
+        tabla_sol = TablaTrayectoria(LOCATIONS)
+        metricas = crear_metricas(METRICAS_PUERTO)
         
         while True:
             print("\n=== SISTEMA DE RASTREO UNIVERSAL V6 ===")
@@ -200,16 +231,23 @@ def main():
             print("2. Control Manual")
             print("3. Simulación Solar (6AM-6PM)")
             print("4. Rastrear CUERPO CELESTE (Luna/Planetas)")
+            print("5. Rastrear el SOL (Asíncrono, sin deriva)")
             print("0. Salir")
             op = input(">> ")
-            if op == '1': modo_automatico(bt_serial)
-            elif op == '2': modo_manual(bt_serial)
+            if op == '1': modo_automatico(transporte, tabla_sol, metricas)
+            elif op == '2': modo_manual(transporte)
             # elif op == '3': modo_simulacion_sol(bt_serial) # (Descomenta si pegaste la funcion anterior)
-            elif op == '4': modo_celeste(bt_serial)
+            elif op == '4': modo_celeste(transporte, metricas)
+            elif op == '5': modo_automatico_async(transporte, tabla_sol)
             elif op == '0': break
                 
     except Exception as e: print(f"Error: {e}")
     finally:
+        if 'transporte' in locals():
+            transporte.vaciar()
+            print(f"Transporte: {transporte.metricas()}")
+        if 'metricas' in locals() and metricas.resumen():
+            print(f"Etapas: {metricas.resumen()}")
         if 'bt_serial' in locals() and bt_serial.is_open: bt_serial.close()
 
 if __name__ == "__main__":
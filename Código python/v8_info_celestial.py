@@ -3,13 +3,14 @@ import time
 import datetime
 import sys
 import pytz 
-import math
-import ephem 
-from pysolar.solar import get_altitude, get_azimuth
+from rastreador import modos, trama
+from rastreador.simulacion import MotorSimulacion, SalidaSerie, efemeride_cuerpo
 
 # --- CONFIGURACIÓN ---
 PORT = '/dev/rfcomm0' 
 BAUD_RATE = 9600
+# Trama binaria compacta de 7 bytes (requiere bt_binary_parser en la FPGA)
+PROTOCOLO_BINARIO = False
 
 # Rango del servo
 AZIMUT_AMANECER = 60   
@@ -36,37 +37,31 @@ def map_azimut(real_az):
     return int((recorrido * SERVO_MAX_DEG) / span)
 
 def enviar_trama(bt_serial, az, el, hora_str, id_loc):
-    trama = f"A{az:03d}E{el:03d}H{hora_str}I{id_loc}"
-    bt_serial.write(trama.encode('utf-8'))
-    return trama
+    return trama.enviar_trama(bt_serial, az, el, hora_str, id_loc, binaria=PROTOCOLO_BINARIO)
 
-def obtener_posicion_cuerpo(nombre, lat, lon, elev, fecha_utc):
-    obs = ephem.Observer()
-    obs.lat, obs.lon, obs.elevation = str(lat), str(lon), elev
-    obs.date = fecha_utc
-    
-    objs = {"Luna":ephem.Moon(), "Marte":ephem.Mars(), "Júpiter":ephem.Jupiter(), 
-            "Saturno":ephem.Saturn(), "Venus":ephem.Venus()}
-    cuerpo = objs[nombre]
-    cuerpo.compute(obs)
-    return math.degrees(cuerpo.az), math.degrees(cuerpo.alt)
-
-# --- MODOS EXISTENTES ---
+# --- MODOS EXISTENTES (implementación única en rastreador.modos) ---
 def modo_automatico(bt_serial):
     print("\n--- MODO SOL: TIEMPO REAL ---")
-    # (Código igual al anterior...)
-    # Para ahorrar espacio aquí, asumo que copias la lógica del script anterior
-    # o usas este esqueleto para rellenarlo. Si necesitas el código completo repítelo.
-    # Pero para la demo de Marte, mira la función nueva abajo:
-    pass 
+    id_loc = modos.pedir_ubicacion(LOCATIONS)
+    if id_loc is None: return
+    print(f"\nTransmisión: {modos.rastrear_sol(bt_serial, id_loc, LOCATIONS, PROTOCOLO_BINARIO)}")
 
 def modo_manual(bt_serial):
-    # (Código igual al anterior...)
-    pass
+    modos.modo_manual(bt_serial, PROTOCOLO_BINARIO)
 
 def modo_celeste(bt_serial):
-    # (Código igual al anterior...)
-    pass
+    print("\n--- RASTREADOR DE CUERPOS CELESTES ---")
+    id_loc = modos.pedir_ubicacion(LOCATIONS)
+    if id_loc is None: return
+    cuerpo = modos.pedir_cuerpo(CELESTIAL_BODIES)
+    if cuerpo is None: return
+    print(f"\nTransmisión: {modos.rastrear_cuerpo(bt_serial, cuerpo, id_loc, LOCATIONS, PROTOCOLO_BINARIO)}")
+
+def modo_simulacion_dia(bt_serial):
+    print("\n--- MODO SIMULACIÓN (6AM - 6PM) ---")
+    id_loc = modos.pedir_ubicacion(LOCATIONS)
+    if id_loc is None: return
+    modos.simular_dia(bt_serial, id_loc, ubicaciones=LOCATIONS, binaria=PROTOCOLO_BINARIO)
 
 # --- NUEVO: MODO RETRÓGRADO (EL BUCLE DE MARTE) ---
 def modo_retrogrado_marte(bt_serial):
@@ -81,43 +76,21 @@ def modo_retrogrado_marte(bt_serial):
     start_date = datetime.datetime(2024, 10, 1, 0, 0, 0) # 1 Oct 2024
     end_date = datetime.datetime(2025, 5, 1, 0, 0, 0)    # 1 May 2025
     
-    current_date = start_date
-    
     print("\nIniciando Timelapse Astronómico (1 día cada 0.1s)...")
     print("Presiona Ctrl+C para detener.\n")
-    
+
+    # Usamos UTC para simplificar la astronomía pura
+    # Nota: Para ver el efecto completo, a veces es mejor mapear 360 directo
+    # Pero usaremos tu map_azimut para mantener coherencia con el servo
+    mostrar = lambda fecha, az, el, servo_az: print(
+        f"Fecha: {fecha.strftime('%Y-%m-%d')} | Az:{int(az)}° Servo:{servo_az} | El:{int(el)}°")
+    motor = MotorSimulacion(efemeride_cuerpo("Marte", lat, lon, elev), start_date, end_date, 86400,
+                            velocidad=86400 / 0.1,
+                            mapeo={"amanecer": AZIMUT_AMANECER, "atardecer": AZIMUT_ATARDECER,
+                                   "servo_max": SERVO_MAX_DEG})
     try:
-        while current_date < end_date:
-            # Calcular posición a la medianoche UTC
-            # Usamos UTC para simplificar la astronomía pura
-            az_real, el_real = obtener_posicion_cuerpo("Marte", lat, lon, elev, current_date)
-            
-            # Mapeo
-            # Nota: Para ver el efecto completo, a veces es mejor mapear 360 directo
-            # Pero usaremos tu map_azimut para mantener coherencia con el servo
-            servo_az = map_azimut(az_real)
-            
-            # Si está bajo el horizonte, lo mostramos en 0 elevación pero mantenemos azimut
-            servo_el = int(max(0, el_real))
-            
-            # Enviar a FPGA
-            # Usamos ID 7 ("MANUAL") o 2 ("Madrid") para visualización
-            fecha_str = current_date.strftime("%d%m%y") # Usamos fecha en vez de hora
-            enviar_trama(bt_serial, servo_az, servo_el, current_date.strftime("%H%M%S"), 2)
-            
-            # Feedback visual con flechas para indicar dirección
-            direccion = "-->"
-            # Detectar retrógrado simple (si el azimut baja en vez de subir)
-            # (Esto es simplificado, depende de la posición en el cielo)
-            
-            print(f"Fecha: {current_date.strftime('%Y-%m-%d')} | Az:{int(az_real)}° Servo:{servo_az} | El:{int(el_real)}°")
-            
-            # Avanzar 1 día
-            current_date += datetime.timedelta(days=1)
-            
-            # Velocidad de simulación
-            time.sleep(0.1)
-            
+        # Usamos ID 2 ("Madrid") para visualización
+        motor.ejecutar(SalidaSerie(bt_serial, 2, mostrar=mostrar, enviar=enviar_trama))
     except KeyboardInterrupt:
         print("\nSimulación finalizada.")
 
@@ -137,10 +110,10 @@ def main():
             print("0. Salir")
             
             op = input(">> ")
-            if op == '1': modo_automatico(bt_serial) # (Asegurate de copiar la logica de tu script anterior)
-            elif op == '2': modo_manual(bt_serial)   # (Igual)
-            elif op == '3': modo_celeste(bt_serial)  # (Igual)
-            # elif op == '4': modo_simulacion_dia(bt_serial) # (Tu funcion anterior)
+            if op == '1': modo_automatico(bt_serial)
+            elif op == '2': modo_manual(bt_serial)
+            elif op == '3': modo_celeste(bt_serial)
+            elif op == '4': modo_simulacion_dia(bt_serial)
             elif op == '5': modo_retrogrado_marte(bt_serial)
             elif op == '0': break
             
@@ -111,4 +111,98 @@ module uart_rx #(
         end
     end
 
-endmodule
\ No newline at end of file
+endmodule
+
+// ==========================================================================
+// Transmisor UART 8N1 (telemetría de vuelta al HC-05, ver FINAL-telemetry.v)
+// ==========================================================================
+module uart_tx #(
+    parameter CLK_FREQ = 50000000,
+    parameter BAUD_RATE = 9600
+)(
+    input wire clk,
+    input wire rst_n,
+    input wire tx_start,           // Pulso: enviar tx_byte (se ignora si tx_busy)
+    input wire [7:0] tx_byte,
+    output reg tx_serial,          // Pin conectado al RX del HC-05
+    output reg tx_busy,
+    output reg tx_done             // Pulso de un ciclo al terminar el stop bit
+);
+
+    localparam CLKS_PER_BIT = CLK_FREQ / BAUD_RATE;
+
+    localparam IDLE         = 2'b00;
+    localparam START_BIT    = 2'b01;
+    localparam DATA_BITS    = 2'b10;
+    localparam STOP_BIT     = 2'b11;
+
+    reg [1:0] state;
+    reg [15:0] clk_count;
+    reg [2:0] bit_index;
+    reg [7:0] data;
+
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            state <= IDLE;
+            clk_count <= 0;
+            bit_index <= 0;
+            data <= 0;
+            tx_serial <= 1'b1;     // Línea en reposo = 1
+            tx_busy <= 0;
+            tx_done <= 0;
+        end else begin
+            tx_done <= 0;
+            case (state)
+                IDLE: begin
+                    tx_serial <= 1'b1;
+                    clk_count <= 0;
+                    bit_index <= 0;
+                    if (tx_start) begin
+                        data <= tx_byte;
+                        tx_busy <= 1'b1;
+                        state <= START_BIT;
+                    end
+                end
+
+                START_BIT: begin
+                    tx_serial <= 1'b0;
+                    if (clk_count == CLKS_PER_BIT - 1) begin
+                        clk_count <= 0;
+                        state <= DATA_BITS;
+                    end else begin
+                        clk_count <= clk_count + 1;
+                    end
+                end
+
+                // LSB primero, igual que uart_rx
+                DATA_BITS: begin
+                    tx_serial <= data[bit_index];
+                    if (clk_count == CLKS_PER_BIT - 1) begin
+                        clk_count <= 0;
+                        if (bit_index < 7) begin
+                            bit_index <= bit_index + 1;
+                        end else begin
+                            bit_index <= 0;
+                            state <= STOP_BIT;
+                        end
+                    end else begin
+                        clk_count <= clk_count + 1;
+                    end
+                end
+
+                STOP_BIT: begin
+                    tx_serial <= 1'b1;
+                    if (clk_count == CLKS_PER_BIT - 1) begin
+                        clk_count <= 0;
+                        tx_busy <= 0;
+                        tx_done <= 1'b1;
+                        state <= IDLE;
+                    end else begin
+                        clk_count <= clk_count + 1;
+                    end
+                end
+            endcase
+        end
+    end
+
+endmodule
@@ -12,7 +12,10 @@ module bt_data_parser_v2 (
     output reg [7:0] time_h1, output reg [7:0] time_h0,
     output reg [7:0] time_m1, output reg [7:0] time_m0,
     output reg [7:0] time_s1, output reg [7:0] time_s0,
-    output reg [7:0] zone_id 
+    output reg [7:0] zone_id,
+
+    output reg frame_ok,         // Pulso de 1 ciclo al completar una trama
+    output reg [7:0] frame_errors // Tramas abandonadas (separador E/H/I que no llegó)
 );
 
     // Estados
@@ -34,12 +37,16 @@ module bt_data_parser_v2 (
         az_h="0"; az_t="0"; az_u="0"; el_t="0"; el_u="0";
         time_h1="0"; time_h0="0"; time_m1="0"; time_m0="0"; time_s1="0"; time_s0="0";
         zone_id="1";
+        frame_errors = 0;
     end
 
     always @(posedge clk or negedge rst_n) begin
         if (!rst_n) begin
             state <= IDLE;
+            frame_ok <= 0;
+            frame_errors <= 0;
         end else begin
+            frame_ok <= 0;
             // Lógica de transición de estados
             if (state == UPDATE) begin
                 // Actualizar salidas y volver a IDLE inmediatamente
@@ -49,6 +56,7 @@ module bt_data_parser_v2 (
                 time_m1 <= b_tm1; time_m0 <= b_tm0;
                 time_s1 <= b_ts1; time_s0 <= b_ts0;
                 zone_id <= b_zid;
+                frame_ok <= 1;
                 state <= IDLE;
             end 
             else if (rx_done_tick) begin
@@ -60,13 +68,15 @@ module bt_data_parser_v2 (
                     GET_AZ_2: begin b_at <= rx_data; state <= GET_AZ_3; end
                     GET_AZ_3: begin b_au <= rx_data; state <= WAIT_E; end
                     
-                    WAIT_E: if (rx_data == "E") state <= GET_EL_1; else state <= IDLE;
+                    WAIT_E: if (rx_data == "E") state <= GET_EL_1;
+                            else begin frame_errors <= frame_errors + 1; state <= IDLE; end
                     
                     GET_EL_1: state <= GET_EL_2; // Ignoramos centena elevación
                     GET_EL_2: begin b_et <= rx_data; state <= GET_EL_3; end
                     GET_EL_3: begin b_eu <= rx_data; state <= WAIT_H; end
                     
-                    WAIT_H: if (rx_data == "H") state <= GET_H1; else state <= IDLE;
+                    WAIT_H: if (rx_data == "H") state <= GET_H1;
+                            else begin frame_errors <= frame_errors + 1; state <= IDLE; end
                     
                     GET_H1: begin b_th1 <= rx_data; state <= GET_H0; end
                     GET_H0: begin b_th0 <= rx_data; state <= GET_M1; end
@@ -75,7 +85,8 @@ module bt_data_parser_v2 (
                     GET_S1: begin b_ts1 <= rx_data; state <= GET_S0; end
                     GET_S0: begin b_ts0 <= rx_data; state <= WAIT_I; end
 
-                    WAIT_I: if (rx_data == "I") state <= GET_ID; else state <= IDLE;
+                    WAIT_I: if (rx_data == "I") state <= GET_ID;
+                            else begin frame_errors <= frame_errors + 1; state <= IDLE; end
                     GET_ID: begin b_zid <= rx_data; state <= UPDATE; end
                     
                     default: state <= IDLE;
@@ -83,4 +94,149 @@ module bt_data_parser_v2 (
             end
         end
     end
-endmodule
\ No newline at end of file
+endmodule
+
+
+// ==========================================================================
+// Parser de las tramas binarias (ver rastreador/trama.py):
+//   compacta (7 bytes):
+//     0xA5 | az[8:0] el[6:0] | hh[4:0] mm[5:0] ss[5:0] zona[3:0] 000 | CRC-8
+//   precisa (8 bytes), ángulos en décimas de grado:
+//     0xA6 | az_dd[11:0] el_dd[11:0] | hh mm ss zona 000 | CRC-8
+// La zona va a la LCD como un dígito: 10-15 se rechazan como fuera de rango.
+// Entrega las mismas salidas ASCII que bt_data_parser_v2 para que la LCD no
+// cambie (grados enteros), más az_dd/el_dd en décimas para los servos.
+// ==========================================================================
+module bt_binary_parser (
+    input wire clk,
+    input wire rst_n,
+    input wire rx_done_tick,
+    input wire [7:0] rx_data,
+
+    // Salidas Pantalla 1 (Azimut/Elev)
+    output reg [7:0] az_h, output reg [7:0] az_t, output reg [7:0] az_u,
+    output reg [7:0] el_t, output reg [7:0] el_u,
+
+    // Salidas Pantalla 2 (Hora y Zona)
+    output reg [7:0] time_h1, output reg [7:0] time_h0,
+    output reg [7:0] time_m1, output reg [7:0] time_m0,
+    output reg [7:0] time_s1, output reg [7:0] time_s0,
+    output reg [7:0] zone_id,
+
+    // Ángulos en décimas de grado (la trama compacta llega como grados * 10)
+    output reg [11:0] az_dd, output reg [11:0] el_dd,
+
+    output reg frame_ok,         // Pulso de 1 ciclo con cada trama válida
+    output reg [7:0] crc_errors  // Tramas descartadas (CRC o campos fuera de rango)
+);
+
+    localparam SYNC = 8'hA5;
+    localparam SYNC_PRECISA = 8'hA6;
+
+    // Estados
+    localparam B_IDLE = 0, B_POS_X = 1, B_POS_H = 2, B_POS_L = 3;
+    localparam B_T2 = 4, B_T1 = 5, B_T0 = 6, B_CRC = 7, B_UPDATE = 8;
+
+    reg [3:0] state;
+    reg [7:0] crc;
+    reg precisa;
+
+    // Buffers temporales
+    reg [23:0] b_pos;
+    reg [23:0] b_time;
+
+    // Campos de la trama compacta
+    wire [8:0] f_az   = b_pos[15:7];
+    wire [6:0] f_el   = b_pos[6:0];
+    // Campos de la trama precisa
+    wire [11:0] p_az  = b_pos[23:12];
+    wire [11:0] p_el  = b_pos[11:0];
+    wire [4:0] f_hh   = b_time[23:19];
+    wire [5:0] f_mm   = b_time[18:13];
+    wire [5:0] f_ss   = b_time[12:7];
+    wire [3:0] f_zona = b_time[6:3];
+
+    // Ángulos comunes a ambos formatos
+    wire [12:0] v_az_dd = precisa ? p_az : f_az * 10;   // f_az llega hasta 511: 13 bits
+    wire [11:0] v_el_dd = precisa ? p_el : f_el * 10;
+    wire [8:0]  v_az    = v_az_dd / 10;      // Grados enteros para la LCD
+    wire [7:0]  v_el    = v_el_dd / 10;
+
+    // CRC-8, polinomio x^8 + x^2 + x + 1 (0x07), un byte por llamada
+    function [7:0] crc8_byte;
+        input [7:0] crc_in;
+        input [7:0] data;
+        integer i;
+        reg [7:0] c;
+        begin
+            c = crc_in ^ data;
+            for (i = 0; i < 8; i = i + 1)
+                c = c[7] ? ((c << 1) ^ 8'h07) : (c << 1);
+            crc8_byte = c;
+        end
+    endfunction
+
+    initial begin
+        state = B_IDLE;
+        az_h="0"; az_t="0"; az_u="0"; el_t="0"; el_u="0";
+        time_h1="0"; time_h0="0"; time_m1="0"; time_m0="0"; time_s1="0"; time_s0="0";
+        zone_id="1";
+        az_dd = 0; el_dd = 0;
+        crc_errors = 0;
+    end
+
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            state <= B_IDLE;
+            frame_ok <= 0;
+            crc_errors <= 0;
+        end else begin
+            frame_ok <= 0;
+            if (state == B_UPDATE) begin
+                if (v_az_dd <= 2700 && v_el_dd <= 1800 && f_hh < 24 && f_mm < 60 && f_ss < 60 && f_zona <= 9) begin
+                    // Binario -> dígitos ASCII (divisiones por constante)
+                    az_h <= "0" + v_az / 100;
+                    az_t <= "0" + (v_az / 10) % 10;
+                    az_u <= "0" + v_az % 10;
+                    el_t <= "0" + (v_el / 10) % 10;
+                    el_u <= "0" + v_el % 10;
+                    time_h1 <= "0" + f_hh / 10; time_h0 <= "0" + f_hh % 10;
+                    time_m1 <= "0" + f_mm / 10; time_m0 <= "0" + f_mm % 10;
+                    time_s1 <= "0" + f_ss / 10; time_s0 <= "0" + f_ss % 10;
+                    zone_id <= "0" + f_zona;
+                    az_dd <= v_az_dd[11:0];
+                    el_dd <= v_el_dd;
+                    frame_ok <= 1;
+                end else begin
+                    crc_errors <= crc_errors + 1;
+                end
+                state <= B_IDLE;
+            end
+            else if (rx_done_tick) begin
+                case (state)
+                    B_IDLE: begin
+                        crc <= 8'd0;
+                        b_pos <= 24'd0;
+                        if (rx_data == SYNC) begin precisa <= 1'b0; state <= B_POS_H; end
+                        else if (rx_data == SYNC_PRECISA) begin precisa <= 1'b1; state <= B_POS_X; end
+                    end
+
+                    B_POS_X: begin b_pos[23:16]  <= rx_data; crc <= crc8_byte(crc, rx_data); state <= B_POS_H; end
+                    B_POS_H: begin b_pos[15:8]   <= rx_data; crc <= crc8_byte(crc, rx_data); state <= B_POS_L; end
+                    B_POS_L: begin b_pos[7:0]    <= rx_data; crc <= crc8_byte(crc, rx_data); state <= B_T2; end
+                    B_T2:    begin b_time[23:16] <= rx_data; crc <= crc8_byte(crc, rx_data); state <= B_T1; end
+                    B_T1:    begin b_time[15:8]  <= rx_data; crc <= crc8_byte(crc, rx_data); state <= B_T0; end
+                    B_T0:    begin b_time[7:0]   <= rx_data; crc <= crc8_byte(crc, rx_data); state <= B_CRC; end
+
+                    // Trama corrupta: se descarta completa y se espera el siguiente SYNC
+                    B_CRC: begin
+                        if (rx_data == crc) state <= B_UPDATE;
+                        else begin crc_errors <= crc_errors + 1; state <= B_IDLE; end
+                    end
+
+                    default: state <= B_IDLE;
+                endcase
+            end
+        end
+    end
+endmodule
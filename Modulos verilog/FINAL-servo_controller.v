@@ -3,12 +3,17 @@ module servo_pwm_smooth #(
     parameter integer PERIOD_MS          = 20,         
     parameter integer MIN_PULSE_US       = 600,        
     parameter integer MAX_PULSE_US       = 2400,
-    parameter integer SMOOTH_DELAY_MS    = 8 // Milisegundos entre cada paso de movimiento (Mayor = Más lento/Suave)
+    parameter integer SMOOTH_DELAY_MS    = 8, // Milisegundos entre cada paso de movimiento (Mayor = Más lento/Suave)
+    // Pasos finos: con POS_BITS=12 el paso es 16 veces más chico, así que el retardo
+    // por paso se da en microsegundos para mantener la misma velocidad angular
+    parameter integer SMOOTH_DELAY_US    = SMOOTH_DELAY_MS * 1000,
+    parameter integer POS_BITS           = 8  // Resolución de target_pos (8 = 0..255, 12 = 0..4095)
 )(
     input  wire clk,
     input  wire reset,
-    input  wire [7:0] target_pos,   // Posición a la que QUEREMOS ir (0..255)
-    output reg pwm_out
+    input  wire [POS_BITS-1:0] target_pos,   // Posición a la que QUEREMOS ir (0..POS_MAX)
+    output reg pwm_out,
+    output wire [POS_BITS-1:0] current_pos_out  // Posición de la rampa (telemetría)
 );
 
     // --- CÁLCULOS DE PWM ---
@@ -18,17 +23,19 @@ module servo_pwm_smooth #(
 
     // --- CÁLCULOS DE SUAVIZADO ---
     // Cuantos ciclos de reloj esperar antes de mover el servo un pasito más
-    localparam integer STEP_DELAY_CYCLES = (CLK_FREQ_HZ / 1000) * SMOOTH_DELAY_MS;
+    localparam integer STEP_DELAY_CYCLES = (CLK_FREQ_HZ / 1_000_000) * SMOOTH_DELAY_US;
+    localparam integer POS_MAX = (1 << POS_BITS) - 1;
+    localparam integer POS_CENTRO = POS_MAX / 2;
 
     reg [31:0] pwm_counter = 0;
     reg [31:0] move_timer = 0;
     
-    // "internal_pos" es donde está el servo REALMENTE ahora mismo.
-    // Usamos un registro ampliado para precisión, pero aquí simple 8 bits basta.
-    reg [7:0] current_pos = 0; 
+    // "current_pos" es donde está el servo REALMENTE ahora mismo.
+    reg [POS_BITS-1:0] current_pos = 0; 
+    assign current_pos_out = current_pos;
 
     // Cálculo del ancho de pulso actual basado en la posición suavizada
-    // pulse = MIN + current_pos * (MAX-MIN)/255
+    // pulse = MIN + current_pos * (MAX-MIN)/POS_MAX  (span * 4095 cabe en 32 bits)
     wire [31:0] span = MAX_PULSE_CYCLES - MIN_PULSE_CYCLES;
     reg [31:0] active_pulse_width;
 
@@ -37,8 +44,8 @@ module servo_pwm_smooth #(
             pwm_counter <= 0;
             pwm_out <= 1'b0;
             move_timer <= 0;
-            current_pos <= 127; // Arrancar en el centro para evitar saltos bruscos al inicio
-            active_pulse_width <= MIN_PULSE_CYCLES + (span * 127 / 255);
+            current_pos <= POS_CENTRO; // Arrancar en el centro para evitar saltos bruscos al inicio
+            active_pulse_width <= MIN_PULSE_CYCLES + (span * POS_CENTRO / POS_MAX);
         end else begin
             
             // --- 1. LÓGICA DE MOVIMIENTO SUAVE (RAMPA) ---
@@ -57,7 +64,7 @@ module servo_pwm_smooth #(
                 // Si current_pos == target_pos, no hacemos nada (ya llegamos)
                 
                 // Actualizamos el ancho del pulso solo cuando cambia la posición
-                active_pulse_width <= MIN_PULSE_CYCLES + (span * current_pos / 255);
+                active_pulse_width <= MIN_PULSE_CYCLES + (span * current_pos / POS_MAX);
             end
 
 
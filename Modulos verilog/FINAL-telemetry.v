@@ -0,0 +1,120 @@
+// ==========================================================================
+// Telemetría FPGA -> Python por el TX del HC-05 (ver rastreador/telemetria.py)
+//
+// Paquete de 11 bytes, cada PERIOD_MS y además justo después de cada trama
+// aceptada (así Python mide la latencia real hasta el parser):
+//     byte 0     SYNC = 0x5A
+//     bytes 1-3  pos_az[11:0] | pos_el[11:0]   current_pos de las rampas
+//     bytes 4-6  obj_az[11:0] | obj_el[11:0]   target_pos de los servos
+//     byte 7     tramas aceptadas (módulo 256, ASCII + binarias)
+//     byte 8     errores del parser ASCII
+//     byte 9     errores del parser binario (CRC o campos fuera de rango)
+//     byte 10    CRC-8 (polinomio 0x07, valor inicial 0x00) de los bytes 1-9
+// A 9600 baudios son 11.5 ms por paquete: ~12% del canal de vuelta a 10 Hz.
+// ==========================================================================
+module telemetry_tx #(
+    parameter integer CLK_FREQ  = 50000000,
+    parameter integer BAUD_RATE = 9600,
+    parameter integer PERIOD_MS = 100,
+    parameter integer POS_BITS  = 12
+)(
+    input wire clk,
+    input wire rst_n,
+    input wire frame_ok,                 // Pulso de cualquiera de los parsers
+    input wire [POS_BITS-1:0] pos_az, input wire [POS_BITS-1:0] pos_el,
+    input wire [POS_BITS-1:0] obj_az, input wire [POS_BITS-1:0] obj_el,
+    input wire [7:0] ascii_errors,
+    input wire [7:0] bin_errors,
+    output wire tx_serial
+);
+
+    localparam SYNC = 8'h5A;
+    localparam integer PERIOD_CYCLES = (CLK_FREQ / 1000) * PERIOD_MS;
+    localparam integer BYTES_PAQUETE = 11;
+
+    reg tx_start;
+    reg [7:0] tx_byte;
+    wire tx_busy, tx_done;
+
+    uart_tx #(.CLK_FREQ(CLK_FREQ), .BAUD_RATE(BAUD_RATE)) uart (
+        .clk(clk), .rst_n(rst_n),
+        .tx_start(tx_start), .tx_byte(tx_byte),
+        .tx_serial(tx_serial), .tx_busy(tx_busy), .tx_done(tx_done)
+    );
+
+    // Campos de 12 bits aunque POS_BITS sea menor
+    wire [11:0] p_az = pos_az, p_el = pos_el, o_az = obj_az, o_el = obj_el;
+
+    // CRC-8, polinomio x^8 + x^2 + x + 1 (0x07), igual que bt_binary_parser
+    function [7:0] crc8_byte;
+        input [7:0] crc_in;
+        input [7:0] data;
+        integer i;
+        reg [7:0] c;
+        begin
+            c = crc_in ^ data;
+            for (i = 0; i < 8; i = i + 1)
+                c = c[7] ? ((c << 1) ^ 8'h07) : (c << 1);
+            crc8_byte = c;
+        end
+    endfunction
+
+    reg [31:0] timer;
+    reg [7:0] frames;
+    reg pendiente;               // Hay que mandar un paquete en cuanto el TX quede libre
+    reg enviando;
+    reg [3:0] index;             // Próximo byte del paquete
+    reg [71:0] buffer;           // Bytes 1-9, capturados al empezar el paquete
+    reg [7:0] crc;
+
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            timer <= 0;
+            frames <= 0;
+            pendiente <= 0;
+            enviando <= 0;
+            index <= 0;
+            buffer <= 0;
+            crc <= 0;
+            tx_start <= 0;
+            tx_byte <= 0;
+        end else begin
+            tx_start <= 0;
+            if (frame_ok) frames <= frames + 1;
+
+            if (timer >= PERIOD_CYCLES - 1) timer <= 0;
+            else timer <= timer + 1;
+
+            if (!enviando) begin
+                if (pendiente) begin
+                    // Un ciclo después de frame_ok: objetivo y contador ya reflejan la trama
+                    buffer <= {p_az, p_el, o_az, o_el, frames, ascii_errors, bin_errors};
+                    crc <= 0;
+                    tx_byte <= SYNC;
+                    tx_start <= 1'b1;
+                    index <= 1;
+                    enviando <= 1'b1;
+                    pendiente <= 0;
+                end
+            end else if (tx_done) begin
+                if (index == BYTES_PAQUETE) begin
+                    enviando <= 0;
+                end else begin
+                    if (index == BYTES_PAQUETE - 1) begin
+                        tx_byte <= crc;
+                    end else begin
+                        tx_byte <= buffer[71:64];
+                        crc <= crc8_byte(crc, buffer[71:64]);
+                        buffer <= buffer << 8;
+                    end
+                    tx_start <= 1'b1;
+                    index <= index + 1;
+                end
+            end
+
+            // Al final: gana sobre el "pendiente <= 0" de arriba
+            if (frame_ok || timer >= PERIOD_CYCLES - 1) pendiente <= 1'b1;
+        end
+    end
+
+endmodule
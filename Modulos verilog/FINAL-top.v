@@ -2,6 +2,7 @@ module SolarTracker_Top (
     input wire clk,             // 50 MHz
     input wire rst_n,           // Reset (Activo bajo)
     input wire uart_rxd,        // RX Bluetooth
+    output wire uart_txd,       // TX Bluetooth (telemetría)
     
     output wire lcd_rs, lcd_rw, lcd_en,
     output wire [7:0] lcd_data,
@@ -28,18 +29,61 @@ module SolarTracker_Top (
     );
     assign led_rx = rx_ready; 
 
-    // 2. Parser V2
+    // 2. Parsers: ASCII V2 y binario compacto en paralelo
+    wire [7:0] a_az_h, a_az_t, a_az_u, a_el_t, a_el_u;
+    wire [7:0] a_th1, a_th0, a_tm1, a_tm0, a_ts1, a_ts0, a_zone;
+    wire [7:0] b_az_h, b_az_t, b_az_u, b_el_t, b_el_u;
+    wire [7:0] b_th1, b_th0, b_tm1, b_tm0, b_ts1, b_ts0, b_zone;
+    wire ascii_ok, bin_ok;
+    wire [7:0] ascii_errors, bin_crc_errors;
+    wire [11:0] b_az_dd, b_el_dd;
+
     bt_data_parser_v2 parser (
         .clk(clk), .rst_n(rst_n),
         .rx_done_tick(rx_ready), .rx_data(rx_byte),
-        .az_h(w_az_h), .az_t(w_az_t), .az_u(w_az_u),
-        .el_t(w_el_t), .el_u(w_el_u),
-        .time_h1(w_th1), .time_h0(w_th0),
-        .time_m1(w_tm1), .time_m0(w_tm0),
-        .time_s1(w_ts1), .time_s0(w_ts0),
-        .zone_id(w_zone)
+        .az_h(a_az_h), .az_t(a_az_t), .az_u(a_az_u),
+        .el_t(a_el_t), .el_u(a_el_u),
+        .time_h1(a_th1), .time_h0(a_th0),
+        .time_m1(a_tm1), .time_m0(a_tm0),
+        .time_s1(a_ts1), .time_s0(a_ts0),
+        .zone_id(a_zone),
+        .frame_ok(ascii_ok), .frame_errors(ascii_errors)
+    );
+
+    bt_binary_parser parser_bin (
+        .clk(clk), .rst_n(rst_n),
+        .rx_done_tick(rx_ready), .rx_data(rx_byte),
+        .az_h(b_az_h), .az_t(b_az_t), .az_u(b_az_u),
+        .el_t(b_el_t), .el_u(b_el_u),
+        .time_h1(b_th1), .time_h0(b_th0),
+        .time_m1(b_tm1), .time_m0(b_tm0),
+        .time_s1(b_ts1), .time_s0(b_ts0),
+        .zone_id(b_zone),
+        .az_dd(b_az_dd), .el_dd(b_el_dd),
+        .frame_ok(bin_ok), .crc_errors(bin_crc_errors)
     );
 
+    // Manda el último parser que completó una trama válida
+    reg usar_binario;
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) usar_binario <= 1'b0;
+        else if (bin_ok) usar_binario <= 1'b1;
+        else if (ascii_ok) usar_binario <= 1'b0;
+    end
+
+    assign w_az_h = usar_binario ? b_az_h : a_az_h;
+    assign w_az_t = usar_binario ? b_az_t : a_az_t;
+    assign w_az_u = usar_binario ? b_az_u : a_az_u;
+    assign w_el_t = usar_binario ? b_el_t : a_el_t;
+    assign w_el_u = usar_binario ? b_el_u : a_el_u;
+    assign w_th1  = usar_binario ? b_th1  : a_th1;
+    assign w_th0  = usar_binario ? b_th0  : a_th0;
+    assign w_tm1  = usar_binario ? b_tm1  : a_tm1;
+    assign w_tm0  = usar_binario ? b_tm0  : a_tm0;
+    assign w_ts1  = usar_binario ? b_ts1  : a_ts1;
+    assign w_ts0  = usar_binario ? b_ts0  : a_ts0;
+    assign w_zone = usar_binario ? b_zone : a_zone;
+
     // 3. Conversión ASCII a Entero
     wire [15:0] azimut_input;
     wire [15:0] elevacion_input;
@@ -48,55 +92,77 @@ module SolarTracker_Top (
     assign elevacion_input = ((w_el_t - 8'd48) * 10) + (w_el_u - 8'd48);
 
     // 4. Escalado de Servos
-    reg [7:0] servo_pos_az;
-    reg [7:0] servo_pos_el;
+    // Todo pasa a décimas de grado: la trama ASCII y la compacta traen grados
+    // enteros (x10), la precisa (0xA6) trae décimas. Los servos usan 12 bits
+    // (0..4095): ~0.066° por paso en azimut en lugar de ~1.06° con 8 bits.
+    localparam integer POS_BITS = 12;
+    localparam integer POS_MAX = (1 << POS_BITS) - 1;
+
+    wire [15:0] az_decimas = usar_binario ? b_az_dd : azimut_input * 10;
+    wire [15:0] el_decimas = usar_binario ? b_el_dd : elevacion_input * 10;
+
+    reg [POS_BITS-1:0] servo_pos_az;
+    reg [POS_BITS-1:0] servo_pos_el;
 
     always @(*) begin
         // --- AZIMUT ---
-        // Python ahora envía un valor mapeado de 0 a 270.
-        // El servo espera un valor de 0 a 255.
-        // Fórmula: (Input * 255) / 270
-        if (azimut_input >= 270) 
-            servo_pos_az = 8'd255;
+        // Python envía un valor mapeado de 0 a 270 grados (2700 décimas).
+        // Fórmula: (Input * 4095) / 2700
+        if (az_decimas >= 2700) 
+            servo_pos_az = POS_MAX;
         else 
-            servo_pos_az = (azimut_input * 255) / 270;
+            servo_pos_az = (az_decimas * POS_MAX) / 2700;
 
 
         // --- ELEVACIÓN (REVERTIDO A COMPORTAMIENTO ORIGINAL) ---
-        // Aquí mapeamos 0-180 grados de entrada al rango completo del servo (0-255).
+        // Aquí mapeamos 0-180 grados de entrada al rango completo del servo.
         // Como la elevación solar solo llega hasta 90, esto usará la MITAD del servo (bastante movimiento).
         // Antes intenté mapear a 270 y eso redujo el movimiento a 1/3.
-        if (elevacion_input >= 180)
-            servo_pos_el = 8'd255;
+        if (el_decimas >= 1800)
+            servo_pos_el = POS_MAX;
         else
-            servo_pos_el = (elevacion_input * 255) / 180;
+            servo_pos_el = (el_decimas * POS_MAX) / 1800;
     end
 
     // --- 5. CONTROLADORES CON SUAVIZADO ---
+    wire [POS_BITS-1:0] pos_actual_az, pos_actual_el;
     
     // AZIMUT
     servo_pwm_smooth #(
         .CLK_FREQ_HZ(50000000), .PERIOD_MS(20),
         .MIN_PULSE_US(500), .MAX_PULSE_US(2500), // Rango 270 grados
-        .SMOOTH_DELAY_MS(10)
+        // Misma velocidad que 10 ms por paso de 8 bits: 10000 * 255 / 4095 us
+        .SMOOTH_DELAY_US(623), .POS_BITS(POS_BITS)
     ) servo_h (
         .clk(clk), .reset(~rst_n),       
         .target_pos(servo_pos_az),
-        .pwm_out(servo_azimut)
+        .pwm_out(servo_azimut), .current_pos_out(pos_actual_az)
     );
 
     // ELEVACIÓN
     servo_pwm_smooth #(
         .CLK_FREQ_HZ(50000000), .PERIOD_MS(20),
         .MIN_PULSE_US(500), .MAX_PULSE_US(2500), // Rango 270 grados
-        .SMOOTH_DELAY_MS(10) 
+        .SMOOTH_DELAY_US(623), .POS_BITS(POS_BITS)
     ) servo_v (
         .clk(clk), .reset(~rst_n),
         .target_pos(servo_pos_el),
-        .pwm_out(servo_elevacion)
+        .pwm_out(servo_elevacion), .current_pos_out(pos_actual_el)
+    );
+
+    // 6. Telemetría: posición real de las rampas, objetivos y errores de los parsers
+    telemetry_tx #(
+        .CLK_FREQ(50000000), .BAUD_RATE(9600), .PERIOD_MS(100), .POS_BITS(POS_BITS)
+    ) telemetria (
+        .clk(clk), .rst_n(rst_n),
+        .frame_ok(ascii_ok | bin_ok),
+        .pos_az(pos_actual_az), .pos_el(pos_actual_el),
+        .obj_az(servo_pos_az), .obj_el(servo_pos_el),
+        .ascii_errors(ascii_errors), .bin_errors(bin_crc_errors),
+        .tx_serial(uart_txd)
     );
 
-    // 6. LCD
+    // 7. LCD
     LCD1602_DualScreen lcd (
         .clk(clk), .reset(rst_n),
         .az_h(w_az_h), .az_t(w_az_t), .az_u(w_az_u),